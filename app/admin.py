@@ -1 +1,36 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from django.urls import path
+
+from . import profiling
+
 # Register your models here.
+
+
+def profiles_view(request):
+    """Lista los perfiles guardados por app.profiling.ProfilingMiddleware"""
+    return render(request, "admin/profiles.html", {
+        **admin.site.each_context(request),
+        "title": "Perfiles de peticiones",
+        "profiles": profiling.list_profiles(),
+        "directory": profiling.profiles_dir(),
+    })
+
+
+def profile_download(request, name):
+    """Descarga un perfil en formato collapsed, para flamegraph.pl o speedscope"""
+    path = profiling.profile_path(name)
+    if path is None:
+        raise Http404("Perfil inexistente")
+    return FileResponse(
+        open(path, "rb"), as_attachment=True, filename=f"{name}.collapsed",
+        content_type="text/plain; charset=utf-8",
+    )
+
+
+# vetsoft/urls.py las monta en admin/perfiles/; admin_view exige un usuario staff
+profile_urls = [
+    path("", admin.site.admin_view(profiles_view), name="profiles"),
+    path("<str:name>.collapsed", admin.site.admin_view(profile_download), name="profile_download"),
+]
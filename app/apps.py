@@ -5,3 +5,25 @@ class AppConfig(AppConfig):
     """Configuración de la aplicación."""
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        """Conecta las senales de la base y las que mantienen sincronizados los indices y contadores"""
+        from . import (
+            autocomplete,
+            database,
+            instrumentation,
+            metrics,
+            search,
+            slow_queries,
+            versions,
+            workers,
+        )
+
+        database.connect_signals()
+        search.connect_signals()
+        autocomplete.connect_signals()
+        versions.connect_signals()
+        workers.connect_signals()
+        instrumentation.connect_signals()
+        metrics.connect_signals()
+        slow_queries.connect_signals()
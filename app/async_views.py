@@ -0,0 +1,149 @@
+from collections import namedtuple
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.shortcuts import aget_object_or_404, redirect, render, reverse
+
+from . import profiling, views
+from .models import (
+    Breed,
+    CityEnum,
+    Client,
+    Medicine,
+    Pet,
+    Product,
+    Provider,
+    Speciality,
+    Vet,
+)
+
+# Versiones asincronas de los repositorios, formularios y bajas, para servir la app
+# por ASGI (vetsoft/asgi.py). Mismas urls, plantillas y respuestas que app/views.py.
+# Los formularios y las bajas son asincronicos de verdad. Los repositorios no: son
+# una capa de compatibilidad que corre la vista sincronica en el pool de threads
+# (ver in_thread_pool), porque el ETag de condition(), el cache de fragmentos y la
+# paginacion por cursor son sincronicos. Portarlos a aiterator()/acount() no ahorra
+# threads mientras esas tres piezas no tengan version asincronica.
+
+# modelo, nombre en el contexto y en el POST de la baja, plantilla del formulario,
+# url del repositorio, metodo de alta, metodo de edicion y contexto extra del formulario
+Entity = namedtuple("Entity", "model name template repo save update extra")
+
+ENTITIES = {
+    "clients": Entity(
+        Client, "client", "clients/form.html", "clients_repo",
+        Client.save_client, "update_client", {"ciudades": CityEnum.choices},
+    ),
+    "vets": Entity(
+        Vet, "vet", "vets/form.html", "vets_repo",
+        Vet.save_vet, "update_vet", {"specialities": Speciality.choices},
+    ),
+    "providers": Entity(
+        Provider, "provider", "providers/form.html", "providers_repo",
+        Provider.save_provider, "update_provider", {},
+    ),
+    "pets": Entity(
+        Pet, "pet", "pets/form.html", "pets_repo",
+        Pet.save_pet, "update_pet", {"breeds": Breed.choices},
+    ),
+    "medicines": Entity(
+        Medicine, "medicine", "medicines/form.html", "medicines_repo",
+        Medicine.save_medicine, "update_medicine", {},
+    ),
+    "products": Entity(
+        Product, "product", "products/form.html", "products_repo",
+        Product.save_product, "update_product", {},
+    ),
+}
+
+
+def in_thread_pool(view):
+    """
+    Adapta una vista sincronica para ASGI corriendola en el pool de threads en
+    lugar del unico thread que Django usa por defecto para las vistas sincronicas,
+    asi varias peticiones se atienden en paralelo. Como en WSGI, las conexiones
+    vencidas del thread se cierran antes y despues de cada peticion.
+    """
+    def run(request, *args, **kwargs):
+        profiling.bind_thread()
+        close_old_connections()
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    run_in_pool = sync_to_async(run, thread_sensitive=False)
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await run_in_pool(request, *args, **kwargs)
+    return async_view
+
+
+def form_view(entity):
+    """Vista asincronica de alta y edicion de una entidad"""
+    async def view(request, id=None):
+        if request.method == "POST":
+            object_id = request.POST.get("id", "")
+            if object_id == "":
+                saved, errors = await sync_to_async(entity.save)(request.POST)
+            else:
+                instance = await aget_object_or_404(entity.model, pk=object_id)
+                update = getattr(instance, entity.update)
+                saved, errors = await sync_to_async(update)(request.POST)
+
+            if saved:
+                return redirect(reverse(entity.repo))
+
+            return render(
+                request, entity.template,
+                {**entity.extra, "errors": errors, entity.name: request.POST},
+            )
+
+        instance = None
+        if id is not None:
+            instance = await aget_object_or_404(entity.model, pk=id)
+
+        return render(request, entity.template, {**entity.extra, entity.name: instance})
+    view.__doc__ = f"Alta y edicion de {entity.model._meta.verbose_name_plural}"
+    return view
+
+
+def delete_view(entity):
+    """Vista asincronica que elimina una entidad segun el ID del POST"""
+    async def view(request):
+        object_id = request.POST.get(f"{entity.name}_id")
+        instance = await aget_object_or_404(entity.model, pk=int(object_id))
+        await instance.adelete()
+
+        return redirect(reverse(entity.repo))
+    view.__doc__ = f"Baja de {entity.model._meta.verbose_name_plural}"
+    return view
+
+
+# capa de compatibilidad: los repositorios son la vista sincronica corriendo en el
+# pool de threads, con su ETag, su cache de fragmentos y su paginacion
+clients_repository = in_thread_pool(views.clients_repository)
+clients_form = form_view(ENTITIES["clients"])
+clients_delete = delete_view(ENTITIES["clients"])
+
+vets_repository = in_thread_pool(views.vets_repository)
+vets_form = form_view(ENTITIES["vets"])
+vets_delete = delete_view(ENTITIES["vets"])
+
+providers_repository = in_thread_pool(views.providers_repository)
+providers_form = form_view(ENTITIES["providers"])
+providers_delete = delete_view(ENTITIES["providers"])
+
+pets_repository = in_thread_pool(views.pets_repository)
+pets_form = form_view(ENTITIES["pets"])
+pets_delete = delete_view(ENTITIES["pets"])
+
+medicines_repository = in_thread_pool(views.medicines_repository)
+medicines_form = form_view(ENTITIES["medicines"])
+medicines_delete = delete_view(ENTITIES["medicines"])
+
+products_repository = in_thread_pool(views.products_repository)
+products_form = form_view(ENTITIES["products"])
+products_delete = delete_view(ENTITIES["products"])
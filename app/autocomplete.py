@@ -0,0 +1,258 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Client, Medicine, Pet, Product, Vet
+from .search import normalize
+from .signals import bulk_created
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+BULK_RELOAD_THRESHOLD = 100
+
+# entidad -> modelo cuyo campo name se sugiere
+AUTOCOMPLETE = {
+    "clients": Client,
+    "pets": Pet,
+    "vets": Vet,
+    "medicines": Medicine,
+    "products": Product,
+}
+
+
+class PrefixIndex:
+    """
+    Nombres de un modelo en memoria para sugerir por prefijo. Las claves
+    normalizadas se guardan ordenadas en una lista, con los ids en otra lista
+    paralela, y cada prefijo se resuelve con bisect sin consultar la base.
+    Al vencer AUTOCOMPLETE_MAX_AGE un solo thread arma el indice nuevo fuera del
+    lock mientras los demas siguen sugiriendo con el anterior.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.keys = []
+        self.ids = []
+        self.names = {}
+        self.loaded_at = None
+        self.refreshing = False
+        # pedido de otra recarga mientras se arma el indice nuevo: la lectura en
+        # curso puede ser anterior al cambio que la pidio
+        self.reload_again = False
+        # cambios que llegan mientras se arma el indice nuevo, para aplicarlos
+        # tambien sobre el: add y remove son idempotentes
+        self.pending = []
+        self.lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        """Indica si el indice ya se cargo desde la base"""
+        return self.loaded_at is not None
+
+    def load(self):
+        """
+        Carga todos los nombres del modelo, reemplazando el contenido actual. La
+        lectura y el ordenamiento se hacen sin el lock; solo el reemplazo lo toma.
+        """
+        rows = self.model.objects.values_list("id", "name").iterator(chunk_size=5000)
+        names = dict(rows)
+        pairs = sorted((normalize(name), object_id) for object_id, name in names.items())
+        with self.lock:
+            self.keys = [key for key, _ in pairs]
+            self.ids = [object_id for _, object_id in pairs]
+            self.names = names
+            self.loaded_at = time.monotonic()
+            pending, self.pending = self.pending, []
+            for method, args in pending:
+                method(*args)
+
+    def expired(self):
+        """Indica si paso AUTOCOMPLETE_MAX_AGE desde la ultima carga"""
+        max_age = getattr(settings, "AUTOCOMPLETE_MAX_AGE", None)
+        return bool(max_age) and time.monotonic() - self.loaded_at > max_age
+
+    def ensure_loaded(self):
+        """
+        Carga el indice si todavia no se cargo o lo recarga si vencio
+        AUTOCOMPLETE_MAX_AGE. La primera carga bloquea porque no hay nada que
+        sugerir; una recarga la hace un solo thread y los demas no esperan.
+        """
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    self.load()
+            return
+        if self.expired():
+            self.refresh(needed=self.expired)
+
+    def refresh(self, needed=None):
+        """
+        Vuelve a cargar el indice en este thread mientras los demas siguen
+        sugiriendo con el anterior. Un solo thread recarga a la vez: si ya hay
+        una recarga en curso, un pedido sin `needed` le pide otra vuelta en lugar
+        de esperarla. `needed` se vuelve a evaluar con el lock tomado, para no
+        recargar si otro thread acaba de hacerlo.
+        """
+        with self.lock:
+            if not self.loaded:
+                return
+            if self.refreshing:
+                if needed is None:
+                    self.reload_again = True
+                return
+            if needed is not None and not needed():
+                return
+            self.refreshing = True
+        try:
+            while True:
+                self.load()
+                with self.lock:
+                    if not self.reload_again:
+                        break
+                    self.reload_again = False
+        finally:
+            with self.lock:
+                self.refreshing = False
+                self.reload_again = False
+                self.pending = []
+
+    def clear(self):
+        """Vacia el indice; se vuelve a cargar en la proxima consulta"""
+        with self.lock:
+            self.keys, self.ids, self.names = [], [], {}
+            self.loaded_at = None
+            self.pending = []
+
+    def _position(self, object_id):
+        key = normalize(self.names[object_id])
+        start = bisect_left(self.keys, key)
+        end = bisect_right(self.keys, key, lo=start)
+        return start + self.ids[start:end].index(object_id)
+
+    def _add(self, object_id, name):
+        if self.names.get(object_id) == name:
+            return
+        self._remove(object_id)
+        key = normalize(name)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.ids.insert(position, object_id)
+        self.names[object_id] = name
+
+    def _remove(self, object_id):
+        if object_id not in self.names:
+            return
+        position = self._position(object_id)
+        del self.keys[position]
+        del self.ids[position]
+        del self.names[object_id]
+
+    def add(self, object_id, name):
+        """Agrega o actualiza el nombre de un objeto"""
+        if not self.loaded:
+            return
+        with self.lock:
+            if self.refreshing:
+                self.pending.append((self._add, (object_id, name)))
+            self._add(object_id, name)
+
+    def remove(self, object_id):
+        """Quita un objeto del indice"""
+        if not self.loaded:
+            return
+        with self.lock:
+            if self.refreshing:
+                self.pending.append((self._remove, (object_id,)))
+            self._remove(object_id)
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """Retorna hasta `limit` pares (id, nombre) cuyo nombre empieza con el prefijo"""
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        self.ensure_loaded()
+        with self.lock:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\uffff", lo=start)
+            ids = self.ids[start:min(end, start + limit)]
+            return [(object_id, self.names[object_id]) for object_id in ids]
+
+
+INDEXES = {entity: PrefixIndex(model) for entity, model in AUTOCOMPLETE.items()}
+INDEXES_BY_MODEL = {index.model: index for index in INDEXES.values()}
+
+
+def suggest(entity, prefix, limit=DEFAULT_LIMIT):
+    """Sugerencias de nombres para una entidad; KeyError si la entidad no existe"""
+    limit = max(1, min(limit, MAX_LIMIT))
+    return INDEXES[entity].suggest(prefix, limit)
+
+
+def warm():
+    """
+    Carga todos los indices antes de atender peticiones. Si la base todavia no
+    esta migrada se deja la carga para la primera consulta.
+    """
+    try:
+        for index in INDEXES.values():
+            index.ensure_loaded()
+    except DatabaseError:
+        reset()
+    finally:
+        # los workers que se forkean despues no deben compartir la conexion
+        connections.close_all()
+
+
+def reset():
+    """Vacia todos los indices"""
+    for index in INDEXES.values():
+        index.clear()
+
+
+def update_name(sender, instance, **kwargs):
+    """
+    Receptor de post_save: agrega o actualiza el nombre de la instancia cuando
+    se confirma la transaccion, asi un rollback no deja nombres inexistentes
+    """
+    index = INDEXES_BY_MODEL[sender]
+    object_id, name = instance.pk, instance.name
+    transaction.on_commit(lambda: index.add(object_id, name))
+
+
+def remove_name(sender, instance, **kwargs):
+    """Receptor de post_delete: quita el nombre de la instancia al confirmarse la baja"""
+    index = INDEXES_BY_MODEL[sender]
+    object_id = instance.pk
+    transaction.on_commit(lambda: index.remove(object_id))
+
+
+def add_bulk(sender, objs, **kwargs):
+    """
+    Receptor de bulk_created: agrega los nombres creados en lote al confirmarse
+    la importacion. Cada insercion mueve la lista, asi que con lotes grandes es
+    mas barato volver a cargar el indice; la recarga la hace el thread que
+    importa, y mientras tanto se sigue sugiriendo con el indice anterior.
+    """
+    index = INDEXES_BY_MODEL[sender]
+    if len(objs) > BULK_RELOAD_THRESHOLD:
+        transaction.on_commit(index.refresh)
+        return
+    names = [(obj.pk, obj.name) for obj in objs if obj.pk is not None]
+
+    def add_names():
+        for object_id, name in names:
+            index.add(object_id, name)
+
+    transaction.on_commit(add_names)
+
+
+def connect_signals():
+    """Conecta los receptores que mantienen los indices sincronizados con los modelos"""
+    for model in AUTOCOMPLETE.values():
+        uid = f"autocomplete-{model._meta.model_name}"
+        post_save.connect(update_name, sender=model, dispatch_uid=uid)
+        post_delete.connect(remove_name, sender=model, dispatch_uid=uid)
+        bulk_created.connect(add_bulk, sender=model, dispatch_uid=uid)
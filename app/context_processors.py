@@ -1,28 +1,99 @@
-from django.urls import reverse
+from collections import namedtuple
+from functools import cache
 
-links = [
-    {"label": "Home", "href": reverse("home"), "icon": "bi bi-house-door"},
-    {"label": "Clientes", "href": reverse("clients_repo"), "icon": "bi bi-people"},
-    {"label": "Veterinarios", "href": reverse("vets_repo"), "icon": "bi bi-bag"},
-    {"label": "Proveedores", "href": reverse("providers_repo"), "icon": "bi bi-person-badge"},
+from django.template.loader import render_to_string
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils.safestring import mark_safe
 
+NavLink = namedtuple("NavLink", "label href icon active")
 
-    {"label": "Productos", "href": reverse("products_repo"), "icon": "bi bi-box-seam"},
-    {"label": "Mascotas", "href": reverse("pets_repo"), "icon": "bi bi-heart"},
-    {"label": "Medicinas", "href": reverse("medicines_repo"), "icon": "bi bi-capsule"},
-]
+# (etiqueta, nombre de la url, icono)
+LINKS = (
+    ("Home", "home", "bi bi-house-door"),
+    ("Clientes", "clients_repo", "bi bi-people"),
+    ("Veterinarios", "vets_repo", "bi bi-bag"),
+    ("Proveedores", "providers_repo", "bi bi-person-badge"),
+    ("Productos", "products_repo", "bi bi-box-seam"),
+    ("Mascotas", "pets_repo", "bi bi-heart"),
+    ("Medicinas", "medicines_repo", "bi bi-capsule"),
+)
 
 
-def navbar(request):
-    """"Esta funcion asegura de que cada enlace en la lista de enlaces tenga una propiedad "active" """
-    def add_active(link):
-        copy = link.copy()
+@cache
+def link_hrefs():
+    """Retorna (etiqueta, href, icono) de cada link, resolviendo las urls una sola vez"""
+    return tuple((label, reverse(url_name), icon) for label, url_name, icon in LINKS)
+
+
+def section_for_path(path):
+    """
+    Seccion activa para una ruta: el link con el prefijo mas largo que coincide.
+    Home solo queda activo en la raiz.
+    """
+    best = None
+    for label, href, _ in link_hrefs():
+        if href == "/":
+            matches = path == "/"
+        else:
+            matches = path.startswith(href)
+        if matches and (best is None or len(href) > len(best[1])):
+            best = (label, href)
+    return best[0] if best else None
 
-        if copy["href"] == "/":
-            copy["active"] = request.path == "/"
+
+def static_prefix(route):
+    """Parte fija de una ruta de django, hasta el primer parametro"""
+    return "/" + route.split("<", 1)[0]
+
+
+def iter_routes(patterns, prefix="", namespace=""):
+    """Recorre el urlconf retornando (nombre con namespace, ruta completa)"""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLPattern):
+            if pattern.name:
+                yield namespace + pattern.name, route
         else:
-            copy["active"] = request.path.startswith(copy.get("href", ""))
+            inner = f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace
+            yield from iter_routes(pattern.url_patterns, route, inner)
+
 
-        return copy
+@cache
+def sections_by_view_name():
+    """
+    Tabla nombre de url -> seccion activa, armada una vez recorriendo el urlconf
+    y resolviendo cada ruta con el prefijo mas largo.
+    """
+    return {
+        view_name: section_for_path(static_prefix(route))
+        for view_name, route in iter_routes(get_resolver().url_patterns)
+    }
 
-    return {"links": map(add_active, links)}
+
+@cache
+def links_for(section):
+    """Links del navbar, inmutables, con `section` marcada como activa"""
+    return tuple(
+        NavLink(label, href, icon, label == section) for label, href, icon in link_hrefs()
+    )
+
+
+@cache
+def rendered_navbar(section):
+    """partials/navbar.html renderizado una sola vez por seccion activa"""
+    return mark_safe(render_to_string("partials/navbar.html", {"links": links_for(section)}))
+
+
+def active_section(request):
+    """Seccion activa de la peticion segun el nombre de la url resuelta"""
+    match = getattr(request, "resolver_match", None)
+    sections = sections_by_view_name()
+    if match is not None and match.view_name in sections:
+        return sections[match.view_name]
+    return section_for_path(request.path)
+
+
+def navbar(request):
+    """"Esta funcion agrega al contexto los links del navbar y el navbar ya renderizado"""
+    section = active_section(request)
+    return {"links": links_for(section), "navbar": rendered_navbar(section)}
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+from django.utils import timezone
+
+from . import versions
+from .models import ModelVersion
+
+DEFAULT_TIMEOUT = 300
+DEFAULT_APPROXIMATE_LIMIT = 1000
+
+
+def get_count(model, request=None):
+    """
+    Cantidad de filas de un modelo. Se lee de ModelVersion, que los receptores de
+    app.versions ajustan en cada alta o baja, asi todos los workers ven el mismo
+    total; con `request` se reusa la fila que ya se leyo para el ETag. Solo se hace
+    COUNT(*) si nunca se conto o si paso COUNT_CACHE_TIMEOUT desde la ultima vez:
+    es el intervalo de reconciliacion con la base.
+    """
+    if request is None:
+        version, updated_at, rows, counted_at = versions.get_state(model)
+    else:
+        version, updated_at, rows, counted_at = versions.request_state(model, request)
+    now = timezone.now()
+    timeout = timedelta(seconds=getattr(settings, "COUNT_CACHE_TIMEOUT", DEFAULT_TIMEOUT))
+    if rows is not None and now - counted_at < timeout:
+        return rows
+    if router.db_for_read(ModelVersion) != DEFAULT_DB_ALIAS:
+        # la fila se leyo de la replica, que puede estar atrasada
+        version, updated_at = (
+            ModelVersion.objects.using(DEFAULT_DB_ALIAS)
+            .filter(label=model._meta.label_lower)
+            .values_list("version", "updated_at")
+            .first()
+        ) or (0, None)
+    return reconcile(model, version if updated_at else None, now)
+
+
+def reconcile(model, version, now):
+    """
+    Cuenta las filas en el primario y guarda el total en ModelVersion. `version`
+    es la que se leyo del primario antes de contar, None si la fila todavia no
+    existe. El total solo se guarda si la version no cambio: un alta o baja
+    concurrente suma o resta en la misma fila con app.versions.bump y pisarla
+    con un conteo que no la incluye la perderia. En ese caso se deja rows como
+    esta, que ya incluye el cambio, y solo se posterga la proxima reconciliacion.
+    """
+    label = model._meta.label_lower
+    states = ModelVersion.objects.using(DEFAULT_DB_ALIAS).filter(label=label)
+    total = model.objects.using(DEFAULT_DB_ALIAS).count()
+    # contar no cambia la version ni la fecha del ultimo cambio
+    if version is None:
+        # si un alta crea la fila al mismo tiempo gana la suya y bump le suma el
+        # cambio; este conteo queda para la proxima vez
+        ModelVersion.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+            [ModelVersion(label=label, rows=total, counted_at=now)], ignore_conflicts=True,
+        )
+    elif not states.filter(version=version).update(rows=total, counted_at=now):
+        states.filter(rows__isnull=False).update(counted_at=now)
+    return total
+
+
+def count_rows(model, queryset, filtered, request=None):
+    """
+    Retorna (total, exacto) para el encabezado de una pagina. Sin filtros usa la
+    cantidad guardada; con filtros cuenta a lo sumo COUNT_APPROXIMATE_LIMIT filas
+    y, si hay mas, informa ese limite como aproximado.
+    """
+    if not filtered:
+        return get_count(model, request), True
+    limit = getattr(settings, "COUNT_APPROXIMATE_LIMIT", DEFAULT_APPROXIMATE_LIMIT)
+    total = queryset.order_by()[: limit + 1].count()
+    if total > limit:
+        return limit, False
+    return total, True
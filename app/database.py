@@ -0,0 +1,50 @@
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# nombre de pragma y valor: solo palabras y numeros, se interpolan en el SQL
+PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+PRAGMA_VALUE = re.compile(r"^-?\w+$")
+
+
+def sqlite_pragmas():
+    """PRAGMAs del perfil de SQLite configurado en SQLITE_PRAGMAS"""
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"PRAGMA invalido en SQLITE_PRAGMAS: {name}={value!r}")
+    return pragmas
+
+
+def apply_pragmas(connection):
+    """
+    Aplica el perfil a una conexion SQLite recien abierta. journal_mode=WAL queda
+    guardado en el archivo; los demas valen solo para esta conexion, por eso se
+    aplican en cada una (con CONN_MAX_AGE se abren pocas).
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in sqlite_pragmas().items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def pragma_values(connection, names=None):
+    """Valores actuales de los PRAGMAs del perfil en una conexion, para diagnostico"""
+    names = names or list(sqlite_pragmas())
+    with connection.cursor() as cursor:
+        values = {}
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            values[name] = cursor.fetchone()[0]
+    return values
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Receptor de connection_created"""
+    apply_pragmas(connection)
+
+
+def connect_signals():
+    """Conecta el receptor que configura cada conexion nueva a la base"""
+    connection_created.connect(configure_connection, dispatch_uid="database-pragmas")
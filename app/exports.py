@@ -0,0 +1,105 @@
+import csv
+import json
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+
+from .models import Client, Medicine, Pet, Product, Provider, Vet
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# entidad -> (modelo, campos exportables en orden)
+EXPORTS = {
+    "clients": (Client, ("id", "name", "phone", "email", "city")),
+    "vets": (Vet, ("id", "name", "email", "phone", "speciality")),
+    "providers": (Provider, ("id", "name", "email", "direccion")),
+    "pets": (Pet, ("id", "name", "breed", "birthday", "weight")),
+    "medicines": (Medicine, ("id", "name", "description", "dose")),
+    "products": (Product, ("id", "name", "type", "price")),
+}
+
+
+class Echo:
+    """Buffer que devuelve lo que se le escribe, para usar csv.writer en streaming."""
+    def write(self, value):
+        """Retorna el valor escrito en lugar de guardarlo"""
+        return value
+
+
+class ExportError(ValueError):
+    """Error en los parametros de la exportacion."""
+
+
+def parse_fields(raw, allowed):
+    """Valida la lista de campos pedida con ?fields=, por defecto exporta todos"""
+    if not raw:
+        return list(allowed)
+    fields = [field.strip() for field in raw.split(",") if field.strip()]
+    invalid = [field for field in fields if field not in allowed]
+    if invalid:
+        raise ExportError(f"Campos no válidos: {', '.join(invalid)}")
+    return fields
+
+
+def parse_id_range(params):
+    """Convierte ?id_min= y ?id_max= en filtros sobre la clave primaria"""
+    filters = {}
+    for param, lookup in (("id_min", "id__gte"), ("id_max", "id__lte")):
+        value = params.get(param, "")
+        if value == "":
+            continue
+        try:
+            filters[lookup] = int(value)
+        except ValueError:
+            raise ExportError(f"El parámetro {param} debe ser un entero") from None
+    return filters
+
+
+def export_rows(model, fields, filters):
+    """
+    Itera las filas como tuplas con values_list().iterator(), sin instanciar
+    los modelos ni cargar el resultado completo en memoria
+    """
+    chunk_size = getattr(settings, "EXPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    queryset = model.objects.filter(**filters).order_by("id").values_list(*fields)
+    # la base se elige ahora, mientras corre la vista: las filas se leen despues de
+    # que ReplicaRoutingMiddleware termino, cuando el router ya no elegiria la replica
+    return queryset.using(queryset.db).iterator(chunk_size=chunk_size)
+
+
+def csv_lines(fields, rows):
+    """Genera el encabezado y cada fila en formato CSV"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(fields, rows):
+    """Genera un objeto JSON por linea para cada fila"""
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), default=str, ensure_ascii=False) + "\n"
+
+
+FORMATS = {
+    "csv": (csv_lines, "text/csv; charset=utf-8"),
+    "ndjson": (ndjson_lines, "application/x-ndjson; charset=utf-8"),
+}
+
+
+def export_response(entity, fmt, params):
+    """Arma la respuesta en streaming para exportar una entidad en el formato pedido"""
+    if entity not in EXPORTS or fmt not in FORMATS:
+        raise Http404("Exportación inexistente")
+
+    model, allowed = EXPORTS[entity]
+    fields = parse_fields(params.get("fields", ""), allowed)
+    filters = parse_id_range(params)
+    generate, content_type = FORMATS[fmt]
+
+    response = StreamingHttpResponse(
+        generate(fields, export_rows(model, fields, filters)),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{entity}.{fmt}"'
+    return response
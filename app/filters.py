@@ -0,0 +1,101 @@
+from django.db import connections
+
+from .models import BREED_VALUES, CITY_VALUES, SPECIALITY_VALUES, parse_date
+from .text import normalize
+
+
+def name_prefix(queryset, value):
+    """
+    Filtra por prefijo del nombre sin distinguir mayusculas ni acentos. En SQLite se
+    expresa como un rango sobre name_search, el nombre normalizado, para que use su
+    indice: compara byte a byte y el rango termina en el ultimo caracter de Unicode.
+    En PostgreSQL el rango depende del collation de la base (con uno distinto de "C"
+    el orden ignora espacios y signos), asi que se usa LIKE 'prefijo%', que resuelve
+    el indice varchar_pattern_ops de la migracion 0024.
+    """
+    prefix = normalize(value)
+    if connections[queryset.db].vendor == "postgresql":
+        return queryset.filter(name_search__startswith=prefix)
+    return queryset.filter(name_search__gte=prefix, name_search__lt=prefix + "\U0010ffff")
+
+
+def exact(field, choices=None):
+    """Filtro por igualdad; si se indican choices ignora valores fuera de ellas"""
+    def apply(queryset, value):
+        if choices is not None and value not in choices:
+            return None
+        return queryset.filter(**{field: value})
+    return apply
+
+
+def date_bound(lookup):
+    """Filtro por fecha en formato DD/MM/YYYY, como la cargan los formularios"""
+    def apply(queryset, value):
+        date = parse_date(value)
+        if date is None:
+            return None
+        return queryset.filter(**{lookup: date})
+    return apply
+
+
+def number_bound(lookup, cast):
+    """Filtro por un limite numerico; ignora valores que no son numeros"""
+    def apply(queryset, value):
+        try:
+            number = cast(value)
+        except ValueError:
+            return None
+        return queryset.filter(**{lookup: number})
+    return apply
+
+
+# entidad -> [(parametro de la url, filtro)]
+FILTERS = {
+    "clients": [
+        ("q", name_prefix),
+        ("city", exact("city", CITY_VALUES)),
+    ],
+    "vets": [
+        ("q", name_prefix),
+        ("speciality", exact("speciality", SPECIALITY_VALUES)),
+    ],
+    "providers": [
+        ("q", name_prefix),
+    ],
+    "pets": [
+        ("q", name_prefix),
+        ("breed", exact("breed", BREED_VALUES)),
+        ("birthday_from", date_bound("birthday__gte")),
+        ("birthday_to", date_bound("birthday__lte")),
+    ],
+    "medicines": [
+        ("q", name_prefix),
+        ("dose_min", number_bound("dose__gte", int)),
+        ("dose_max", number_bound("dose__lte", int)),
+    ],
+    "products": [
+        ("q", name_prefix),
+        ("type", exact("type")),
+        ("price_min", number_bound("price__gte", float)),
+        ("price_max", number_bound("price__lte", float)),
+    ],
+}
+
+
+def filter_queryset(entity, queryset, params):
+    """
+    Aplica los filtros de la url al queryset de una entidad. Retorna el queryset
+    filtrado y un diccionario con los valores que se aplicaron, los invalidos
+    se ignoran.
+    """
+    applied = {}
+    for param, apply in FILTERS[entity]:
+        value = params.get(param, "").strip()
+        if value == "":
+            continue
+        filtered = apply(queryset, value)
+        if filtered is None:
+            continue
+        queryset = filtered
+        applied[param] = value
+    return queryset, applied
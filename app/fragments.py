@@ -0,0 +1,95 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .versions import request_version
+
+CACHE_ALIAS = "fragments"
+DEFAULT_TIMEOUT = 600
+# se guarda en el fragmento en lugar del token de cada usuario y se reemplaza al servirlo
+CSRF_SENTINEL = "__vetsoft_csrf_token__"
+
+
+class Stats:
+    """Contadores de aciertos y fallos del cache de fragmentos de este proceso."""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def record(self, hit):
+        """Suma un acierto o un fallo"""
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        """Retorna los contadores y la tasa de aciertos"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+    def reset(self):
+        """Vuelve los contadores a cero"""
+        with self.lock:
+            self.hits = self.misses = 0
+
+
+stats = Stats()
+
+
+def get_cache():
+    """Cache de fragmentos: el alias "fragments" si esta configurado o el default"""
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def fragment_key(request, model, name):
+    """
+    Clave del fragmento: la version del modelo (con la fecha del cambio, para que
+    una base restaurada no reutilice versiones viejas) y los parametros de la url.
+    """
+    version, updated_at = request_version(model, request)
+    changed = updated_at.timestamp() if updated_at else 0
+    query = hashlib.sha1(
+        request.GET.urlencode().encode(), usedforsecurity=False,
+    ).hexdigest()[:16]
+    return f"vetsoft:fragment:{name}:{version}:{changed}:{query}"
+
+
+def repository_table(request, model, rows_template, build_page):
+    """
+    Retorna (tabla, pagina) de un repositorio. La tabla tiene las filas y la
+    paginacion ya renderizadas; si estan en el cache no se consulta el listado
+    y la pagina es None. Un cambio en el modelo cambia su version y con ella la
+    clave, asi que los fragmentos viejos dejan de usarse sin borrarlos uno a uno.
+    """
+    cache = get_cache()
+    key = fragment_key(request, model, model._meta.model_name)
+    table = cache.get(key)
+    page = None
+    stats.record(hit=table is not None)
+    if table is None:
+        page = build_page()
+        table = {
+            "rows": render_to_string(rows_template, {"rows": page, "csrf_token": CSRF_SENTINEL}),
+            "pagination": render_to_string("partials/pagination.html", {"page": page}),
+        }
+        cache.set(key, table, getattr(settings, "FRAGMENT_CACHE_TIMEOUT", DEFAULT_TIMEOUT))
+
+    token = get_token(request)
+    table = {name: mark_safe(html.replace(CSRF_SENTINEL, token)) for name, html in table.items()}
+    return table, page
@@ -0,0 +1,171 @@
+import csv
+
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from .models import (
+    Client,
+    Medicine,
+    Pet,
+    Product,
+    Provider,
+    Vet,
+    clean_client,
+    clean_medicine,
+    clean_pet,
+    clean_product,
+    clean_provider,
+    clean_vet,
+)
+from .signals import bulk_created
+from .text import normalize
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+DEFAULT_MAX_ROWS = 500000
+
+# entidad -> (modelo, validador). El validador retorna los valores ya convertidos
+# (fechas, decimales, enteros) y con ellos se arma cada instancia, sin volver a
+# parsear la fila
+IMPORTERS = {
+    "clients": (Client, clean_client),
+    "vets": (Vet, clean_vet),
+    "providers": (Provider, clean_provider),
+    "pets": (Pet, clean_pet),
+    "medicines": (Medicine, clean_medicine),
+    "products": (Product, clean_product),
+}
+
+
+class ImportLimitError(ValueError):
+    """El archivo supera el tamanio o la cantidad de filas permitidos."""
+
+
+class ImportResult:
+    """Resultado de una importacion: filas insertadas y errores por fila."""
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    @property
+    def rows(self):
+        """Cantidad total de filas leidas"""
+        return self.created + len(self.errors)
+
+    def add_error(self, line, errors):
+        """Registra los errores de validacion de una linea del archivo"""
+        self.errors.append({"line": line, "errors": errors})
+
+
+def get_batch_size():
+    """Cantidad de filas por cada lote que se inserta"""
+    return getattr(settings, "IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+
+def get_max_upload_size():
+    """Tamanio maximo en bytes de un archivo subido desde la pagina de importacion"""
+    return getattr(settings, "IMPORT_MAX_UPLOAD_SIZE", DEFAULT_MAX_UPLOAD_SIZE)
+
+
+def get_max_rows():
+    """Cantidad maxima de filas de un archivo subido desde la pagina de importacion"""
+    return getattr(settings, "IMPORT_MAX_ROWS", DEFAULT_MAX_ROWS)
+
+
+def insert_rows(model, fields, rows):
+    """
+    Inserta tuplas de valores, en el orden de `fields`, con INSERT de varias
+    filas y RETURNING, y retorna las instancias creadas. Hace lo mismo que
+    bulk_create pero sin pasar por el compilador del ORM, que recorre campo por
+    campo cada instancia y era la mayor parte del tiempo de la importacion.
+    """
+    connection = connections[router.db_for_write(model)]
+    ops = connection.ops
+    pk = model._meta.pk
+    columns = ", ".join(ops.quote_name(field.column) for field in fields)
+    returning, _ = ops.return_insert_columns([pk])
+    # DateField y DecimalField cambian segun la base; texto y numeros pasan igual
+    prepared = [
+        index for index, field in enumerate(fields)
+        if field.get_internal_type() in ("DateField", "DecimalField")
+    ]
+    size = ops.bulk_batch_size(fields, rows)
+    objs = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
+            params = []
+            for row in chunk:
+                if prepared:
+                    row = list(row)
+                    for index in prepared:
+                        row[index] = fields[index].get_db_prep_save(row[index], connection)
+                params.extend(row)
+            values = ops.bulk_insert_sql(fields, [["%s"] * len(fields)] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {ops.quote_name(model._meta.db_table)} ({columns}) "
+                f"{values} {returning}",
+                params,
+            )
+            ids = ops.fetch_returned_insert_rows(cursor)
+            objs.extend(
+                model.from_db(connection.alias, None, (pk_value, *row))
+                for (pk_value,), row in zip(ids, chunk)
+            )
+    return objs
+
+
+def import_rows(entity, rows, batch_size=None, dry_run=False, max_rows=None):
+    """
+    Valida cada fila con el validador de la entidad e inserta las validas por
+    lotes, todo dentro de una misma transaccion. `rows` es cualquier iterable de
+    diccionarios, por ejemplo un csv.DictReader. Cada fila valida se guarda como
+    una tupla con los valores de las columnas; las instancias se arman recien
+    despues de insertarlas, para los receptores de bulk_created. Con `max_rows`
+    lanza ImportLimitError si el archivo tiene mas filas, sin insertar ninguna.
+    """
+    model, clean = IMPORTERS[entity]
+    batch_size = batch_size or get_batch_size()
+    connection = connections[router.db_for_write(model)]
+    # sin RETURNING de varias filas no hay ids para las instancias
+    fast = connection.features.can_return_rows_from_bulk_insert
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    defaults = [(field.attname, field.get_default()) for field in fields]
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            if fast:
+                created = insert_rows(model, fields, batch)
+            else:
+                created = model.objects.bulk_create(
+                    [model(**dict(zip((name for name, _ in defaults), row))) for row in batch],
+                    batch_size=batch_size,
+                )
+            bulk_created.send(sender=model, objs=created)
+        result.created += len(batch)
+        batch.clear()
+
+    with transaction.atomic(using=connection.alias):
+        # la linea 1 del archivo es el encabezado
+        for line, row in enumerate(rows, start=2):
+            if max_rows is not None and line - 1 > max_rows:
+                # la transaccion deshace los lotes que ya se insertaron
+                raise ImportLimitError(f"El archivo tiene más de {max_rows} filas")
+            cleaned, errors = clean(row)
+            if errors:
+                result.add_error(line, errors)
+                continue
+            cleaned["name_search"] = normalize(cleaned["name"])
+            batch.append(tuple([cleaned.get(name, default) for name, default in defaults]))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+    return result
+
+
+def import_csv(entity, stream, batch_size=None, dry_run=False, max_rows=None):
+    """Importa un archivo CSV de texto con encabezado leyendolo linea por linea"""
+    return import_rows(entity, csv.DictReader(stream, restval=""), batch_size, dry_run, max_rows)
@@ -0,0 +1,200 @@
+import contextvars
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import registry
+
+logger = logging.getLogger("app.requests")
+
+# Metricas de la peticion en curso. Es un ContextVar y no un atributo del thread para
+# que las vistas asincronicas, que consultan la base desde el pool de threads de
+# sync_to_async, sigan sumando a la peticion que las llamo.
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Consultas SQL, tiempo en la base, en los templates y total de una peticion."""
+    def __init__(self, request=None):
+        self.request = request
+        self.started = time.perf_counter()
+        self.total_s = None
+        self.queries = 0
+        self.sql_s = 0.0
+        self.template_s = 0.0
+        # SQL que corre mientras se renderiza (querysets perezosos, context processors):
+        # se descuenta del tiempo de templates para no contarlo dos veces
+        self.template_sql_s = 0.0
+        self.rendering = 0
+
+    def finish(self):
+        """Fija la duracion total de la peticion"""
+        self.total_s = time.perf_counter() - self.started
+
+    @property
+    def python_s(self):
+        """Tiempo fuera de la base y de los templates: vista, middlewares, formularios"""
+        return max(self.total_s - self.sql_s - self.own_template_s, 0.0)
+
+    @property
+    def own_template_s(self):
+        """Tiempo de render sin las consultas que se hicieron durante el render"""
+        return max(self.template_s - self.template_sql_s, 0.0)
+
+    def server_timing(self):
+        """Valor del encabezado Server-Timing, en milisegundos"""
+        return ", ".join([
+            f'sql;dur={self.sql_s * 1000:.2f};desc="{self.queries} queries"',
+            f"template;dur={self.own_template_s * 1000:.2f}",
+            f"python;dur={self.python_s * 1000:.2f}",
+            f"total;dur={self.total_s * 1000:.2f}",
+        ])
+
+    def as_dict(self):
+        """Metricas en milisegundos, para el log"""
+        return {
+            "queries": self.queries,
+            "sql_ms": round(self.sql_s * 1000, 2),
+            "template_ms": round(self.own_template_s * 1000, 2),
+            "python_ms": round(self.python_s * 1000, 2),
+            "total_ms": round(self.total_s * 1000, 2),
+        }
+
+
+def current_metrics():
+    """Metricas de la peticion en curso, o None fuera de una peticion"""
+    return _current.get()
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Execute wrapper instalado en cada conexion: cuenta y cronometra las consultas
+    de la peticion en curso. Fuera de una peticion (comandos, migraciones) solo
+    llama a execute.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.queries += 1
+        metrics.sql_s += elapsed
+        if metrics.rendering:
+            metrics.template_sql_s += elapsed
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """Receptor de connection_created: agrega time_query una sola vez por conexion"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def connect_signals():
+    """Conecta el receptor que instala el cronometro de consultas en cada conexion"""
+    connection_created.connect(install_query_timer, dispatch_uid="instrumentation-queries")
+
+
+class TimedTemplate(Template):
+    """Template que suma su tiempo de render a las metricas de la peticion."""
+    def render(self, context=None, request=None):
+        """Renderiza y cronometra; los templates anidados cuentan dentro del primero"""
+        metrics = _current.get()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_s += time.perf_counter() - start
+            metrics.rendering -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Backend de templates de Django que devuelve TimedTemplate."""
+    def from_string(self, template_code):
+        """Compila un template desde un string"""
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        """Busca un template por nombre, como DjangoTemplates"""
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide cada peticion: consultas SQL y su tiempo, render de templates y el resto
+    (Python). Los informa en el encabezado Server-Timing, que muestran las
+    herramientas de desarrollo del navegador, y en una linea JSON del logger
+    app.requests. Las suma al registro de app/metrics.py (GET /metrics) y las deja
+    en response.request_metrics para los tests. Va primero en MIDDLEWARE para
+    incluir a los demas middlewares.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Atiende la peticion con sus metricas activas"""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics(request)
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        """Version asincronica de __call__ para ASGI"""
+        metrics = RequestMetrics(request)
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        """
+        Agrega el encabezado y escribe el log. En las respuestas streaming solo se
+        mide hasta que empieza el envio; las filas se leen despues.
+        """
+        metrics.finish()
+        response["Server-Timing"] = metrics.server_timing()
+        response.request_metrics = metrics
+        match = request.resolver_match
+        view = match.view_name if match else None
+        registry.record_request(
+            view or "unmatched", request.method, response.status_code,
+            metrics.total_s, metrics.queries, metrics.sql_s,
+        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": view,
+                "status": response.status_code,
+                **metrics.as_dict(),
+            }))
+        return response
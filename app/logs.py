@@ -0,0 +1,37 @@
+import fcntl
+import os
+from logging.handlers import RotatingFileHandler
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler para varios procesos escribiendo el mismo archivo (los
+    workers de gunicorn). Cada escritura toma un lock de archivo y, si otro proceso
+    ya roto el log, reabre el archivo nuevo en lugar de seguir escribiendo en el
+    rotado o de volver a rotarlo.
+    """
+    def __init__(self, filename, *args, **kwargs):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, *args, **kwargs)
+        self.lock_path = f"{self.baseFilename}.lock"
+
+    def rotated_elsewhere(self):
+        """Indica si el archivo abierto ya no es el que esta en baseFilename"""
+        if self.stream is None:
+            return False
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def emit(self, record):
+        """Escribe el registro con el lock tomado"""
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if self.rotated_elsewhere():
+                    self.stream.close()
+                    self.stream = None
+                super().emit(record)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
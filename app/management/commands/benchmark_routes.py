@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import routes
+
+
+class Command(BaseCommand):
+    """Benchmark de carga HTTP de todas las rutas (benchmarks/routes.py)."""
+    help = (
+        "Siembra bases de distintos tamanos, carga cada ruta con clientes concurrentes "
+        "y guarda latencias, throughput y memoria en un JSON"
+    )
+
+    def add_arguments(self, parser):
+        """Las mismas opciones que python -m benchmarks.routes"""
+        routes.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        """Corre el benchmark y guarda el resultado"""
+        report = routes.run(options, log=self.stdout.write)
+        output = routes.write_report(report, options, log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f"Resultado en {output}"))
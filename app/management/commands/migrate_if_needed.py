@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from app import startup
+
+
+class Command(BaseCommand):
+    """Aplica las migraciones pendientes solo si la base no esta al dia."""
+    help = "Aplica las migraciones pendientes; con la base al dia termina sin tocarla"
+    # los system checks son lo mas lento del arranque y ya corren en el build
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        """Permite elegir la base, como migrate"""
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        """Aplica las migraciones pendientes e informa cuales"""
+        applied = startup.migrate_if_needed(options["database"])
+        for app_label, name in applied:
+            self.stdout.write(f"  {app_label}.{name}")
+        if applied:
+            self.stdout.write(self.style.SUCCESS(f"{len(applied)} migraciones aplicadas"))
+        else:
+            self.stdout.write("La base esta al dia")
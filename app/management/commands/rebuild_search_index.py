@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app import search
+
+
+class Command(BaseCommand):
+    """Reconstruye el indice del buscador global."""
+    help = "Reconstruye el indice de busqueda desde las tablas de los modelos"
+
+    def handle(self, *args, **options):
+        """Vacia el indice y vuelve a indexar todas las filas"""
+        start = time.perf_counter()
+        search.rebuild()
+        elapsed = time.perf_counter() - start
+        backend = search.get_backend().name
+        self.stdout.write(
+            self.style.SUCCESS(f"Indice {backend} reconstruido en {elapsed:.2f}s"),
+        )
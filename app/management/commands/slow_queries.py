@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app import slow_queries
+
+ORDERINGS = ("total_ms", "max_ms", "p95_ms", "count")
+
+
+class Command(BaseCommand):
+    """Resume el log de consultas lentas agrupando por consulta normalizada."""
+    help = "Muestra las consultas lentas que mas tiempo consumen, agrupadas por fingerprint"
+
+    def add_arguments(self, parser):
+        """Cantidad de consultas, orden, archivo y formato"""
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--sort", choices=ORDERINGS, default="total_ms")
+        parser.add_argument("--log", default=settings.SLOW_QUERY_LOG)
+        parser.add_argument("--json", action="store_true", help="Salida en JSON")
+
+    def handle(self, *args, **options):
+        """Lee el log y sus copias rotadas y muestra las peores consultas"""
+        paths = slow_queries.log_paths(options["log"], settings.SLOW_QUERY_LOG_BACKUPS)
+        entries = slow_queries.read_log(paths)
+        summary = sorted(
+            slow_queries.summarize(entries), key=lambda group: group[options["sort"]], reverse=True,
+        )[: options["top"]]
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        if not summary:
+            self.stdout.write(f"No hay consultas lentas en {options['log']}")
+            return
+        self.stdout.write(
+            f"{len(entries)} consultas lentas, {len(summary)} mas costosas por {options['sort']}\n",
+        )
+        for group in summary:
+            self.stdout.write(self.style.WARNING(
+                f"{group['fingerprint']}  {group['count']}x  total {group['total_ms']:.1f} ms  "
+                f"prom {group['mean_ms']:.1f}  p95 {group['p95_ms']:.1f}  max {group['max_ms']:.1f}",
+            ))
+            self.stdout.write(f"  vistas: {', '.join(group['views'])}")
+            self.stdout.write(f"  {group['sql']}")
+            slowest = group["slowest"]
+            if slowest.get("params"):
+                self.stdout.write(f"  parametros de la mas lenta: {slowest['params']}")
+            for step in slowest.get("plan") or []:
+                self.stdout.write(f"    plan: {step}")
+            self.stdout.write("")
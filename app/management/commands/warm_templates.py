@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app import templates_warmup
+
+
+class Command(BaseCommand):
+    """Compila los templates de la app e informa cuanto tarda cada uno."""
+    help = "Compila todos los templates de app/templates e informa el tiempo de compilacion"
+
+    def handle(self, *args, **options):
+        """Compila cada template y muestra los tiempos"""
+        start = time.perf_counter()
+        timings = templates_warmup.warm()
+        elapsed = time.perf_counter() - start
+        for name, seconds in sorted(timings, key=lambda item: -item[1]):
+            self.stdout.write(f"{seconds * 1000:8.2f} ms  {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(timings)} templates compilados en {elapsed * 1000:.1f} ms"),
+        )
@@ -0,0 +1,339 @@
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Registro de metricas en formato Prometheus (GET /metrics).
+#
+# Cada proceso acumula sus contadores e histogramas en memoria, sin tocar disco en la
+# peticion. Si METRICS_DIR esta configurado (gunicorn.conf.py lo hace), un thread del
+# worker los escribe en METRICS_DIR/<pid>.json cada METRICS_FLUSH_SECONDS si hubo
+# cambios. /metrics suma los archivos de todos los workers, asi responde con los
+# totales sin importar que worker atienda el scrape.
+# Cuando gunicorn recicla un worker, el master suma su archivo a archive.json para no
+# perder sus contadores (mark_process_dead en el hook child_exit).
+#
+# La tasa de aciertos del cache de fragmentos se calcula en Prometheus:
+#   rate(vetsoft_fragment_cache_hits_total[5m]) / (rate(..._hits_total[5m]) + rate(..._misses_total[5m]))
+
+# segundos; cubren desde un 304 hasta una exportacion completa
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_SECONDS = 1.0
+ARCHIVE = "archive.json"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS = {
+    "vetsoft_http_requests_total": ("counter", "Peticiones atendidas por vista, metodo y estado"),
+    "vetsoft_http_errors_total": ("counter", "Respuestas con estado 5xx por vista"),
+    "vetsoft_http_request_duration_seconds": ("histogram", "Duracion de las peticiones por vista"),
+    "vetsoft_db_queries_total": ("counter", "Consultas SQL por vista"),
+    "vetsoft_db_query_seconds_total": ("counter", "Tiempo en la base por vista"),
+    "vetsoft_db_connections_opened_total": ("counter", "Conexiones abiertas a cada base"),
+    "vetsoft_db_connections_open": ("gauge", "Conexiones abiertas ahora en los workers vivos"),
+    "vetsoft_fragment_cache_hits_total": ("counter", "Aciertos del cache de fragmentos"),
+    "vetsoft_fragment_cache_misses_total": ("counter", "Fallos del cache de fragmentos"),
+}
+
+
+def metrics_dir():
+    """Directorio compartido por los workers, o None para un solo proceso"""
+    return getattr(settings, "METRICS_DIR", None)
+
+
+def flush_seconds():
+    """Intervalo minimo entre escrituras del archivo del proceso"""
+    return getattr(settings, "METRICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+
+
+class Registry:
+    """Contadores e histogramas del proceso, indexados por (nombre, etiquetas)."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        # conexiones de este proceso, para el gauge de conexiones abiertas
+        self.connections = weakref.WeakSet()
+        self.reset()
+
+    def reset(self):
+        """Vacia el registro; lo usa el worker despues del fork y los tests"""
+        with self.lock:
+            self.pid = os.getpid()
+            self.counters = {}
+            # (nombre, etiquetas) -> [cantidad por bucket..., +Inf, suma]
+            self.histograms = {}
+            self.dirty = False
+            self.flusher = None
+
+    def check_fork(self):
+        """Un worker recien forkeado no hereda los valores del master"""
+        if self.pid != os.getpid():
+            self.connections = weakref.WeakSet()
+            self.reset()
+
+    def inc(self, name, labels=(), value=1):
+        """Suma `value` a un contador"""
+        self.check_fork()
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            self.dirty = True
+
+    def record_request(self, view, method, status, seconds, queries, sql_seconds):
+        """Registra una peticion terminada, con un solo lock para todas las series"""
+        self.check_fork()
+        view_label = (("view", view),)
+        request_key = ("vetsoft_http_requests_total", (
+            ("view", view), ("method", method), ("status", str(status)),
+        ))
+        histogram_key = ("vetsoft_http_request_duration_seconds", view_label)
+        bucket = bisect.bisect_left(BUCKETS, seconds)
+        counters = self.counters
+        with self.lock:
+            counters[request_key] = counters.get(request_key, 0) + 1
+            if status >= 500:
+                key = ("vetsoft_http_errors_total", view_label)
+                counters[key] = counters.get(key, 0) + 1
+            if queries:
+                key = ("vetsoft_db_queries_total", view_label)
+                counters[key] = counters.get(key, 0) + queries
+                key = ("vetsoft_db_query_seconds_total", view_label)
+                counters[key] = counters.get(key, 0) + sql_seconds
+            histogram = self.histograms.get(histogram_key)
+            if histogram is None:
+                histogram = self.histograms[histogram_key] = [0] * (len(BUCKETS) + 2)
+            histogram[bucket] += 1
+            histogram[-1] += seconds
+            self.dirty = True
+        if self.flusher is None:
+            self.start_flusher()
+
+    def gauges(self):
+        """Valores actuales de los gauges del proceso"""
+        open_connections = {}
+        for connection in list(self.connections):
+            if connection.connection is not None:
+                open_connections[connection.alias] = open_connections.get(connection.alias, 0) + 1
+        return {
+            ("vetsoft_db_connections_open", (("alias", alias),)): total
+            for alias, total in open_connections.items()
+        }
+
+    def snapshot(self):
+        """Copia serializable del registro, con los contadores del cache de fragmentos"""
+        # app.fragments importa los modelos; el master de gunicorn sin preload usa
+        # mark_process_dead sin cargar Django
+        from .fragments import stats as fragment_stats
+
+        self.check_fork()
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: list(values) for key, values in self.histograms.items()}
+        fragments = fragment_stats.as_dict()
+        counters[("vetsoft_fragment_cache_hits_total", ())] = fragments["hits"]
+        counters[("vetsoft_fragment_cache_misses_total", ())] = fragments["misses"]
+        return {
+            "pid": self.pid,
+            "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+            "histograms": [[name, labels, values] for (name, labels), values in histograms.items()],
+            "gauges": [[name, labels, value] for (name, labels), value in self.gauges().items()],
+        }
+
+    def start_flusher(self):
+        """
+        Arranca el thread que escribe el archivo del proceso. Se arranca con la primera
+        peticion y no antes, para que el master de gunicorn no lo tenga al forkear.
+        """
+        with self.lock:
+            if self.flusher is not None:
+                return
+            if not metrics_dir():
+                # un solo proceso: /metrics lee el registro en memoria
+                self.flusher = False
+                return
+            self.flusher = threading.Thread(
+                target=self.flush_periodically, name="vetsoft-metrics", daemon=True,
+            )
+        self.flusher.start()
+
+    def flush_periodically(self):
+        """Escribe el archivo cada METRICS_FLUSH_SECONDS si hubo cambios"""
+        while True:
+            time.sleep(flush_seconds())
+            if self.dirty:
+                self.flush()
+
+    def flush(self):
+        """Escribe METRICS_DIR/<pid>.json de forma atomica (archivo temporal y rename)"""
+        directory = metrics_dir()
+        if not directory:
+            return
+        self.dirty = False
+        os.makedirs(directory, exist_ok=True)
+        write_json(os.path.join(directory, f"{self.pid}.json"), self.snapshot())
+
+
+registry = Registry()
+
+
+def write_json(path, data):
+    """Escribe el archivo completo o nada: quien lee nunca ve uno a medio escribir"""
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(data, handle)
+    os.replace(temporary, path)
+
+
+def read_json(path):
+    """Lee un archivo de metricas; None si otro proceso lo borro mientras tanto"""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def process_alive(pid):
+    """Indica si el proceso existe"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def freeze(labels):
+    """Etiquetas leidas del JSON (listas) como tuplas, para usarlas de clave"""
+    return tuple(tuple(pair) for pair in labels)
+
+
+def merge(totals, snapshot, include_gauges=True):
+    """Suma un snapshot a los totales"""
+    for name, labels, value in snapshot["counters"]:
+        key = ("counters", name, freeze(labels))
+        totals[key] = totals.get(key, 0) + value
+    for name, labels, values in snapshot["histograms"]:
+        key = ("histograms", name, freeze(labels))
+        current = totals.setdefault(key, [0] * len(values))
+        for position, value in enumerate(values):
+            current[position] += value
+    if include_gauges:
+        for name, labels, value in snapshot.get("gauges", []):
+            key = ("gauges", name, freeze(labels))
+            totals[key] = totals.get(key, 0) + value
+
+
+def collect(directory=None):
+    """
+    Totales de todos los procesos: este proceso desde memoria y los demas desde sus
+    archivos. Los gauges solo se suman de los workers que siguen vivos.
+    """
+    directory = directory or metrics_dir()
+    totals = {}
+    own = registry.snapshot()
+    merge(totals, own)
+    if directory and os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            if filename == ARCHIVE:
+                snapshot = read_json(os.path.join(directory, filename))
+                if snapshot:
+                    merge(totals, snapshot, include_gauges=False)
+                continue
+            pid = int(filename.split(".")[0])
+            if pid == own["pid"]:
+                continue
+            snapshot = read_json(os.path.join(directory, filename))
+            if snapshot:
+                merge(totals, snapshot, include_gauges=process_alive(pid))
+    return totals
+
+
+def mark_process_dead(directory, pid):
+    """
+    Suma los contadores de un worker terminado a archive.json y borra su archivo.
+    Lo llama el master de gunicorn (child_exit), que es el unico que escribe el archivo.
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    snapshot = read_json(path)
+    if snapshot is None:
+        return
+    totals = {}
+    archive = read_json(os.path.join(directory, ARCHIVE))
+    if archive:
+        merge(totals, archive, include_gauges=False)
+    merge(totals, snapshot, include_gauges=False)
+    write_json(os.path.join(directory, ARCHIVE), {
+        "counters": [
+            [name, labels, value] for (kind, name, labels), value in totals.items()
+            if kind == "counters"
+        ],
+        "histograms": [
+            [name, labels, value] for (kind, name, labels), value in totals.items()
+            if kind == "histograms"
+        ],
+    })
+    os.remove(path)
+
+
+def format_labels(labels, extra=()):
+    """Etiquetas en el formato de texto de Prometheus"""
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def format_value(value):
+    """Numero en el formato de Prometheus, sin decimales si es entero"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(totals):
+    """Formato de texto 0.0.4 de Prometheus"""
+    by_name = {}
+    for (kind, name, labels), value in totals.items():
+        by_name.setdefault(name, []).append((labels, value))
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        series = by_name.get(name)
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series):
+            if kind != "histogram":
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*BUCKETS, "+Inf"), value[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(bound)
+                lines.append(
+                    f"{name}_bucket{format_labels(labels, (('le', le),))} {cumulative}",
+                )
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(value[-1])}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def track_connection(sender, connection, **kwargs):
+    """Receptor de connection_created: cuenta la conexion y la sigue para el gauge"""
+    registry.inc("vetsoft_db_connections_opened_total", (("alias", connection.alias),))
+    with registry.lock:
+        registry.connections.add(connection)
+
+
+def connect_signals():
+    """Conecta el receptor que cuenta las conexiones a la base"""
+    connection_created.connect(track_connection, dispatch_uid="metrics-connections")
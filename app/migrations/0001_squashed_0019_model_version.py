@@ -0,0 +1,158 @@
+# Generated by Django 5.0.4 on 2026-10-18 04:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Migracion inicial equivalente a 0001_initial..0019_model_version, para instalaciones
+# nuevas: crea cada tabla con su forma final en lugar de recorrer las 25 migraciones.
+# Las bases que ya aplicaron las originales la marcan como aplicada sin ejecutarla.
+# El indice del buscador es el de 0018_search_index. La copia de address a city de
+# 0014_rename_address_to_city se omite aca: en una base nueva no hay filas que copiar
+# y client se crea directamente con city. Las migraciones originales no se tocan.
+
+TABLE = "app_search_document"
+
+# modelo -> (campo del titulo, campos del cuerpo); mismo orden que app.search.SEARCHABLE
+DOCUMENTS = [
+    ("client", "name", ("email",)),
+    ("vet", "name", ("email",)),
+    ("provider", "name", ("email", "direccion")),
+    ("pet", "name", ("breed",)),
+    ("medicine", "name", ("description",)),
+    ("product", "name", ("type",)),
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Crea la tabla virtual FTS5 del buscador y la llena con las filas existentes"""
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                "title, body, kind UNINDEXED, object_id UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except Exception:
+            # SQLite compilado sin FTS5: app.search usa el indice en memoria
+            return
+        for position, (model_name, title, body_fields) in enumerate(DOCUMENTS):
+            model = apps.get_model("app", model_name)
+            table = model._meta.db_table
+            body = " || ' ' || ".join(f"COALESCE({field}, '')" for field in body_fields)
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, title, body, kind, object_id) "
+                f"SELECT id * {len(DOCUMENTS)} + {position}, {title}, {body}, "
+                f"'{model_name}', id FROM {table}"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    """Elimina la tabla virtual del buscador"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    replaces = [('app', '0001_initial'), ('app', '0002_client_delete_cliente'), ('app', '0003_vet'), ('app', '0004_product'), ('app', '0004_medicine'), ('app', '0004_pet'), ('app', '0005_merge_0004_pet_0004_product'), ('app', '0004_provider'), ('app', '0006_merge_0004_provider_0005_merge_0004_pet_0004_product'), ('app', '0007_pet_weight'), ('app', '0008_alter_pet_weight'), ('app', '0009_alter_pet_weight'), ('app', '0010_provider_direccion'), ('app', '0007_vet_speciality'), ('app', '0010_merge_0007_vet_speciality_0009_alter_pet_weight'), ('app', '0011_merge_20240523_2344'), ('app', '0011_alter_pet_breed_alter_vet_speciality'), ('app', '0012_merge_20240526_0017'), ('app', '0014_rename_address_to_city'), ('app', '0013_alter_provider_direccion'), ('app', '0015_merge_20240603_0011'), ('app', '0016_alter_client_city_alter_client_phone'), ('app', '0017_add_lookup_indexes'), ('app', '0018_search_index'), ('app', '0019_model_version')]
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Client',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('phone', models.IntegerField()),
+                ('email', models.EmailField(max_length=254)),
+                ('city', models.CharField(choices=[('La Plata', 'La Plata'), ('Berisso', 'Berisso'), ('Ensenada', 'Ensenada')], max_length=50)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name'], name='client_name_idx'), models.Index(django.db.models.functions.text.Lower('name'), name='client_name_lower_idx'), models.Index(fields=['email'], name='client_email_idx'), models.Index(fields=['city', 'name'], name='client_city_name_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Medicine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.CharField(max_length=300)),
+                ('dose', models.IntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name'], name='medicine_name_idx'), models.Index(django.db.models.functions.text.Lower('name'), name='medicine_name_lower_idx'), models.Index(fields=['dose'], name='medicine_dose_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Pet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('breed', models.CharField(choices=[('Labrador Retriever', 'Labrador Retriever'), ('Pastor Alemán', 'Pastor Aleman'), ('Golden Retriever', 'Golden Retriever'), ('Beagle', 'Beagle'), ('Boxer', 'Boxer'), ('Siamés', 'Siames'), ('Europeo', 'Europeo'), ('Persa', 'Persa'), ('Bengalí', 'Bengali'), ('Sphynx', 'Sphynx')], max_length=50)),
+                ('birthday', models.DateField()),
+                ('weight', models.DecimalField(decimal_places=2, default=0.0, max_digits=20)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name'], name='pet_name_idx'), models.Index(django.db.models.functions.text.Lower('name'), name='pet_name_lower_idx'), models.Index(fields=['birthday'], name='pet_birthday_idx'), models.Index(fields=['breed', 'birthday'], name='pet_breed_birthday_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('type', models.CharField(max_length=50)),
+                ('price', models.FloatField(max_length=20)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name'], name='product_name_idx'), models.Index(django.db.models.functions.text.Lower('name'), name='product_name_lower_idx'), models.Index(fields=['price'], name='product_price_idx'), models.Index(fields=['type', 'price'], name='product_type_price_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Provider',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('direccion', models.CharField(max_length=100)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name'], name='provider_name_idx'), models.Index(django.db.models.functions.text.Lower('name'), name='provider_name_lower_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Vet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=15)),
+                ('speciality', models.CharField(choices=[('General', 'General'), ('Dentista', 'Dentista'), ('Traumatología', 'Traumatologo'), ('Dermatología', 'Dermatologo'), ('Cardiología', 'Cardiologo')], default='General', max_length=50)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name'], name='vet_name_idx'), models.Index(django.db.models.functions.text.Lower('name'), name='vet_name_lower_idx'), models.Index(fields=['speciality', 'name'], name='vet_speciality_name_idx')],
+            },
+        ),
+        migrations.RunPython(
+            code=create_search_index,
+            reverse_code=drop_search_index,
+        ),
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+TABLE = "app_search_document"
+
+# modelo -> (campo del titulo, campos del cuerpo); mismo orden que app.search.SEARCHABLE
+DOCUMENTS = [
+    ("client", "name", ("email",)),
+    ("vet", "name", ("email",)),
+    ("provider", "name", ("email", "direccion")),
+    ("pet", "name", ("breed",)),
+    ("medicine", "name", ("description",)),
+    ("product", "name", ("type",)),
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Crea la tabla virtual FTS5 del buscador y la llena con las filas existentes"""
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                "title, body, kind UNINDEXED, object_id UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except Exception:
+            # SQLite compilado sin FTS5: app.search usa el indice en memoria
+            return
+        for position, (model_name, title, body_fields) in enumerate(DOCUMENTS):
+            model = apps.get_model("app", model_name)
+            table = model._meta.db_table
+            body = " || ' ' || ".join(f"COALESCE({field}, '')" for field in body_fields)
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, title, body, kind, object_id) "
+                f"SELECT id * {len(DOCUMENTS)} + {position}, {title}, {body}, "
+                f"'{model_name}', id FROM {table}"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    """Elimina la tabla virtual del buscador"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0017_add_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
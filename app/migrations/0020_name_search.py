@@ -0,0 +1,120 @@
+# Generated by Django 5.0.4 on 2026-10-18 04:55
+
+import unicodedata
+
+from django.db import migrations, models
+
+# name_search guarda el nombre en minusculas y sin acentos para el filtro por prefijo
+# de los repositorios (LOWER() de SQLite solo convierte letras ASCII). Reemplaza a los
+# indices sobre Lower(name) de 0017_add_lookup_indexes.
+
+MODELS = ["client", "vet", "provider", "pet", "medicine", "product"]
+
+
+def normalize(text):
+    """Copia de app.text.normalize, fija para esta migracion"""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def fill_name_search(apps, schema_editor):
+    """Completa name_search en las filas existentes"""
+    alias = schema_editor.connection.alias
+    for model_name in MODELS:
+        model = apps.get_model("app", model_name)
+        batch = []
+        for pk, name in model.objects.using(alias).values_list("id", "name").iterator(chunk_size=2000):
+            batch.append(model(id=pk, name_search=normalize(name)))
+            if len(batch) == 2000:
+                model.objects.using(alias).bulk_update(batch, ["name_search"])
+                batch = []
+        model.objects.using(alias).bulk_update(batch, ["name_search"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_squashed_0019_model_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='medicine',
+            name='medicine_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='pet_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='provider',
+            name='provider_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vet',
+            name='vet_name_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='provider',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='vet',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_name_search, migrations.RunPython.noop, elidable=True),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['name_search'], name='client_name_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['name_search'], name='medicine_name_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['name_search'], name='pet_name_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name_search'], name='product_name_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(fields=['name_search'], name='provider_name_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(fields=['name_search'], name='vet_name_search_idx'),
+        ),
+    ]
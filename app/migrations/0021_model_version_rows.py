@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_name_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modelversion',
+            name='counted_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='modelversion',
+            name='rows',
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+TABLE = "app_search_document"
+TITLE_TABLE = "app_search_title"
+
+
+def create_title_index(apps, schema_editor):
+    """
+    Crea la tabla FTS5 con solo los titulos, con el mismo rowid que el indice
+    principal. Buscar en el titulo con un filtro de columna recorre todas las
+    apariciones de la palabra, tambien las del cuerpo; en una tabla aparte solo
+    se leen las del titulo. prefix indexa los prefijos de 1 a 3 letras.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        if TABLE not in connection.introspection.table_names(cursor):
+            # SQLite sin FTS5: app.search usa el indice en memoria
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_TABLE} USING fts5("
+            "title, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')"
+        )
+        cursor.execute(f"INSERT INTO {TITLE_TABLE} (rowid, title) SELECT rowid, title FROM {TABLE}")
+
+
+def drop_title_index(apps, schema_editor):
+    """Elimina la tabla de titulos"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TITLE_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0021_model_version_rows"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_title_index, drop_title_index),
+    ]
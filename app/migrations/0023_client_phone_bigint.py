@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_search_title_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='phone',
+            field=models.BigIntegerField(),
+        ),
+    ]
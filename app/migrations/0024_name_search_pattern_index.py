@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# En PostgreSQL el filtro por prefijo (app.filters.name_prefix) usa LIKE 'prefijo%'.
+# Con un collation distinto de "C" el indice comun sobre name_search no sirve para
+# LIKE: hace falta uno con varchar_pattern_ops, que compara byte a byte.
+
+MODELS = ["client", "vet", "provider", "pet", "medicine", "product"]
+
+
+def create_pattern_indexes(apps, schema_editor):
+    """Crea un indice varchar_pattern_ops sobre name_search de cada modelo"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model in MODELS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {model}_name_search_like "
+            f"ON app_{model} (name_search varchar_pattern_ops)",
+        )
+
+
+def drop_pattern_indexes(apps, schema_editor):
+    """Elimina los indices varchar_pattern_ops"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model in MODELS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {model}_name_search_like")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0023_client_phone_bigint"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_pattern_indexes, drop_pattern_indexes),
+    ]
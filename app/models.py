@@ -4,9 +4,19 @@ from decimal import Decimal
 
 from django.db import models
 
+from .text import normalize
+
 
 def validate_client(data):
     """"Esta funcion valida los datos que se ingresan del cliente"""
+    return clean_client(data)[1]
+
+
+def clean_client(data):
+    """
+    Valida los datos del cliente y retorna (valores convertidos, errores); los
+    valores son None si hay errores
+    """
     errors = {}
 
     name = data.get("name", "")
@@ -41,10 +51,12 @@ def validate_client(data):
 
     if city == "" or city is None:
         errors["city"] = "Por favor ingrese una ciudad"
-    elif city not in dict(CityEnum.choices):
+    elif city not in CITY_VALUES:
         errors["city"] = "Ciudad no válida"
 
-    return errors
+    if errors:
+        return None, errors
+    return {"name": name, "phone": int(phone), "email": email, "city": city}, errors
 
 class CityEnum(models.TextChoices):
     """Ciudades de los clientes."""
@@ -52,6 +64,9 @@ class CityEnum(models.TextChoices):
     BERISSO = 'Berisso',
     ENSENADA = 'Ensenada',
 
+# valores validos precalculados para no reconstruir las choices en cada validacion
+CITY_VALUES = frozenset(CityEnum.values)
+
 def validate_phone_client(phone):
     """"
         esta funcion es para validar que el telefono comience con 54
@@ -91,13 +106,54 @@ def validate_client_char(name):
 
 
 
-class Client(models.Model):
+class NameSearchQuerySet(models.QuerySet):
+    """QuerySet que completa name_search tambien en bulk_create, que no llama a save()."""
+    def bulk_create(self, objs, *args, **kwargs):
+        """Normaliza el nombre de cada instancia antes de insertarlas"""
+        objs = list(objs)
+        for obj in objs:
+            obj.name_search = normalize(obj.name)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class NameSearchModel(models.Model):
+    """
+    Modelo con name_search: el nombre en minusculas y sin acentos, indexado, para
+    el filtro por prefijo de los repositorios. LOWER() de SQLite solo pasa a
+    minusculas las letras ASCII, asi que un indice sobre Lower(name) no encuentra
+    "Álvaro" ni "Ñato".
+    """
+    name_search = models.CharField(max_length=100, editable=False, default="")
+
+    objects = NameSearchQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Actualiza name_search con el nombre antes de guardar"""
+        self.name_search = normalize(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_search"}
+        super().save(*args, **kwargs)
+
+
+class Client(NameSearchModel):
     """Modelo de cliente para los clientes de la clínica."""
     name = models.CharField(max_length=100)
-    phone = models.IntegerField()
+    phone = models.BigIntegerField()
     email = models.EmailField()
     city = models.CharField(max_length=50, choices=CityEnum.choices)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="client_name_idx"),
+            models.Index(fields=["name_search"], name="client_name_search_idx"),
+            models.Index(fields=["email"], name="client_email_idx"),
+            models.Index(fields=["city", "name"], name="client_city_name_idx"),
+        ]
+
     def __str__(self):
         """"
         Retorna el nombre del cliente
@@ -154,15 +210,24 @@ class Speciality(models.TextChoices):
     DERMATOLOGO = "Dermatología"
     CARDIOLOGO = "Cardiología"
 
+SPECIALITY_VALUES = frozenset(Speciality.values)
+
 
 
-class Vet(models.Model):
+class Vet(NameSearchModel):
     """Modelo de veterinario para los veterinarios de la clínica."""
     name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=15)
     speciality = models.CharField(max_length=50, choices=Speciality.choices, default=Speciality.GENERAL)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="vet_name_idx"),
+            models.Index(fields=["name_search"], name="vet_name_search_idx"),
+            models.Index(fields=["speciality", "name"], name="vet_speciality_name_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -216,6 +281,14 @@ def validate_vet(data):
     """"
     Valida los datos de un veterinario
     """
+    return clean_vet(data)[1]
+
+
+def clean_vet(data):
+    """
+    Valida los datos del veterinario y retorna (valores convertidos, errores);
+    los valores son None si hay errores
+    """
     errors = {}
 
     name = data.get("name", "")
@@ -242,10 +315,12 @@ def validate_vet(data):
 
     if speciality == "" or speciality is None:
         errors["speciality"] = "Por favor ingrese una especialidad"
-    elif speciality not in dict(Speciality.choices):
+    elif speciality not in SPECIALITY_VALUES:
         errors["speciality"] = "Especialidad no válida"
 
-    return errors
+    if errors:
+        return None, errors
+    return {"name": name, "phone": phone, "email": email, "speciality": speciality}, errors
 
 def validate_phone(phone):
     """"Esta funcion valida el numero de telefono ingresado"""
@@ -264,6 +339,14 @@ def validate_phone(phone):
 
 def validate_provider(data):
     """"Esta funcion valida los datos que se ingresan del proveedor"""
+    return clean_provider(data)[1]
+
+
+def clean_provider(data):
+    """
+    Valida los datos del proveedor y retorna (valores convertidos, errores); los
+    valores son None si hay errores
+    """
     errors = {}
 
     name = data.get("name", "")
@@ -281,16 +364,24 @@ def validate_provider(data):
     if direccion == "":
        errors["direccion"] = "Por favor ingrese una direccion"
 
-    return errors
+    if errors:
+        return None, errors
+    return {"name": name, "email": email, "direccion": direccion}, errors
 
 
 
-class Provider(models.Model):
+class Provider(NameSearchModel):
     """Modelo de proveedor para los proveedores de la clínica."""
     name = models.CharField(max_length=100)
     email = models.EmailField()
     direccion = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="provider_name_idx"),
+            models.Index(fields=["name_search"], name="provider_name_search_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -331,6 +422,14 @@ class Provider(models.Model):
 
 def validate_pet(pet_data):
     """"Esta funcion valida los datos que se ingresan de la mascota"""
+    return clean_pet(pet_data)[1]
+
+
+def clean_pet(pet_data):
+    """
+    Valida los datos de la mascota y retorna (valores convertidos, errores): la
+    fecha ya parseada y el peso como Decimal, o None si hay errores
+    """
     errors = {}
     # valido que el nombre no este vacio ni sea null
     name = pet_data.get("name")
@@ -344,15 +443,16 @@ def validate_pet(pet_data):
 
     if breed == "" or breed is None:
         errors["breed"] = "La raza es requerida."
-    elif breed not in dict(Breed.choices):
+    elif breed not in BREED_VALUES:
         errors["breed"] = "La raza no es válida."
 
     # valido que la fecha de nacimiento no este vacia ni sea null
     birthday = pet_data.get("birthday")
+    birthday_date = parse_date(birthday)
 
     if not birthday or birthday is None:
         errors["birthday"] = "La fecha de nacimiento es requerida."
-    elif not parse_date(birthday):
+    elif not birthday_date:
         errors["birthday"] = "Formato de fecha incorrecto. Debe ser DD/MM/YYYY."
     if birthday == "":
         errors["birthday"] = "La fecha de nacimiento es requerida."
@@ -365,7 +465,10 @@ def validate_pet(pet_data):
         weight_error = validate_weight(weight)
         if weight_error:
             errors["weight"] = weight_error
-    return errors
+
+    if errors:
+        return None, errors
+    return {"name": name, "breed": breed, "birthday": birthday_date, "weight": Decimal(weight)}, errors
 
 
 def validate_weight(weight):
@@ -406,14 +509,24 @@ class Breed(models.TextChoices):
         BENGALI = 'Bengalí'
         SPHYNX = 'Sphynx'
 
+BREED_VALUES = frozenset(Breed.values)
+
 
-class Pet(models.Model):
+class Pet(NameSearchModel):
     """Clase modelo de mascota para las mascotas de la clínica."""
     name = models.CharField(max_length=100)
     breed = models.CharField(max_length=50, choices=Breed.choices)
     birthday = models.DateField()
     weight = models.DecimalField(max_digits=20, decimal_places=2, default=0.00)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="pet_name_idx"),
+            models.Index(fields=["name_search"], name="pet_name_search_idx"),
+            models.Index(fields=["birthday"], name="pet_birthday_idx"),
+            models.Index(fields=["breed", "birthday"], name="pet_breed_birthday_idx"),
+        ]
+
     def __str__(self):
         """"
         Retorna el nombre de la mascota
@@ -425,16 +538,11 @@ class Pet(models.Model):
         """"
         Guarda una mascota en la base de datos
         """
-        errors = validate_pet(pet_data)
+        cleaned, errors = clean_pet(pet_data)
         if errors:
             return False, errors
 
-        Pet.objects.create(
-            name=pet_data.get("name"),
-            breed=pet_data.get("breed"),
-            birthday=parse_date(pet_data.get("birthday")),
-            weight=Decimal(pet_data.get("weight")),
-        )
+        Pet.objects.create(**cleaned)
         """"
         Retorna True si no hay errores
         """
@@ -461,12 +569,19 @@ class Pet(models.Model):
         return True, None
 
 
-class Medicine(models.Model):
+class Medicine(NameSearchModel):
     """Clase modelo de medicina para las medicinas de la clínica."""
     name = models.CharField(max_length=100)
     description = models.CharField(max_length=300)
     dose = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="medicine_name_idx"),
+            models.Index(fields=["name_search"], name="medicine_name_search_idx"),
+            models.Index(fields=["dose"], name="medicine_dose_idx"),
+        ]
+
     def __str__(self):
         """"
         Retorna el nombre del medicamento
@@ -512,6 +627,14 @@ class Medicine(models.Model):
 
 def validate_medicine(data):
     """"Esta funcion valida los datos que se ingresan de la medicina"""
+    return clean_medicine(data)[1]
+
+
+def clean_medicine(data):
+    """
+    Valida los datos de la medicina y retorna (valores convertidos, errores); los
+    valores son None si hay errores
+    """
     errors = {}
 
     name = data.get("name", "")
@@ -529,17 +652,27 @@ def validate_medicine(data):
 
     if dose != "":
         try:
-            int(dose)
-            if int(dose) < 1 or int(dose) > 10:
+            dose = int(dose)
+            if dose < 1 or dose > 10:
                 errors["dose"] = "Por favor ingrese una dosis entre 1 y 10"
         except ValueError:
             errors["dose"] = "Por favor ingrese una dosis válida"
 
-    return errors
+    if errors:
+        return None, errors
+    return {"name": name, "description": description, "dose": dose}, errors
 
 
 def validate_product(data):
     """"Esta funcion valida los datos que se ingresan del producto"""
+    return clean_product(data)[1]
+
+
+def clean_product(data):
+    """
+    Valida los datos del producto y retorna (valores convertidos, errores); los
+    valores son None si hay errores
+    """
     errors = {}
 
     name = data.get("name", "")
@@ -561,7 +694,9 @@ def validate_product(data):
     except ValueError:
         errors["price"] = "Por favor ingrese un precio válido"
 
-    return errors
+    if errors:
+        return None, errors
+    return {"name": name, "type": type, "price": price}, errors
 
 def validate_price_format(price_str):
     """"Esta funcion valida el precio ingresado"""
@@ -570,12 +705,20 @@ def validate_price_format(price_str):
     return match is not None
 
 
-class Product(models.Model):
+class Product(NameSearchModel):
     """Clase modelo de producto para los productos de la clínica."""
     name = models.CharField(max_length=100)
     type = models.CharField(max_length=50)
     price = models.FloatField(max_length=20)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="product_name_idx"),
+            models.Index(fields=["name_search"], name="product_name_search_idx"),
+            models.Index(fields=["price"], name="product_price_idx"),
+            models.Index(fields=["type", "price"], name="product_type_price_idx"),
+        ]
+
     def __str__(self):
         """"
         Retorna el nombre del producto
@@ -602,12 +745,40 @@ class Product(models.Model):
 
     def update_product(self, product_data):
         """"
-        Actualiza los datos de un producto
+        Actualiza los datos de un producto; los campos vacios conservan su valor
         """
-        self.name = product_data.get("name", "") or self.name
-        self.type = product_data.get("type", "") or self.type
-        self.price = product_data.get("price", "") or self.price
+        cleaned, errors = clean_product({
+            "name": product_data.get("name", "") or self.name,
+            "type": product_data.get("type", "") or self.type,
+            "price": str(product_data.get("price", "") or self.price),
+        })
+        if errors:
+            return False, errors
+
+        self.name = cleaned["name"]
+        self.type = cleaned["type"]
+        self.price = cleaned["price"]
 
         self.save()
 
         return True, None
+
+
+class ModelVersion(models.Model):
+    """
+    Version de los datos de cada modelo, se incrementa en cada alta, edicion o
+    baja. La usan los repositorios para responder 304 Not Modified. Tambien
+    guarda la cantidad de filas del modelo, compartida por todos los workers;
+    rows es NULL mientras no se haya contado.
+    """
+    label = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    rows = models.BigIntegerField(null=True)
+    counted_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        """
+        Retorna el modelo y su version
+        """
+        return f"{self.label} v{self.version}"
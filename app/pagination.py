@@ -0,0 +1,226 @@
+import base64
+import json
+import math
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def serialize(value):
+    """Valor de una columna tal como se guarda en el JSON del cursor"""
+    if isinstance(value, (date, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    """Codifica los valores de la ultima fila en un token opaco para la url"""
+    raw = json.dumps([serialize(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, field=None):
+    """
+    Decodifica un token de cursor, retorna None si el token no es valido. El id
+    tiene que ser un entero y, si se pasa el campo ordenado, el valor tiene que
+    ser el que encode_cursor hubiera escrito para ese campo: un cursor adulterado
+    vuelve a la primera pagina en lugar de fallar dentro del ORM.
+    """
+    if not token:
+        return None
+    try:
+        padding = "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(token + padding))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != 2:
+        return None
+    value, pk = values
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        return None
+    if field is not None:
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            return None
+        try:
+            value = field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            return None
+        if serialize(value) != values[0]:
+            return None
+    return [value, pk]
+
+
+def get_page_size(request):
+    """Obtiene el tamaño de pagina pedido, acotado por el maximo configurado"""
+    default = getattr(settings, "PAGINATION_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    maximum = getattr(settings, "PAGINATION_MAX_PAGE_SIZE", MAX_PAGE_SIZE)
+    try:
+        size = int(request.GET.get("per_page", default))
+    except ValueError:
+        return default
+    return max(1, min(size, maximum))
+
+
+class KeysetPage:
+    """
+    Pagina de resultados obtenida con paginacion por cursor. El numero de pagina
+    viaja en la url y el total, si se conoce, lo calcula quien pagina.
+    """
+    def __init__(self, object_list, next_cursor, previous_cursor, querydict, number=1):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.querydict = querydict
+        self.number = number if previous_cursor is not None else 1
+        self.per_page = len(object_list)
+        self.total = None
+        self.total_is_exact = True
+
+    def set_count(self, total, exact=True, per_page=None):
+        """Registra el total de filas para mostrar "pagina X de Y" """
+        self.total = total
+        self.total_is_exact = exact
+        if per_page is not None:
+            self.per_page = per_page
+
+    @property
+    def num_pages(self):
+        """Cantidad de paginas segun el total, None si no se conoce"""
+        if self.total is None:
+            return None
+        return max(1, math.ceil(self.total / max(1, self.per_page)))
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        """Indica si existe una pagina siguiente"""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Indica si existe una pagina anterior"""
+        return self.previous_cursor is not None
+
+    def _url(self, param, cursor, number):
+        query = self.querydict.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        query[param] = cursor
+        query["page"] = number
+        return "?" + query.urlencode()
+
+    def next_url(self):
+        """Retorna la url de la pagina siguiente conservando los demas parametros"""
+        if self.next_cursor is None:
+            return None
+        return self._url("after", self.next_cursor, self.number + 1)
+
+    def previous_url(self):
+        """Retorna la url de la pagina anterior conservando los demas parametros"""
+        if self.previous_cursor is None:
+            return None
+        return self._url("before", self.previous_cursor, max(1, self.number - 1))
+
+
+class KeysetPaginator:
+    """
+    Paginador por cursor: cada pagina se obtiene con un WHERE sobre la columna
+    ordenada y el id, por lo que el costo no depende de la profundidad de la pagina.
+    """
+    def __init__(self, queryset, per_page=DEFAULT_PAGE_SIZE, ordering="id"):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.descending = ordering.startswith("-")
+        self.field = ordering.lstrip("-")
+
+    def _order_by(self, reverse):
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        if self.field == "id":
+            return [f"{prefix}id"]
+        return [f"{prefix}{self.field}", f"{prefix}id"]
+
+    def _seek(self, values, forward):
+        value, pk = values
+        operator = "gt" if forward != self.descending else "lt"
+        if self.field == "id":
+            return Q(**{f"id__{operator}": pk})
+        return Q(**{f"{self.field}__{operator}": value}) | Q(
+            **{self.field: value, f"id__{operator}": pk},
+        )
+
+    def _cursor(self, obj):
+        return encode_cursor([getattr(obj, self.field), obj.pk])
+
+    def page(self, after=None, before=None, querydict=None, number=1):
+        """Retorna la pagina que sigue a `after` o la que precede a `before`"""
+        field = self.queryset.model._meta.get_field(self.field)
+        after_values = decode_cursor(after, field)
+        before_values = decode_cursor(before, field)
+        backwards = before_values is not None and after_values is None
+
+        queryset = self.queryset
+        if backwards:
+            queryset = queryset.filter(self._seek(before_values, forward=False))
+        elif after_values is not None:
+            queryset = queryset.filter(self._seek(after_values, forward=True))
+
+        queryset = queryset.order_by(*self._order_by(reverse=backwards))
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next = True
+            has_previous = has_more
+        else:
+            has_next = has_more
+            has_previous = after_values is not None
+
+        next_cursor = self._cursor(rows[-1]) if rows and has_next else None
+        previous_cursor = self._cursor(rows[0]) if rows and has_previous else None
+        if querydict is None:
+            querydict = QueryDict()
+        return KeysetPage(rows, next_cursor, previous_cursor, querydict, number)
+
+
+def get_page_number(request):
+    """Numero de la pagina actual segun ?page=, solo se usa para mostrarlo"""
+    try:
+        return max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        return 1
+
+
+def paginate(request, queryset, orderings=("id",), count=None):
+    """
+    Pagina un queryset segun los parametros `after`, `before`, `per_page`,
+    `order` y `page` de la url. `orderings` lista las columnas indexadas
+    permitidas y `count` es un par (total, exacto) opcional para el encabezado.
+    """
+    ordering = request.GET.get("order", orderings[0])
+    if ordering.lstrip("-") not in [o.lstrip("-") for o in orderings]:
+        ordering = orderings[0]
+
+    per_page = get_page_size(request)
+    paginator = KeysetPaginator(queryset, per_page, ordering)
+    page = paginator.page(
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        querydict=request.GET,
+        number=get_page_number(request),
+    )
+    if count is not None:
+        page.set_count(*count, per_page=per_page)
+    return page
@@ -0,0 +1,328 @@
+import contextvars
+import hmac
+import json
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+# Perfilado por muestreo de peticiones en produccion. Mientras corre la vista, un
+# thread toma la pila del thread que la atiende cada PROFILING_INTERVAL_MS y cuenta
+# cuantas veces aparece cada pila. El resultado se guarda en PROFILING_DIR en formato
+# "collapsed" (una linea "frame;frame;frame cantidad" por pila), que leen
+# flamegraph.pl, speedscope y https://www.speedscope.app, junto a un .json con los
+# datos de la peticion que lista /admin/perfiles/.
+
+HEADER = "HTTP_X_VETSOFT_PROFILE"
+QUERY_PARAMETER = "__profile"
+DEFAULT_INTERVAL_MS = 1
+DEFAULT_KEEP = 200
+STDLIB = sysconfig.get_paths()["stdlib"]
+
+# el thread que muestrea necesita el GIL para leer las pilas: mientras haya un perfil
+# en curso se baja el intervalo de cambio de thread (5 ms por defecto) al intervalo
+# de muestreo. El cambio vale para todo el proceso, por eso nunca baja de
+# MIN_SWITCH_INTERVAL aunque PROFILING_INTERVAL_MS sea menor
+MIN_SWITCH_INTERVAL = 0.001
+_switch_lock = threading.Lock()
+_active = 0
+_switch_interval = None
+
+# perfil de la peticion en curso, para que los threads que atienden parte de la
+# peticion se sumen a los muestreados (ver bind_thread)
+_sampler = contextvars.ContextVar("profiling_sampler", default=None)
+
+
+def profiles_dir():
+    """Directorio donde se guardan los perfiles"""
+    return settings.PROFILING_DIR
+
+
+def interval_seconds():
+    """Segundos entre muestras"""
+    return getattr(settings, "PROFILING_INTERVAL_MS", DEFAULT_INTERVAL_MS) / 1000
+
+
+def requested(request):
+    """
+    Indica si la peticion pidio un perfil con el encabezado X-Vetsoft-Profile o con
+    ?__profile=, cuyo valor tiene que ser PROFILING_TOKEN
+    """
+    token = getattr(settings, "PROFILING_TOKEN", None)
+    if not token:
+        return False
+    value = request.META.get(HEADER) or request.GET.get(QUERY_PARAMETER)
+    return bool(value) and hmac.compare_digest(value.encode(), token.encode())
+
+
+def sampled():
+    """Elige al azar la fraccion PROFILING_SAMPLE_RATE de las peticiones"""
+    rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+    return rate > 0 and random.random() < rate
+
+
+def frame_name(code):
+    """
+    Nombre de un frame: funcion y archivo, relativo al proyecto, a site-packages o a
+    la biblioteca estandar
+    """
+    filename = code.co_filename
+    if "site-packages" in filename:
+        filename = filename.split("site-packages", 1)[1].lstrip(os.sep)
+    else:
+        for base in (str(settings.BASE_DIR), STDLIB):
+            if filename.startswith(base + os.sep):
+                filename = filename[len(base) + 1:]
+                break
+    return f"{code.co_qualname} ({filename})".replace(";", ":")
+
+
+def collapse(frame, root=None):
+    """Pila desde la raiz hasta `frame`, sin los frames de `root` para arriba"""
+    names = []
+    while frame is not None and frame is not root:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def lower_switch_interval(interval):
+    """Baja el intervalo de cambio de thread mientras haya perfiles en curso"""
+    global _active, _switch_interval
+    with _switch_lock:
+        if _active == 0:
+            _switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(_switch_interval, max(interval, MIN_SWITCH_INTERVAL)))
+        _active += 1
+
+
+def restore_switch_interval():
+    """Restaura el intervalo cuando termina el ultimo perfil"""
+    global _active
+    with _switch_lock:
+        _active -= 1
+        if _active == 0:
+            sys.setswitchinterval(_switch_interval)
+
+
+class StackSampler:
+    """
+    Muestrea la pila de los threads que atienden la peticion hasta stop(); los
+    demas threads del proceso, con otras peticiones, no se miran. `threads` son
+    sus ids y pueden sumarse mas con bind_thread mientras corre. `root` es el
+    frame desde donde se arma la pila: lo que esta por encima (el servidor y los
+    middlewares) es igual en todas las muestras y no aporta.
+    """
+    def __init__(self, threads, root=None, interval=None):
+        self.threads = set(threads)
+        self.root = root
+        self.interval = interval or interval_seconds()
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="vetsoft-profiler", daemon=True)
+
+    def start(self):
+        """Empieza a muestrear"""
+        lower_switch_interval(self.interval)
+        self.thread.start()
+
+    def stop(self):
+        """Deja de muestrear y espera al thread"""
+        self.stopped.set()
+        self.thread.join()
+        restore_switch_interval()
+
+    def run(self):
+        """Toma una muestra por intervalo"""
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            # tuple() copia el set sin soltar el GIL, aunque bind_thread lo modifique
+            for ident in tuple(self.threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapse(frame, self.root)] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Pilas en formato collapsed, de la mas frecuente a la menos"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common() if stack)
+
+
+def bind_thread():
+    """
+    Suma el thread actual a los muestreados si la peticion que lo usa se esta
+    perfilando. La llaman las vistas que pasan el trabajo a otro thread, como
+    app.async_views.in_thread_pool; el perfil llega por el contextvar, que
+    sync_to_async copia al thread.
+    """
+    sampler = _sampler.get()
+    if sampler is not None:
+        sampler.threads.add(threading.get_ident())
+
+
+async def view_thread(request):
+    """
+    Thread donde va a correr la vista bajo ASGI: el del event loop si es
+    asincronica y si no el thread sincronico de la peticion, que Django reserva
+    para ella con ThreadSensitiveContext y que usan sync_to_async con
+    thread_sensitive=True.
+    """
+    try:
+        view = resolve(request.path_info, getattr(request, "urlconf", None)).func
+    except Resolver404:
+        view = None
+    if view is not None and iscoroutinefunction(view):
+        return threading.get_ident()
+    return await sync_to_async(threading.get_ident)()
+
+
+def profiled_path(request):
+    """Ruta de la peticion sin ?__profile=, para no guardar el token en el perfil"""
+    query = request.GET.copy()
+    query.pop(QUERY_PARAMETER, None)
+    if not query:
+        return request.path
+    return f"{request.path}?{query.urlencode()}"
+
+
+def save(sampler, request, response, reason, seconds):
+    """Guarda el perfil y sus datos; retorna el nombre con que se guardo"""
+    directory = profiles_dir()
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    name = f"{now:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    match = request.resolver_match
+    with open(os.path.join(directory, f"{name}.collapsed"), "w") as handle:
+        handle.write(sampler.collapsed())
+    with open(os.path.join(directory, f"{name}.json"), "w") as handle:
+        json.dump({
+            "name": name,
+            "created": now.isoformat(),
+            "method": request.method,
+            "path": profiled_path(request),
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": round(seconds * 1000, 2),
+            "samples": sampler.samples,
+            "interval_ms": round(sampler.interval * 1000, 3),
+            "reason": reason,
+        }, handle)
+    prune(directory)
+    return name
+
+
+def prune(directory):
+    """Conserva solo los ultimos PROFILING_KEEP perfiles"""
+    keep = getattr(settings, "PROFILING_KEEP", DEFAULT_KEEP)
+    names = sorted(filename[:-5] for filename in os.listdir(directory) if filename.endswith(".json"))
+    for name in names[:-keep] if len(names) > keep else []:
+        for extension in (".json", ".collapsed"):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """Datos de los perfiles guardados, del mas nuevo al mas viejo"""
+    directory = profiles_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(directory), reverse=True):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as handle:
+                profiles.append(json.load(handle))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(name):
+    """Ruta del archivo collapsed de un perfil, o None si el nombre no es valido"""
+    if os.sep in name or name.startswith("."):
+        return None
+    path = os.path.join(profiles_dir(), f"{name}.collapsed")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    Perfila las peticiones elegidas por PROFILING_SAMPLE_RATE o pedidas con el
+    encabezado X-Vetsoft-Profile (o ?__profile=) igual a PROFILING_TOKEN. Va ultimo
+    en MIDDLEWARE, asi la pila empieza en la vista. La respuesta perfilada lleva el
+    encabezado X-Vetsoft-Profile-Id con el nombre del perfil guardado.
+    Bajo ASGI la vista corre en otro thread: se muestrea solo ese (ver view_thread).
+    Una vista asincronica comparte el thread del event loop con otras peticiones y
+    sus muestras pueden incluir las pilas de ellas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_TOKEN", None) and not getattr(
+            settings, "PROFILING_SAMPLE_RATE", 0,
+        ):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def reason(self, request):
+        """Por que se perfila la peticion, o None si no se perfila"""
+        if requested(request):
+            return "requested"
+        if sampled():
+            return "sampled"
+        return None
+
+    def __call__(self, request):
+        """Atiende la peticion, perfilandola si corresponde"""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        reason = self.reason(request)
+        if reason is None:
+            return self.get_response(request)
+        sampler = StackSampler({threading.get_ident()}, sys._getframe())
+        token = _sampler.set(sampler)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+            _sampler.reset(token)
+        return self.finish(sampler, request, response, reason, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        """Version asincronica de __call__ para ASGI"""
+        reason = self.reason(request)
+        if reason is None:
+            return await self.get_response(request)
+        sampler = StackSampler({await view_thread(request)})
+        token = _sampler.set(sampler)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+            _sampler.reset(token)
+        return self.finish(sampler, request, response, reason, time.perf_counter() - start)
+
+    def finish(self, sampler, request, response, reason, seconds):
+        """Guarda el perfil y lo informa en la respuesta"""
+        response["X-Vetsoft-Profile-Id"] = save(sampler, request, response, reason, seconds)
+        return response
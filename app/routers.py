@@ -0,0 +1,131 @@
+import contextvars
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE = "vetsoft_primary"
+DEFAULT_PIN_SECONDS = 10
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# True mientras se atiende una vista de solo lectura que puede leer de la replica
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+
+
+def read_only(view):
+    """
+    Marca una vista como de solo lectura: sus GET leen de la replica salvo que el
+    navegador haya escrito hace poco (ver ReplicaRoutingMiddleware).
+    """
+    view.read_only = True
+    return view
+
+
+def replica_configured():
+    """Indica si DATABASES tiene el alias de la replica"""
+    return REPLICA_ALIAS in connections.settings
+
+
+def use_replica():
+    """Indica si la peticion actual puede leer de la replica"""
+    return _use_replica.get()
+
+
+def pin_seconds():
+    """Segundos que un navegador lee del primario despues de escribir"""
+    return getattr(settings, "REPLICA_PIN_SECONDS", DEFAULT_PIN_SECONDS)
+
+
+def is_pinned(request):
+    """Indica si el navegador escribio hace menos de REPLICA_PIN_SECONDS"""
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class PrimaryReplicaRouter:
+    """
+    Router de bases: las escrituras y las migraciones van al primario y las
+    lecturas a la replica solo dentro de vistas de solo lectura. Dentro de una
+    transaccion del primario tambien se lee del primario.
+    """
+    def db_for_read(self, model, **hints):
+        """Replica para las vistas de solo lectura, primario para el resto"""
+        if (
+            use_replica()
+            and replica_configured()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Las escrituras siempre van al primario"""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Primario y replica tienen los mismos datos"""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """La replica recibe el esquema por replicacion, no por migraciones"""
+        return db != REPLICA_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide por peticion si se lee de la replica: solo en GET/HEAD a vistas
+    marcadas con @read_only. Despues de un POST (alta, edicion o baja) el
+    navegador queda fijado al primario por REPLICA_PIN_SECONDS con una cookie,
+    asi el redirect al repositorio muestra el cambio aunque la replica no lo
+    haya recibido todavia.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Atiende la peticion y fija al primario a quien acaba de escribir"""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        """Version asincronica de __call__ para ASGI"""
+        token = _use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin_after_write(request, response)
+
+    def pin_after_write(self, request, response):
+        """Despues de un POST el navegador lee del primario por REPLICA_PIN_SECONDS"""
+        if request.method not in SAFE_METHODS:
+            seconds = pin_seconds()
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + seconds), max_age=seconds,
+                httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Habilita la replica para las vistas de solo lectura"""
+        if (
+            getattr(view_func, "read_only", False)
+            and request.method in SAFE_METHODS
+            and not is_pinned(request)
+        ):
+            _use_replica.set(True)
@@ -0,0 +1,549 @@
+import heapq
+import re
+import sys
+import threading
+from bisect import bisect_left, insort
+from collections import namedtuple
+from itertools import chain
+
+from django.conf import settings
+from django.db import OperationalError, connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+
+from .models import Client, Medicine, ModelVersion, Pet, Product, Provider, Vet
+from .signals import bulk_created
+from .text import normalize
+from .versions import get_versions
+
+TABLE = "app_search_document"
+TITLE_TABLE = "app_search_title"
+DEFAULT_LIMIT = 20
+DEFAULT_MAX_RANKED = 200
+TITLE_WEIGHT = 10.0
+# el indice en memoria intersecta con sets las palabras de una busqueda si la
+# menos comun esta en hasta INTERSECT_MAX documentos y las otras en no mas de
+# INTERSECT_RATIO veces esa cantidad; si no, recorre la menos comun
+INTERSECT_MAX = 100000
+INTERSECT_RATIO = 4
+
+# modelo -> (etiqueta, campo del titulo, campos del cuerpo, url de edicion)
+SEARCHABLE = {
+    Client: ("Cliente", "name", ("email",), "clients_edit"),
+    Vet: ("Veterinario", "name", ("email",), "vets_edit"),
+    Provider: ("Proveedor", "name", ("email", "direccion"), "providers_edit"),
+    Pet: ("Mascota", "name", ("breed",), "pets_edit"),
+    Medicine: ("Medicina", "name", ("description",), "medicines_edit"),
+    Product: ("Producto", "name", ("type",), "products_edit"),
+}
+KINDS = tuple(model._meta.model_name for model in SEARCHABLE)
+MODELS_BY_KIND = {model._meta.model_name: model for model in SEARCHABLE}
+KIND_CHOICES = [(model._meta.model_name, spec[0]) for model, spec in SEARCHABLE.items()]
+
+SearchResult = namedtuple("SearchResult", "kind label object_id title detail url")
+
+
+class SearchResults(list):
+    """
+    Resultados de una busqueda. `truncated` indica que en el ultimo nivel que se
+    consulto habia mas de SEARCH_MAX_RANKED coincidencias y solo se ordenaron
+    las mas recientes.
+    """
+    truncated = False
+
+
+def tokenize(text):
+    """Separa un texto normalizado en palabras"""
+    return re.findall(r"\w+", normalize(text))
+
+
+def document_for(model, values):
+    """Arma (titulo, cuerpo) a partir de un diccionario con los campos del modelo"""
+    _, title_field, body_fields, _ = SEARCHABLE[model]
+    body = " ".join(str(values[field]) for field in body_fields if values[field])
+    return str(values[title_field]), body
+
+
+def searchable_fields(model):
+    """Campos de un modelo que forman su documento"""
+    _, title_field, body_fields, _ = SEARCHABLE[model]
+    return (title_field, *body_fields)
+
+
+def document_rowid(kind, object_id):
+    """rowid unico de un documento, combinando el id del objeto y su tipo"""
+    return object_id * len(KINDS) + KINDS.index(kind)
+
+
+def document_score(tokens, title, body):
+    """Puntaje de un documento: palabras buscadas que son prefijo en el titulo y en el cuerpo"""
+    def hits(text):
+        words = tokenize(text)
+        return sum(any(word.startswith(token) for word in words) for token in tokens)
+
+    return hits(title) * TITLE_WEIGHT + hits(body)
+
+
+def build_result(kind, object_id, title, body):
+    """Arma un resultado con la etiqueta del tipo y la url de edicion"""
+    label, _, _, url_name = SEARCHABLE[MODELS_BY_KIND[kind]]
+    url = reverse(url_name, kwargs={"id": object_id})
+    return SearchResult(kind, label, object_id, title, body, url)
+
+
+def iter_documents(model, chunk_size=2000):
+    """Itera (id, titulo, cuerpo) de todas las filas de un modelo"""
+    fields = ("id", *searchable_fields(model))
+    using = router.db_for_write(model)
+    rows = model.objects.using(using).values(*fields).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield (row["id"], *document_for(model, row))
+
+
+# niveles de relevancia: (solo en el titulo, como prefijo)
+LEVELS = ((True, False), (True, True), (False, False), (False, True))
+
+
+def search_levels(backend, tokens, kind, limit):
+    """
+    Busca por niveles de relevancia: las palabras completas en el titulo, como
+    prefijo en el titulo, completas en cualquier campo y como prefijo en
+    cualquier campo. Se pasa al nivel siguiente solo si faltan resultados, asi
+    una coincidencia en el titulo nunca queda afuera por otras mas nuevas en el
+    cuerpo. Dentro de un nivel se ordenan por coincidencias en el titulo y en el
+    cuerpo a lo sumo SEARCH_MAX_RANKED candidatos, los mas recientes, para que
+    una palabra que esta en todos los documentos no recorra el indice entero.
+    """
+    results = SearchResults()
+    if not tokens:
+        return results
+    max_ranked = getattr(settings, "SEARCH_MAX_RANKED", DEFAULT_MAX_RANKED)
+    seen = set()
+    for title_only, prefix in LEVELS:
+        candidates = backend.candidates(tokens, title_only, prefix, kind, max_ranked)
+        results.truncated = len(candidates) == max_ranked
+        candidates = [row for row in candidates if row[:2] not in seen]
+        candidates.sort(key=lambda row: -document_score(tokens, row[2], row[3]))
+        for row in candidates[:limit - len(results)]:
+            seen.add(row[:2])
+            results.append(build_result(*row))
+        if len(results) == limit:
+            break
+    return results
+
+
+class FTS5Backend:
+    """
+    Indice invertido en tablas virtuales FTS5 de SQLite: app_search_document con
+    el titulo y el cuerpo, y app_search_title solo con el titulo y el mismo rowid.
+    """
+    name = "fts5"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        """Conexion de la base donde viven las tablas virtuales"""
+        return connections[self.alias]
+
+    def index(self, kind, object_id, title, body):
+        """Agrega o reemplaza un documento"""
+        self.index_many(kind, [(object_id, title, body)])
+
+    def index_many(self, kind, documents):
+        """Agrega o reemplaza varios documentos (id, titulo, cuerpo) de un tipo"""
+        rows = [
+            (document_rowid(kind, object_id), title, body, kind, object_id)
+            for object_id, title, body in documents
+        ]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {TABLE} (rowid, title, body, kind, object_id) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {TITLE_TABLE} (rowid, title) VALUES (%s, %s)",
+                [row[:2] for row in rows],
+            )
+
+    def remove(self, kind, object_id):
+        """Quita un documento del indice"""
+        rowid = document_rowid(kind, object_id)
+        with self.connection.cursor() as cursor:
+            for table in (TABLE, TITLE_TABLE):
+                cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [rowid])
+
+    def clear(self):
+        """Vacia el indice"""
+        with self.connection.cursor() as cursor:
+            for table in (TABLE, TITLE_TABLE):
+                cursor.execute(f"DELETE FROM {table}")
+
+    def candidates(self, tokens, title_only, prefix, kind, max_ranked):
+        """Las `max_ranked` coincidencias mas recientes de un nivel de busqueda"""
+        table = TITLE_TABLE if title_only else TABLE
+        suffix = "*" if prefix else ""
+        sql = f"SELECT rowid FROM {table} WHERE {table} MATCH %s"
+        params = [" ".join(f'"{token}"{suffix}' for token in tokens)]
+        if kind:
+            # el rowid codifica el tipo, asi no hace falta leer la columna kind
+            sql += f" AND rowid %% {len(KINDS)} = %s"
+            params.append(KINDS.index(kind))
+        sql += " ORDER BY rowid DESC LIMIT %s"
+        params.append(max_ranked)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT d.kind, d.object_id, d.title, d.body FROM ({sql}) AS m "
+                f"JOIN {TABLE} AS d ON d.rowid = m.rowid",
+                params,
+            )
+            return cursor.fetchall()
+
+    def search(self, query, kind=None, limit=DEFAULT_LIMIT):
+        """
+        Busca documentos que contengan todas las palabras como prefijo. bm25 no
+        sirve para ordenar: tiene que recorrer todas las coincidencias y con 1M
+        documentos tarda segundos; ver search_levels.
+        """
+        return search_levels(self, tokenize(query), kind, limit)
+
+
+class WordIndex:
+    """
+    Palabras -> rowids de los documentos que las contienen, en listas ordenadas
+    para recorrerlas de la mas reciente a la mas vieja. Las palabras tambien se
+    guardan en una lista ordenada para resolver prefijos con bisect.
+    """
+    def __init__(self):
+        self.rowids = {}
+        self.words = []
+
+    def add(self, word, rowid, keep_sorted=True):
+        """Agrega un documento a la lista de una palabra"""
+        rowids = self.rowids.get(word)
+        if rowids is None:
+            rowids = self.rowids[word] = []
+            if keep_sorted:
+                insort(self.words, word)
+        if keep_sorted:
+            insort(rowids, rowid)
+        else:
+            rowids.append(rowid)
+
+    def remove(self, word, rowid):
+        """Quita un documento de la lista de una palabra"""
+        rowids = self.rowids[word]
+        del rowids[bisect_left(rowids, rowid)]
+        if not rowids:
+            del self.rowids[word]
+            del self.words[bisect_left(self.words, word)]
+
+    def sort(self):
+        """Ordena todo lo agregado con keep_sorted=False"""
+        self.words = sorted(self.rowids)
+        for rowids in self.rowids.values():
+            rowids.sort()
+
+    def lookup(self, token, prefix):
+        """Listas de rowids de la palabra o de todas las que empiezan con ella"""
+        if not prefix:
+            return [self.rowids[token]] if token in self.rowids else []
+        start = bisect_left(self.words, token)
+        end = bisect_left(self.words, token + "\uffff", lo=start)
+        return [self.rowids[word] for word in self.words[start:end]]
+
+
+class MemoryBackend:
+    """
+    Indice invertido en memoria para motores sin FTS5, con los mismos niveles de
+    busqueda que FTS5: un WordIndex para los titulos y otro para todas las
+    palabras. Cada worker tiene el suyo: `versions` guarda la version de cada
+    modelo (ModelVersion) que refleja el indice, y si en la base es otra es que
+    otro worker cambio datos y el indice se vuelve a cargar.
+    """
+    name = "memory"
+
+    def __init__(self):
+        # rowid -> (tipo, id, titulo, cuerpo, palabras del titulo, todas las palabras)
+        self.documents = {}
+        self.titles = WordIndex()
+        self.words = WordIndex()
+        self.versions = {}
+        self.loaded = False
+        self.refreshing = False
+        # cambios que llegan mientras se arma el indice nuevo, para aplicarlos
+        # tambien sobre el: _add y _remove son idempotentes
+        self.pending = []
+        self.lock = threading.RLock()
+
+    def _add(self, kind, object_id, title, body, keep_sorted=True):
+        rowid = document_rowid(kind, object_id)
+        self._remove(rowid)
+        title_words = tuple(dict.fromkeys(map(sys.intern, tokenize(title))))
+        words = tuple(dict.fromkeys(title_words + tuple(map(sys.intern, tokenize(body)))))
+        for word in title_words:
+            self.titles.add(word, rowid, keep_sorted)
+        for word in words:
+            self.words.add(word, rowid, keep_sorted)
+        self.documents[rowid] = (kind, object_id, title, body, title_words, words)
+
+    def _remove(self, rowid):
+        document = self.documents.pop(rowid, None)
+        if document is None:
+            return
+        for word in document[4]:
+            self.titles.remove(word, rowid)
+        for word in document[5]:
+            self.words.remove(word, rowid)
+
+    def _changed(self, kind):
+        # cada senal que llega aca tambien incrementa la version del modelo en
+        # app.versions, asi los cambios de este worker no fuerzan una recarga
+        model = MODELS_BY_KIND[kind]
+        self.versions[model] = self.versions.get(model, 0) + 1
+
+    def _apply(self, method, *args):
+        if self.refreshing:
+            self.pending.append((method, args))
+        getattr(self, method)(*args)
+
+    @staticmethod
+    def current_versions():
+        """Version de cada modelo en la base de donde se carga el indice"""
+        return get_versions(SEARCHABLE, using=router.db_for_write(ModelVersion))
+
+    @classmethod
+    def build(cls):
+        """Arma un indice nuevo desde la base, sin tocar el que esta en uso"""
+        fresh = cls()
+        # las versiones se leen antes que las filas: si algo cambia mientras se
+        # carga, la proxima busqueda lo detecta y vuelve a cargar
+        fresh.versions = cls.current_versions()
+        for model in SEARCHABLE:
+            kind = model._meta.model_name
+            for object_id, title, body in iter_documents(model):
+                fresh._add(kind, object_id, title, body, keep_sorted=False)
+        fresh.titles.sort()
+        fresh.words.sort()
+        return fresh
+
+    def _swap(self, fresh):
+        with self.lock:
+            pending, self.pending = self.pending, []
+            for method, args in pending:
+                getattr(fresh, method)(*args)
+            self.documents = fresh.documents
+            self.titles = fresh.titles
+            self.words = fresh.words
+            self.versions = fresh.versions
+            self.loaded = True
+
+    def ensure_loaded(self):
+        """Carga el indice desde la base la primera vez que se usa"""
+        if self.loaded:
+            return
+        with self.lock:
+            if not self.loaded:
+                self._swap(self.build())
+
+    def ensure_fresh(self):
+        """
+        Carga el indice o lo recarga si otro worker cambio algun modelo. La
+        recarga la hace un solo thread fuera del lock y mientras tanto los demas
+        siguen buscando en el indice anterior.
+        """
+        if not self.loaded:
+            self.ensure_loaded()
+            return
+        current = self.current_versions()
+        with self.lock:
+            if self.refreshing or current == self.versions:
+                return
+            self.refreshing = True
+        try:
+            self._swap(self.build())
+        finally:
+            with self.lock:
+                self.refreshing = False
+                self.pending = []
+
+    def index(self, kind, object_id, title, body):
+        """Agrega o reemplaza un documento"""
+        self.index_many(kind, [(object_id, title, body)])
+
+    def index_many(self, kind, documents):
+        """Agrega o reemplaza varios documentos (id, titulo, cuerpo) de un tipo"""
+        if not self.loaded:
+            return
+        with self.lock:
+            for object_id, title, body in documents:
+                self._apply("_add", kind, object_id, title, body)
+            self._apply("_changed", kind)
+
+    def remove(self, kind, object_id):
+        """Quita un documento del indice"""
+        if not self.loaded:
+            return
+        with self.lock:
+            self._apply("_remove", document_rowid(kind, object_id))
+            self._apply("_changed", kind)
+
+    def clear(self):
+        """Vacia el indice; se vuelve a cargar en la proxima busqueda"""
+        with self.lock:
+            self.documents = {}
+            self.titles = WordIndex()
+            self.words = WordIndex()
+            self.versions = {}
+            self.loaded = False
+            self.pending = []
+
+    def candidates(self, tokens, title_only, prefix, kind, max_ranked):
+        """
+        Las `max_ranked` coincidencias mas recientes de un nivel de busqueda. Se
+        recorre de la mas nueva a la mas vieja la palabra con menos documentos,
+        o su interseccion con las otras si son pocos, y se revisan las demas en
+        las palabras de cada documento.
+        """
+        index = self.titles if title_only else self.words
+        field = 4 if title_only else 5
+        lookups = [index.lookup(token, prefix) for token in tokens]
+        if not all(lookups):
+            return []
+        lookups.sort(key=lambda lists: sum(map(len, lists)))
+        size = sum(map(len, lookups[0]))
+        narrow = [lists for lists in lookups[1:] if sum(map(len, lists)) <= INTERSECT_RATIO * size]
+        if narrow and size <= INTERSECT_MAX:
+            # varias palabras poco comunes: intersectar con sets evita revisar uno
+            # por uno documentos que casi nunca tienen todas
+            found = set(chain.from_iterable(lookups[0]))
+            for lists in narrow:
+                found.intersection_update(chain.from_iterable(lists))
+            rowids = sorted(found, reverse=True)
+        else:
+            # las listas estan ordenadas: con varias palabras del prefijo se
+            # mezclan y un documento que tiene mas de una aparece seguido
+            rowids = heapq.merge(*map(reversed, lookups[0]), reverse=True)
+        modulo = KINDS.index(kind) if kind else None
+        rows = []
+        previous = None
+        for rowid in rowids:
+            if rowid == previous or (kind and rowid % len(KINDS) != modulo):
+                continue
+            previous = rowid
+            document = self.documents[rowid]
+            words = document[field]
+            if all(
+                any(word.startswith(token) for word in words) if prefix else token in words
+                for token in tokens
+            ):
+                rows.append(document[:4])
+                if len(rows) == max_ranked:
+                    break
+        return rows
+
+    def search(self, query, kind=None, limit=DEFAULT_LIMIT):
+        """Busca documentos que contengan todas las palabras como prefijo; ver search_levels"""
+        tokens = tokenize(query)
+        if not tokens:
+            return SearchResults()
+        self.ensure_fresh()
+        with self.lock:
+            return search_levels(self, tokens, kind, limit)
+
+
+def fts5_available(alias="default"):
+    """Indica si la base tiene creadas las tablas virtuales FTS5 del buscador"""
+    connection = connections[alias]
+    if connection.vendor != "sqlite":
+        return False
+    try:
+        with connection.cursor() as cursor:
+            tables = connection.introspection.table_names(cursor)
+            return TABLE in tables and TITLE_TABLE in tables
+    except OperationalError:
+        return False
+
+
+_backend = None
+
+
+def get_backend():
+    """
+    Retorna el backend del buscador: FTS5 si la base lo soporta o el indice en
+    memoria en otro caso. SEARCH_BACKEND permite forzar uno de los dos.
+    """
+    global _backend
+    if _backend is None:
+        choice = getattr(settings, "SEARCH_BACKEND", "auto")
+        alias = router.db_for_write(Client)
+        if choice == "fts5" or (choice == "auto" and fts5_available(alias)):
+            _backend = FTS5Backend(alias)
+        else:
+            _backend = MemoryBackend()
+    return _backend
+
+
+def reset_backend():
+    """Olvida el backend elegido, para volver a detectarlo"""
+    global _backend
+    _backend = None
+
+
+def search(query, kind=None, limit=DEFAULT_LIMIT):
+    """Busca en todas las entidades y retorna resultados ordenados por relevancia"""
+    if kind and kind not in MODELS_BY_KIND:
+        kind = None
+    return get_backend().search(query, kind=kind, limit=limit)
+
+
+def rebuild():
+    """Reconstruye el indice completo desde las tablas de los modelos"""
+    backend = get_backend()
+    if isinstance(backend, MemoryBackend):
+        backend.clear()
+        backend.ensure_loaded()
+        return
+    # una sola transaccion: en autocommit SQLite confirma cada fila por separado
+    with transaction.atomic(using=backend.alias):
+        backend.clear()
+        for model in SEARCHABLE:
+            batch = []
+            for document in iter_documents(model):
+                batch.append(document)
+                if len(batch) == 2000:
+                    backend.index_many(model._meta.model_name, batch)
+                    batch = []
+            backend.index_many(model._meta.model_name, batch)
+
+
+def index_instance(sender, instance, **kwargs):
+    """Receptor de post_save: actualiza el documento de la instancia"""
+    values = {field: getattr(instance, field) for field in searchable_fields(sender)}
+    get_backend().index(sender._meta.model_name, instance.pk, *document_for(sender, values))
+
+
+def remove_instance(sender, instance, **kwargs):
+    """Receptor de post_delete: quita el documento de la instancia"""
+    get_backend().remove(sender._meta.model_name, instance.pk)
+
+
+def index_bulk(sender, objs, **kwargs):
+    """Receptor de bulk_created: indexa las instancias creadas en lote"""
+    fields = searchable_fields(sender)
+    documents = [
+        (obj.pk, *document_for(sender, {field: getattr(obj, field) for field in fields}))
+        for obj in objs if obj.pk is not None
+    ]
+    get_backend().index_many(sender._meta.model_name, documents)
+
+
+def connect_signals():
+    """Conecta los receptores que mantienen el indice sincronizado con los modelos"""
+    for model in SEARCHABLE:
+        uid = f"search-{model._meta.model_name}"
+        post_save.connect(index_instance, sender=model, dispatch_uid=uid)
+        post_delete.connect(remove_instance, sender=model, dispatch_uid=uid)
+        bulk_created.connect(index_bulk, sender=model, dispatch_uid=uid)
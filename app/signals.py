@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# bulk_create no dispara post_save; quien inserte filas en lote envia esta senal
+# con sender=<modelo> y objs=<instancias creadas> para mantener al dia los
+# indices y contadores que dependen de post_save/post_delete.
+bulk_created = Signal()
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.backends.signals import connection_created
+
+from .instrumentation import current_metrics
+
+logger = logging.getLogger("app.slow_queries")
+
+# Log de consultas lentas: un execute wrapper mide cada consulta y las que superan
+# SLOW_QUERY_MS se escriben en SLOW_QUERY_LOG (una linea JSON por consulta, archivo
+# rotado por tamano) con sus parametros, la vista que la hizo y el plan de la base.
+# `manage.py slow_queries` agrupa el log por consulta normalizada.
+
+DEFAULT_THRESHOLD_MS = 100
+MAX_PARAM_LENGTH = 200
+MAX_PARAMS = 20
+# solo se explican consultas que EXPLAIN no ejecuta ni puede hacer fallar a la
+# transaccion; en PostgreSQL un error aborta la transaccion en curso
+EXPLAINABLE = {
+    "sqlite": ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"),
+    "postgresql": ("SELECT", "WITH"),
+}
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+REPEATED_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def threshold_ms():
+    """Milisegundos desde los que una consulta es lenta; 0 desactiva el log"""
+    return getattr(settings, "SLOW_QUERY_MS", DEFAULT_THRESHOLD_MS)
+
+
+def normalize(sql):
+    """
+    Consulta sin los valores que cambian entre ejecuciones: literales, LIMIT/OFFSET,
+    el largo de las listas de IN y la cantidad de filas de un INSERT con varios
+    VALUES, para agrupar las que son la misma consulta
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = REPEATED_LIST.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    """Identificador corto de la consulta normalizada"""
+    return hashlib.sha1(normalize(sql).encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def explain(connection, sql, params):
+    """
+    Plan de la consulta: EXPLAIN QUERY PLAN en SQLite y EXPLAIN en PostgreSQL. Usa un
+    cursor propio del driver, sin pasar por los execute wrappers, para no contar el
+    EXPLAIN como una consulta de la peticion. Retorna None si no se puede explicar.
+    """
+    vendor = connection.vendor
+    if not sql.lstrip().upper().startswith(EXPLAINABLE.get(vendor, ())):
+        return None
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(EXPLAIN_PREFIX[vendor] + sql, params)
+        rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    finally:
+        cursor.close()
+    if vendor == "sqlite":
+        # (id, padre, sin uso, detalle)
+        return [detail for *_, detail in rows]
+    return [row[0] for row in rows]
+
+
+def printable(params):
+    """
+    Parametros como texto, recortados para que una fila grande o un INSERT de
+    muchas filas no llenen el log
+    """
+    if params is None:
+        return None
+    values = list(params.values() if isinstance(params, dict) else params)
+    result = []
+    for value in values[:MAX_PARAMS]:
+        text = value if isinstance(value, str) else repr(value)
+        result.append(text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + "...")
+    if len(values) > MAX_PARAMS:
+        result.append(f"... ({len(values) - MAX_PARAMS} mas)")
+    return result
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """Execute wrapper: escribe en el log las consultas que superan SLOW_QUERY_MS"""
+    threshold = threshold_ms()
+    if not threshold:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= threshold:
+            record(context["connection"], sql, params, many, elapsed_ms)
+
+
+def record(connection, sql, params, many, elapsed_ms):
+    """Escribe una consulta lenta en el log"""
+    metrics = current_metrics()
+    request = metrics.request if metrics else None
+    match = request.resolver_match if request else None
+    logger.warning(json.dumps({
+        "time": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(elapsed_ms, 2),
+        "alias": connection.alias,
+        "vendor": connection.vendor,
+        "view": match.view_name if match else None,
+        "path": request.path if request else None,
+        "fingerprint": fingerprint(sql),
+        "sql": sql,
+        "params": None if many else printable(params),
+        "plan": None if many else explain(connection, sql, params),
+    }, default=str))
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """
+    Receptor de connection_created: agrega log_slow_query primero en la lista, asi
+    envuelve a los demas y el tiempo del EXPLAIN no se suma a las metricas
+    """
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_query)
+
+
+def connect_signals():
+    """Conecta el receptor que instala el log de consultas lentas en cada conexion"""
+    connection_created.connect(install_slow_query_log, dispatch_uid="slow-queries")
+
+
+def read_log(paths):
+    """Entradas del log, de los archivos rotados y del actual"""
+    entries = []
+    for path in paths:
+        try:
+            with open(path) as handle:
+                for line in handle:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return entries
+
+
+def log_paths(path, backups):
+    """El log y sus copias rotadas (path.1, path.2...), de la mas vieja a la actual"""
+    return [f"{path}.{number}" for number in range(backups, 0, -1)] + [path]
+
+
+def percentile(values, fraction):
+    """Percentil por rango mas cercano de una lista ordenada"""
+    return values[max(math.ceil(len(values) * fraction) - 1, 0)]
+
+
+def summarize(entries):
+    """
+    Agrupa las entradas por fingerprint. Retorna una lista de dicts con cantidad,
+    tiempo total, promedio, p95 y maximo, las vistas y la consulta y el plan de la
+    ejecucion mas lenta
+    """
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry["fingerprint"], []).append(entry)
+    summary = []
+    for key, group in groups.items():
+        durations = sorted(entry["duration_ms"] for entry in group)
+        slowest = max(group, key=lambda entry: entry["duration_ms"])
+        summary.append({
+            "fingerprint": key,
+            "count": len(group),
+            "total_ms": round(sum(durations), 2),
+            "mean_ms": round(sum(durations) / len(durations), 2),
+            "p95_ms": percentile(durations, 0.95),
+            "max_ms": durations[-1],
+            "views": sorted({entry["view"] or "-" for entry in group}),
+            "sql": normalize(slowest["sql"]),
+            "slowest": slowest,
+        })
+    return summary
@@ -0,0 +1,60 @@
+import fcntl
+import logging
+import os
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+logger = logging.getLogger(__name__)
+
+LOCK_PATH = os.path.join(tempfile.gettempdir(), "vetsoft-migrate.lock")
+
+# Arranque del contenedor: la imagen ya no trae una base migrada, asi que el proceso
+# que arranca gunicorn aplica las migraciones pendientes. Con la base al dia basta con
+# leer django_migrations (una consulta) y no se paga el costo de `manage.py migrate`,
+# que ademas corre los system checks y post_migrate aunque no haya nada que aplicar.
+
+
+def pending_migrations(database=DEFAULT_DB_ALIAS):
+    """Migraciones sin aplicar en la base, como [(app, nombre)] en orden de aplicacion"""
+    executor = MigrationExecutor(connections[database])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return [(migration.app_label, migration.name) for migration, _ in plan]
+
+
+def migrate_if_needed(database=DEFAULT_DB_ALIAS):
+    """
+    Aplica las migraciones pendientes solo si las hay. Retorna las que aplico, o una
+    lista vacia si la base ya estaba al dia.
+    """
+    start = time.perf_counter()
+    pending = pending_migrations(database)
+    if not pending:
+        logger.info(
+            "base %s al dia, sin migraciones (%.1f ms)",
+            database, (time.perf_counter() - start) * 1000,
+        )
+        return []
+    call_command("migrate", database=database, interactive=False, verbosity=0)
+    logger.info(
+        "%d migraciones aplicadas en %s (%.1f ms)",
+        len(pending), database, (time.perf_counter() - start) * 1000,
+    )
+    return pending
+
+
+def migrate_on_start(database=DEFAULT_DB_ALIAS):
+    """
+    migrate_if_needed para vetsoft/wsgi.py y vetsoft/asgi.py. Con preload corre una
+    vez en el master de gunicorn; sin preload cada worker importa la app y el lock
+    hace que migre solo el primero mientras los demas esperan.
+    """
+    with open(LOCK_PATH, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            return migrate_if_needed(database)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,209 @@
+import asyncio
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional, sin el paquete solo se genera .gz
+    brotli = None
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html", ".map")
+MIN_COMPRESS_SIZE = 512
+# los nombres con hash de ManifestStaticFilesStorage: bootstrap.min.1a2b3c4d5e6f.css
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=60"
+
+
+def compress_file(path):
+    """
+    Escribe junto al archivo sus variantes .gz y .br (si esta instalado brotli)
+    cuando comprimir ahorra algo. Retorna las extensiones escritas.
+    """
+    with open(path, "rb") as source:
+        data = source.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(data)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, "wb") as target:
+                target.write(compressed)
+            written.append(suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage que ademas guarda versiones gzip y brotli de cada
+    archivo con hash. Si todavia no se corrio collectstatic (desarrollo y tests)
+    las urls usan los nombres originales en lugar de fallar por falta de manifest.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        """Nombre con hash del manifest, o el original si no hay manifest"""
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Agrega hash a los nombres y comprime los resultados"""
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE):
+                compress_file(self.path(hashed_name))
+
+
+def collected_files(root):
+    """Archivos de STATIC_ROOT despues de collectstatic: {nombre relativo: ruta}"""
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            files[os.path.relpath(path, root).replace(os.sep, "/")] = path
+    return files
+
+
+def found_files():
+    """Archivos que encuentran los finders, para cuando no se corrio collectstatic"""
+    files = {}
+    for finder in finders.get_finders():
+        for name, storage in finder.list([]):
+            files.setdefault(name.replace(os.sep, "/"), storage.path(name))
+    return files
+
+
+def read_chunks(path, size=8192):
+    """Lee un archivo por bloques, cerrandolo al terminar"""
+    with open(path, "rb") as handle:
+        yield from iter(lambda: handle.read(size), b"")
+
+
+class StaticFile:
+    """Un archivo estatico con sus variantes comprimidas y encabezados precalculados."""
+    def __init__(self, name, path):
+        self.path = path
+        content_type, _ = mimetypes.guess_type(name)
+        self.content_type = content_type or "application/octet-stream"
+        if self.content_type.startswith("text/") or name.endswith(".js"):
+            self.content_type = f"{self.content_type}; charset=utf-8"
+        self.cache_control = IMMUTABLE if HASHED_NAME.search(name) else REVALIDATE
+        self.encodings = {
+            encoding: path + suffix
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz"))
+            if os.path.exists(path + suffix)
+        }
+
+    def variant(self, accept_encoding):
+        """Retorna (ruta, encoding) de la mejor variante que acepta el cliente"""
+        for encoding, path in self.encodings.items():
+            if encoding in accept_encoding:
+                return path, encoding
+        return self.path, None
+
+
+class StaticFilesMiddleware:
+    """
+    Middleware WSGI que sirve STATIC_URL desde el proceso, para desplegar con
+    gunicorn sin un servidor web delante. Los archivos con hash se sirven con
+    cache de un año e immutable, y si el cliente acepta brotli o gzip se envia
+    la variante precomprimida. El indice de archivos se arma una sola vez.
+    """
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.prefix = "/" + (prefix or settings.STATIC_URL).strip("/") + "/"
+        root = root or getattr(settings, "STATIC_ROOT", None)
+        names = collected_files(root) if root and os.path.isdir(root) else found_files()
+        self.files = {
+            name: StaticFile(name, path)
+            for name, path in names.items()
+            if not name.endswith((".gz", ".br"))
+        }
+
+    def lookup(self, path, method):
+        """Archivo estatico de una ruta, o None si la peticion debe seguir a Django"""
+        if not path.startswith(self.prefix) or method not in ("GET", "HEAD"):
+            return None
+        return self.files.get(path[len(self.prefix):])
+
+    def response_headers(self, static_file, accept_encoding):
+        """Retorna (ruta de la variante a enviar, encabezados de la respuesta)"""
+        file_path, encoding = static_file.variant(accept_encoding)
+        headers = [
+            ("Content-Type", static_file.content_type),
+            ("Content-Length", str(os.path.getsize(file_path))),
+            ("Cache-Control", static_file.cache_control),
+        ]
+        if static_file.encodings:
+            headers.append(("Vary", "Accept-Encoding"))
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
+        return file_path, headers
+
+    def __call__(self, environ, start_response):
+        """Sirve el archivo si la ruta es un estatico conocido, si no sigue a Django"""
+        method = environ.get("REQUEST_METHOD")
+        static_file = self.lookup(environ.get("PATH_INFO", ""), method)
+        if static_file is None:
+            return self.application(environ, start_response)
+
+        file_path, headers = self.response_headers(
+            static_file, environ.get("HTTP_ACCEPT_ENCODING", ""),
+        )
+        start_response("200 OK", headers)
+        if method == "HEAD":
+            return []
+        file_wrapper = environ.get("wsgi.file_wrapper")
+        if file_wrapper is not None:
+            # el servidor WSGI cierra el archivo al terminar de enviarlo
+            return file_wrapper(open(file_path, "rb"), 8192)
+        return read_chunks(file_path)
+
+
+def read_file(path):
+    """Contenido completo de un archivo"""
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+class ASGIStaticFilesMiddleware:
+    """
+    Version ASGI de StaticFilesMiddleware para vetsoft/asgi.py: usa el mismo
+    indice y los mismos encabezados, y lee el archivo en un thread para no
+    bloquear el event loop.
+    """
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.static = StaticFilesMiddleware(application, root=root, prefix=prefix)
+
+    async def __call__(self, scope, receive, send):
+        """Sirve el archivo si la ruta es un estatico conocido, si no sigue a Django"""
+        static_file = None
+        if scope["type"] == "http":
+            static_file = self.static.lookup(scope["path"], scope["method"])
+        if static_file is None:
+            return await self.application(scope, receive, send)
+
+        request_headers = dict(scope.get("headers", []))
+        file_path, headers = self.static.response_headers(
+            static_file, request_headers.get(b"accept-encoding", b"").decode("latin-1"),
+        )
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        })
+        body = b"" if scope["method"] == "HEAD" else await asyncio.to_thread(read_file, file_path)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import get_template, render_to_string
+
+DEFAULT_CHUNK_SIZE = 500
+STREAM_MARKER = "<!--vetsoft:stream-rows-->"
+
+
+def wants_stream(request):
+    """Indica si la peticion pidio el modo streaming con ?stream=1"""
+    return request.GET.get("stream") in ("1", "true")
+
+
+def get_chunk_size():
+    """Cantidad de filas que se leen de la base y se renderizan por bloque"""
+    return getattr(settings, "STREAMING_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+
+
+def stream_repository(request, template_name, rows_template_name, queryset, context=None):
+    """
+    Responde el repositorio con StreamingHttpResponse: el encabezado de la pagina
+    se envia de inmediato y las filas se renderizan por bloques desde un
+    `.iterator()` del lado del servidor, sin cargar la tabla entera en memoria.
+    """
+    # como en exports.export_rows, la base se fija mientras corre la vista y no cuando
+    # se leen las filas, que es despues de que ReplicaRoutingMiddleware termino
+    queryset = queryset.using(queryset.db)
+    context = {**(context or {}), "stream_marker": STREAM_MARKER}
+    page = render_to_string(template_name, context, request)
+    head, tail = page.split(STREAM_MARKER, 1)
+    rows_template = get_template(rows_template_name)
+    csrf_token = get_token(request)
+    chunk_size = get_chunk_size()
+
+    def render_rows(rows):
+        return rows_template.render({"rows": rows, "csrf_token": csrf_token})
+
+    def content():
+        yield head
+        chunk = []
+        sent = False
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield render_rows(chunk)
+                chunk = []
+                sent = True
+        if chunk or not sent:
+            yield render_rows(chunk)
+        yield tail
+
+    return StreamingHttpResponse(content(), content_type="text/html; charset=utf-8")
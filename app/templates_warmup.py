@@ -0,0 +1,30 @@
+import logging
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+
+def template_names():
+    """Nombres de todos los templates de app/templates, relativos a esa carpeta"""
+    directory = Path(apps.get_app_config("app").path) / "templates"
+    return sorted(path.relative_to(directory).as_posix() for path in directory.rglob("*.html"))
+
+
+def warm():
+    """
+    Compila todos los templates de la app para que queden en el loader cacheado
+    antes de la primera peticion. Retorna [(nombre, segundos)] y registra el total.
+    """
+    timings = []
+    start = time.perf_counter()
+    for name in template_names():
+        compile_start = time.perf_counter()
+        get_template(name)
+        timings.append((name, time.perf_counter() - compile_start))
+    elapsed = time.perf_counter() - start
+    logger.info("%d templates compilados en %.1f ms", len(timings), elapsed * 1000)
+    return timings
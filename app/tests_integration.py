@@ -1,8 +1,39 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import ExitStack
 from decimal import Decimal
+from unittest import mock
 
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connections
 from django.shortcuts import reverse
-from django.test import TestCase
-
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from app import (
+    async_views,
+    autocomplete,
+    fragments,
+    instrumentation,
+    metrics,
+    profiling,
+    routers,
+    search,
+    slow_queries,
+    views,
+    workers,
+)
 from app.models import (
     Breed,
     CityEnum,
@@ -14,10 +45,21 @@ from app.models import (
     Speciality,
     Vet,
 )
+from app.pagination import encode_cursor
 
 
 class HomePageTest(TestCase):
     """testea la pagina de inicio y el template que se va a usar."""
+    def test_assets_are_self_hosted(self):
+        """
+        test para verificar que los estilos y scripts se sirvan desde la app
+        """
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "/static/vendor/bootstrap/bootstrap.min")
+        self.assertContains(response, "/static/vendor/jquery/jquery.min")
+        self.assertNotContains(response, "cdn.jsdelivr.net")
+        self.assertNotContains(response, "cdnjs.cloudflare.com")
+
     def test_use_home_template(self):
         """
         test para verificar que la pagina de inicio use el template correcto
@@ -405,6 +447,20 @@ class ProductsTest(TestCase):
         self.assertEqual(editedProduct.type, product.type)
         self.assertEqual(editedProduct.price,  14400.50)
         self.assertNotEqual(editedProduct.price, product.price)
+
+    def test_edit_with_invalid_price_shows_errors(self):
+        """
+        test para verificar que editar un producto con un precio invalido muestre el error
+        """
+        product = Product.objects.create(name="DogChow", type="Perro adulto", price=10400.5)
+
+        response = self.client.post(
+            reverse("products_form"),
+            data={"id": product.id, "name": "DogChow", "type": "Perro adulto", "price": "-5"},
+        )
+
+        self.assertContains(response, "Por favor ingrese un precio válido")
+        self.assertEqual(Product.objects.get(pk=product.id).price, 10400.5)
 class MedicinesTest(TestCase):
     """Testea la pagina de medicamentos y la creacion de un medicamento."""
     def test_repo_use_repo_template(self):
@@ -951,6 +1007,22 @@ class ProvidersTest(TestCase):
         response = self.client.get(reverse("providers_repo"))
         self.assertTemplateUsed(response, "providers/repository.html")
 
+    def test_edit_with_invalid_email_shows_errors(self):
+        """
+        test para verificar que editar un proveedor con un email invalido muestre el error
+        """
+        provider = Provider.objects.create(
+            name="Distribuidora", email="dist@vetsoft.com", direccion="Calle 1",
+        )
+
+        response = self.client.post(
+            reverse("providers_form"),
+            data={"id": provider.id, "name": "Distribuidora", "email": "dist", "direccion": "Calle 1"},
+        )
+
+        self.assertContains(response, "Por favor ingrese un email valido")
+        self.assertEqual(Provider.objects.get(pk=provider.id).email, "dist@vetsoft.com")
+
     def test_repo_display_all_providers(self):
         """"
         test para verificar que se muestren todos los proveedores en la pagina de inicio
@@ -1059,3 +1131,1123 @@ class ProvidersTest(TestCase):
         self.assertEqual(edited_provider.name, "Faustina")
         self.assertEqual(edited_provider.email, "boca@gmail.com")
         self.assertEqual(edited_provider.direccion, "12 y 50")
+
+
+@override_settings(PAGINATION_PAGE_SIZE=2)
+class RepositoryPaginationTest(TestCase):
+    """testea la paginacion por cursor de los repositorios."""
+    def setUp(self):
+        """Crea 3 veterinarios para tener dos paginas"""
+        cache.clear()
+        for name in ["Ana", "Bruno", "Carla"]:
+            Vet.objects.create(
+                name=name, email=f"{name}@vetsoft.com", phone="2214567890",
+                speciality=Speciality.GENERAL,
+            )
+
+    def test_repo_shows_first_page_only(self):
+        """
+        test para verificar que el repositorio muestre solo la primera pagina
+        """
+        response = self.client.get(reverse("vets_repo"))
+        self.assertContains(response, "Ana")
+        self.assertContains(response, "Bruno")
+        self.assertNotContains(response, "Carla")
+        self.assertTrue(response.context["page"].has_next())
+
+    def test_repo_follows_next_link(self):
+        """
+        test para verificar que el link de siguiente pagina muestre el resto
+        """
+        response = self.client.get(reverse("vets_repo"))
+        next_url = response.context["page"].next_url()
+
+        response = self.client.get(reverse("vets_repo") + next_url)
+        self.assertContains(response, "Carla")
+        self.assertNotContains(response, "Ana")
+        self.assertFalse(response.context["page"].has_next())
+        self.assertTrue(response.context["page"].has_previous())
+
+    def test_repo_shows_page_x_of_y(self):
+        """
+        test para verificar que el encabezado muestre la pagina y el total
+        """
+        response = self.client.get(reverse("vets_repo"))
+        self.assertContains(response, "Página 1 de 2 · 3 resultados")
+
+        response = self.client.get(reverse("vets_repo") + response.context["page"].next_url())
+        self.assertContains(response, "Página 2 de 2 · 3 resultados")
+
+    def test_filtered_count(self):
+        """
+        test para verificar que con filtros se cuenten solo las filas filtradas
+        """
+        response = self.client.get(reverse("vets_repo"), {"q": "an"})
+        self.assertContains(response, "Página 1 de 1 · 1 resultado")
+
+    def test_per_page_param(self):
+        """
+        test para verificar que se pueda elegir el tamaño de pagina
+        """
+        response = self.client.get(reverse("vets_repo"), {"per_page": 3})
+        self.assertContains(response, "Carla")
+        self.assertFalse(response.context["page"].has_next())
+
+    def test_tampered_cursor_shows_first_page(self):
+        """
+        test para verificar que un cursor adulterado muestre la primera pagina y no un error 500
+        """
+        for values in ([{"id": 1}, 1], ["Ana", "1"], [1, 1]):
+            with self.subTest(values=values):
+                response = self.client.get(
+                    reverse("vets_repo"), {"order": "name", "after": encode_cursor(values)},
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "Ana")
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class RepositoryStreamingTest(TestCase):
+    """testea el modo streaming de los repositorios."""
+    def test_stream_returns_every_pet_in_chunks(self):
+        """
+        test para verificar que el modo streaming envie todas las mascotas por bloques
+        """
+        for name in ["Firulais", "Michi", "Rocco"]:
+            Pet.objects.create(
+                name=name, breed=Breed.BEAGLE, birthday="2020-01-01", weight=Decimal("5"),
+            )
+
+        response = self.client.get(reverse("pets_repo"), {"stream": "1"})
+        self.assertTrue(response.streaming)
+
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        content = "".join(chunks)
+        # encabezado + 2 bloques de filas + cierre de la pagina
+        self.assertEqual(len(chunks), 4)
+        self.assertIn("<h1 class=\"mb-4\">Mascotas</h1>", chunks[0])
+        for name in ["Firulais", "Michi", "Rocco"]:
+            self.assertIn(name, content)
+        self.assertIn("csrfmiddlewaretoken", content)
+        self.assertNotIn("vetsoft:stream-rows", content)
+
+    def test_stream_with_empty_table(self):
+        """
+        test para verificar que el modo streaming muestre el mensaje de tabla vacia
+        """
+        response = self.client.get(reverse("clients_repo"), {"stream": "1"})
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("No existen clientes", content)
+
+
+class ExportTest(TestCase):
+    """testea los endpoints de exportacion CSV y NDJSON."""
+    def setUp(self):
+        """Crea dos mascotas para exportar"""
+        self.first = Pet.objects.create(
+            name="Firulais", breed=Breed.BEAGLE, birthday="2020-01-01", weight=Decimal("5.50"),
+        )
+        self.second = Pet.objects.create(
+            name="Michi", breed=Breed.SIAMES, birthday="2021-02-03", weight=Decimal("3"),
+        )
+
+    def test_export_csv(self):
+        """
+        test para verificar que se exporten todas las mascotas en CSV
+        """
+        response = self.client.get(reverse("pets_export", kwargs={"fmt": "csv"}))
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,name,breed,birthday,weight")
+        self.assertEqual(lines[1], f"{self.first.id},Firulais,Beagle,2020-01-01,5.50")
+        self.assertEqual(len(lines), 3)
+
+    def test_export_ndjson_with_fields_and_id_range(self):
+        """
+        test para verificar la seleccion de campos y el rango de ids en NDJSON
+        """
+        response = self.client.get(
+            reverse("pets_export", kwargs={"fmt": "ndjson"}),
+            {"fields": "name,birthday", "id_min": self.second.id},
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ['{"name": "Michi", "birthday": "2021-02-03"}'])
+
+    def test_export_invalid_field(self):
+        """
+        test para verificar que un campo inexistente devuelva 400
+        """
+        response = self.client.get(
+            reverse("clients_export", kwargs={"fmt": "csv"}), {"fields": "password"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_unknown_format(self):
+        """
+        test para verificar que un formato desconocido devuelva 404
+        """
+        response = self.client.get(reverse("clients_export", kwargs={"fmt": "xml"}))
+        self.assertEqual(response.status_code, 404)
+
+
+class ImportViewTest(TestCase):
+    """testea la pagina de importacion de CSV."""
+    def test_upload_csv_creates_vets(self):
+        """
+        test para verificar que subir un CSV cree los veterinarios validos
+        """
+        upload = SimpleUploadedFile(
+            "vets.csv",
+            "name,email,phone,speciality\n"
+            "Ana,ana@vetsoft.com,2214567890,General\n"
+            "Bruno,bruno@vetsoft.com,123,General\n".encode(),
+            content_type="text/csv",
+        )
+        response = self.client.post(reverse("vets_import"), {"file": upload})
+
+        self.assertTemplateUsed(response, "imports/form.html")
+        self.assertContains(response, "1 filas importadas, 1 con errores.")
+        self.assertContains(response, "Por favor ingrese un teléfono válido")
+        self.assertEqual(Vet.objects.count(), 1)
+
+    def test_upload_without_file(self):
+        """
+        test para verificar que se informe cuando no se envia un archivo
+        """
+        response = self.client.post(reverse("vets_import"))
+        self.assertContains(response, "Por favor seleccione un archivo")
+
+    def test_upload_over_size_limit(self):
+        """
+        test para verificar que un archivo mas grande que IMPORT_MAX_UPLOAD_SIZE se rechace con 413
+        """
+        upload = SimpleUploadedFile(
+            "vets.csv", b"name,email,phone,speciality\n" + b"x" * 2 * 1024 * 1024,
+            content_type="text/csv",
+        )
+        with self.settings(IMPORT_MAX_UPLOAD_SIZE=1024 * 1024):
+            response = self.client.post(reverse("vets_import"), {"file": upload})
+        self.assertContains(response, "El archivo no puede superar los 1 MB", status_code=413)
+
+    def test_upload_over_row_limit(self):
+        """
+        test para verificar que un archivo con mas de IMPORT_MAX_ROWS filas se rechace sin importar nada
+        """
+        upload = SimpleUploadedFile(
+            "vets.csv",
+            "name,email,phone,speciality\n"
+            "Ana,ana@vetsoft.com,2214567890,General\n"
+            "Bruno,bruno@vetsoft.com,2214567891,General\n".encode(),
+            content_type="text/csv",
+        )
+        with self.settings(IMPORT_MAX_ROWS=1):
+            response = self.client.post(reverse("vets_import"), {"file": upload})
+        self.assertContains(response, "El archivo tiene más de 1 filas", status_code=413)
+        self.assertEqual(Vet.objects.count(), 0)
+
+
+class RepositoryFiltersTest(TestCase):
+    """testea los filtros por url de los repositorios."""
+    def test_clients_by_name_prefix_and_city(self):
+        """
+        test para verificar el filtro por prefijo de nombre y ciudad
+        """
+        for name, city in [
+            ("Juan Perez", CityEnum.LA_PLATA),
+            ("juana Diaz", CityEnum.BERISSO),
+            ("Pedro Juarez", CityEnum.LA_PLATA),
+        ]:
+            Client.objects.create(
+                name=name, phone="54221555232", email="a@vetsoft.com", city=city,
+            )
+
+        response = self.client.get(reverse("clients_repo"), {"q": "JUAN"})
+        names = [client.name for client in response.context["clients"]]
+        self.assertEqual(names, ["Juan Perez", "juana Diaz"])
+
+        response = self.client.get(reverse("clients_repo"), {"q": "juan", "city": "Berisso"})
+        names = [client.name for client in response.context["clients"]]
+        self.assertEqual(names, ["juana Diaz"])
+        self.assertEqual(response.context["filters"], {"q": "juan", "city": "Berisso"})
+
+    def test_name_prefix_ignores_accents_and_case(self):
+        """
+        test para verificar que el filtro por nombre encuentre nombres con acentos y eñes
+        """
+        for name in ["Álvaro Núñez", "Ñato Gómez", "Alvarez Perez"]:
+            Client.objects.create(
+                name=name, phone="54221555232", email="a@vetsoft.com", city=CityEnum.LA_PLATA,
+            )
+        for query, expected in [
+            ("Álvaro", ["Álvaro Núñez"]),
+            ("álv", ["Álvaro Núñez", "Alvarez Perez"]),
+            ("alv", ["Álvaro Núñez", "Alvarez Perez"]),
+            ("ÑATO", ["Ñato Gómez"]),
+            ("nato g", ["Ñato Gómez"]),
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(reverse("clients_repo"), {"q": query})
+                names = [client.name for client in response.context["clients"]]
+                self.assertEqual(sorted(names), sorted(expected))
+
+    def test_name_search_follows_updates_and_imports(self):
+        """
+        test para verificar que name_search se actualice al editar y al importar en lote
+        """
+        client = Client.objects.create(
+            name="Juan Perez", phone="54221555232", email="a@vetsoft.com", city=CityEnum.LA_PLATA,
+        )
+        client.name = "Íñigo Pérez"
+        client.save(update_fields=["name"])
+        Client.objects.bulk_create([
+            Client(name="Óscar Díaz", phone="54221555232", email="b@vetsoft.com", city="Berisso"),
+        ])
+        self.assertEqual(
+            sorted(Client.objects.values_list("name_search", flat=True)),
+            ["inigo perez", "oscar diaz"],
+        )
+
+    def test_pets_by_breed_and_birthday_range(self):
+        """
+        test para verificar el filtro por raza y rango de fecha de nacimiento
+        """
+        for name, breed, birthday in [
+            ("Firulais", Breed.BEAGLE, "2019-05-01"),
+            ("Rocco", Breed.BEAGLE, "2021-05-01"),
+            ("Michi", Breed.SIAMES, "2021-06-01"),
+        ]:
+            Pet.objects.create(name=name, breed=breed, birthday=birthday, weight=Decimal("4"))
+
+        response = self.client.get(
+            reverse("pets_repo"),
+            {"breed": "Beagle", "birthday_from": "01/01/2020", "birthday_to": "31/12/2021"},
+        )
+        names = [pet.name for pet in response.context["pets"]]
+        self.assertEqual(names, ["Rocco"])
+
+    def test_products_by_type_and_price_range(self):
+        """
+        test para verificar el filtro por tipo y rango de precio
+        """
+        Product.objects.create(name="DogChow", type="Alimento", price=100)
+        Product.objects.create(name="Whiskas", type="Alimento", price=300)
+        Product.objects.create(name="Collar", type="Accesorio", price=150)
+
+        response = self.client.get(
+            reverse("products_repo"), {"type": "Alimento", "price_min": "50", "price_max": "200"},
+        )
+        names = [product.name for product in response.context["products"]]
+        self.assertEqual(names, ["DogChow"])
+
+    def test_medicines_by_dose_range_and_invalid_values(self):
+        """
+        test para verificar el filtro por dosis y que los valores invalidos se ignoren
+        """
+        Medicine.objects.create(name="Ibuprofeno", description="Dolor", dose=2)
+        Medicine.objects.create(name="Paracetamol", description="Fiebre", dose=8)
+
+        response = self.client.get(reverse("medicines_repo"), {"dose_min": "5"})
+        names = [medicine.name for medicine in response.context["medicines"]]
+        self.assertEqual(names, ["Paracetamol"])
+
+        response = self.client.get(reverse("medicines_repo"), {"dose_min": "mucho"})
+        self.assertEqual(len(response.context["medicines"]), 2)
+        self.assertEqual(response.context["filters"], {})
+
+    def test_vets_filter_is_kept_in_pagination_links(self):
+        """
+        test para verificar que los links de paginacion conserven los filtros
+        """
+        for name in ["Ana", "Andres", "Analia"]:
+            Vet.objects.create(
+                name=name, email="a@vetsoft.com", phone="2214567890",
+                speciality=Speciality.DENTISTA,
+            )
+
+        response = self.client.get(
+            reverse("vets_repo"), {"speciality": "Dentista", "per_page": 2},
+        )
+        self.assertIn("speciality=Dentista", response.context["page"].next_url())
+
+
+class SearchViewTest(TestCase):
+    """testea la pagina de busqueda global."""
+    def test_search_returns_tagged_results(self):
+        """
+        test para verificar que la busqueda muestre resultados con su tipo
+        """
+        pet = Pet.objects.create(
+            name="Firulais", breed=Breed.BEAGLE, birthday="2020-01-01", weight=Decimal("5"),
+        )
+        response = self.client.get(reverse("search"), {"q": "firu"})
+
+        self.assertTemplateUsed(response, "search/results.html")
+        self.assertContains(response, "Mascota")
+        self.assertContains(response, reverse("pets_edit", kwargs={"id": pet.id}))
+
+    def test_search_warns_when_candidates_are_capped(self):
+        """
+        test para verificar que en cada nivel solo se ordenen las coincidencias mas recientes y la pagina lo avise
+        """
+        for name in ("Firulais", "Firu"):
+            Pet.objects.create(name=name, breed=Breed.BEAGLE, birthday="2020-01-01", weight=Decimal("5"))
+        with self.settings(SEARCH_MAX_RANKED=1):
+            response = self.client.get(reverse("search"), {"q": "firu"})
+        self.assertContains(response, 'data-testid="search-result"', count=1)
+        self.assertContains(response, "Firu<")
+        self.assertContains(response, 'data-testid="search-truncated"')
+
+        response = self.client.get(reverse("search"), {"q": "firu"})
+        self.assertContains(response, 'data-testid="search-result"', count=2)
+        self.assertNotContains(response, 'data-testid="search-truncated"')
+
+    def test_search_without_results(self):
+        """
+        test para verificar el mensaje cuando no hay resultados
+        """
+        response = self.client.get(reverse("search"), {"q": "nada"})
+        self.assertContains(response, "No se encontraron resultados")
+
+    def test_navbar_has_search_box(self):
+        """
+        test para verificar que el navbar tenga el buscador global
+        """
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, 'action="/buscar/"')
+
+
+class AutocompleteViewTest(TestCase):
+    """testea el endpoint JSON de autocompletado."""
+    def setUp(self):
+        """Vacia los indices para que se carguen desde la base del test"""
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+
+    def test_returns_matching_names(self):
+        """
+        test para verificar que devuelva los nombres que empiezan con q
+        """
+        pet = Pet.objects.create(
+            name="Firulais", breed=Breed.BEAGLE, birthday="2020-01-01", weight=Decimal("5"),
+        )
+        response = self.client.get(reverse("autocomplete", args=["pets"]), {"q": "fir"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"results": [{"id": pet.id, "name": "Firulais"}]})
+
+    def test_unknown_entity(self):
+        """
+        test para verificar que una entidad sin autocompletado responda 404
+        """
+        response = self.client.get(reverse("autocomplete", args=["providers"]), {"q": "a"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_repository_search_box_uses_autocomplete(self):
+        """
+        test para verificar que el buscador del repositorio tenga las sugerencias
+        """
+        response = self.client.get(reverse("clients_repo"))
+        self.assertContains(response, 'data-autocomplete="/autocompletar/clients/"')
+
+
+class ConditionalRepositoryTest(TestCase):
+    """testea las respuestas 304 de los repositorios."""
+    def setUp(self):
+        """Crea una medicina y pide el repositorio con la cookie CSRF ya emitida"""
+        self.medicine = Medicine.objects.create(name="Ibuprofeno", description="desc", dose=2)
+        self.client.get(reverse("medicines_repo"))
+        self.response = self.client.get(reverse("medicines_repo"))
+
+    def test_first_response_has_validators(self):
+        """
+        test para verificar que la respuesta tenga ETag, Last-Modified y no-cache
+        """
+        self.assertTrue(self.response.has_header("ETag"))
+        self.assertTrue(self.response.has_header("Last-Modified"))
+        self.assertIn("no-cache", self.response["Cache-Control"])
+
+    def test_unchanged_page_returns_304_without_listing(self):
+        """
+        test para verificar que sin cambios se responda 304 con una sola consulta
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("medicines_repo"), HTTP_IF_NONE_MATCH=self.response["ETag"],
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_etag(self):
+        """
+        test para verificar que editar o eliminar cambie el ETag
+        """
+        etag = self.response["ETag"]
+        self.medicine.update_medicine({"name": "Paracetamol", "description": "desc", "dose": "3"})
+        response = self.client.get(reverse("medicines_repo"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Paracetamol")
+
+        etag = response["ETag"]
+        self.client.post(reverse("medicines_delete"), {"medicine_id": self.medicine.id})
+        response = self.client.get(reverse("medicines_repo"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_query_string(self):
+        """
+        test para verificar que cada pagina o filtro tenga su propio ETag
+        """
+        response = self.client.get(reverse("medicines_repo"), {"q": "ibu"})
+        self.assertNotEqual(response["ETag"], self.response["ETag"])
+
+
+LOCMEM_FRAGMENTS = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests-fragments",
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_FRAGMENTS)
+class FragmentCacheTest(TestCase):
+    """testea el cache de las tablas de los repositorios."""
+    def setUp(self):
+        """Vacia el cache y los contadores y crea una mascota"""
+        caches["fragments"].clear()
+        fragments.stats.reset()
+        self.pet = Pet.objects.create(
+            name="Firulais", breed=Breed.BEAGLE, birthday="2020-01-01", weight=Decimal("5"),
+        )
+
+    def test_second_request_uses_cached_table(self):
+        """
+        test para verificar que la segunda visita no consulte el listado
+        """
+        self.client.get(reverse("pets_repo"))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("pets_repo"))
+        self.assertContains(response, "Firulais")
+        self.assertEqual(fragments.stats.as_dict()["hits"], 1)
+        self.assertEqual(fragments.stats.as_dict()["misses"], 1)
+
+    def test_cached_table_has_each_users_csrf_token(self):
+        """
+        test para verificar que el token CSRF del fragmento sea el de cada usuario
+        """
+        first = self.client.get(reverse("pets_repo"))
+        other = self.client_class().get(reverse("pets_repo"))
+        for response in (first, other):
+            token = response.cookies["csrftoken"].value
+            self.assertNotContains(response, fragments.CSRF_SENTINEL)
+            self.assertContains(response, 'name="csrfmiddlewaretoken"')
+            self.assertNotEqual(token, "")
+        self.assertNotEqual(first.cookies["csrftoken"].value, other.cookies["csrftoken"].value)
+
+    def test_update_invalidates_table(self):
+        """
+        test para verificar que editar la mascota renderice de nuevo la tabla
+        """
+        self.client.get(reverse("pets_repo"))
+        self.pet.update_pet({
+            "name": "Rocco", "breed": Breed.BEAGLE, "birthday": "01/01/2020", "weight": "5",
+        })
+        response = self.client.get(reverse("pets_repo"))
+        self.assertContains(response, "Rocco")
+        self.assertNotContains(response, "Firulais")
+
+    def test_query_params_have_their_own_table(self):
+        """
+        test para verificar que cada filtro tenga su propia tabla cacheada
+        """
+        self.client.get(reverse("pets_repo"))
+        response = self.client.get(reverse("pets_repo"), {"q": "zzz"})
+        self.assertNotContains(response, "Firulais")
+
+    def test_stats_endpoint(self):
+        """
+        test para verificar que se expongan los aciertos y fallos
+        """
+        self.client.get(reverse("pets_repo"))
+        self.client.get(reverse("pets_repo"))
+        response = self.client.get(reverse("cache_stats"))
+        self.assertEqual(
+            response.json(), {"fragments": {"hits": 1, "misses": 1, "hit_ratio": 0.5}},
+        )
+
+    def test_file_based_backend(self):
+        """
+        test para verificar que el cache funcione tambien guardado en archivos
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {
+                **LOCMEM_FRAGMENTS,
+                "fragments": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory,
+                },
+            }
+            with self.settings(CACHES=backends):
+                self.client.get(reverse("pets_repo"))
+                response = self.client.get(reverse("pets_repo"))
+        self.assertContains(response, "Firulais")
+        self.assertEqual(fragments.stats.as_dict()["hits"], 1)
+
+
+class NavbarTest(TestCase):
+    """testea el navbar precalculado."""
+    def active_links(self, response):
+        """Etiquetas de los links marcados como activos"""
+        return [link.label for link in response.context["links"] if link.active]
+
+    def test_home_is_active_only_on_root(self):
+        """
+        test para verificar que Home solo quede activo en la raiz
+        """
+        self.assertEqual(self.active_links(self.client.get(reverse("home"))), ["Home"])
+        self.assertEqual(self.active_links(self.client.get(reverse("search"))), [])
+
+    def test_section_is_resolved_by_url_name(self):
+        """
+        test para verificar que las paginas internas activen su seccion
+        """
+        response = self.client.get(reverse("pets_form"))
+        self.assertEqual(self.active_links(response), ["Mascotas"])
+        self.assertContains(response, 'aria-current="page"', count=1)
+        self.assertContains(response, 'data-testid="navbar-Mascotas"')
+
+    def test_navbar_is_rendered_once_per_section(self):
+        """
+        test para verificar que el navbar renderizado se reutilice
+        """
+        first = self.client.get(reverse("clients_repo")).context["navbar"]
+        second = self.client.get(reverse("clients_form")).context["navbar"]
+        self.assertIs(first, second)
+
+
+class ReplicaRoutingTest(TestCase):
+    """testea que las vistas de solo lectura lean de la replica salvo despues de escribir"""
+    def get_repository(self):
+        """Pide el repositorio de clientes y retorna si la vista podia leer de la replica"""
+        seen = []
+        original = views.filter_queryset
+
+        def spy(*args, **kwargs):
+            seen.append(routers.use_replica())
+            return original(*args, **kwargs)
+
+        with mock.patch("app.views.filter_queryset", side_effect=spy):
+            response = self.client.get(reverse("clients_repo"))
+        self.assertEqual(response.status_code, 200)
+        return seen == [True]
+
+    def test_repository_reads_from_replica(self):
+        """
+        test para verificar que el repositorio pueda leer de la replica
+        """
+        self.assertTrue(self.get_repository())
+
+    def test_form_does_not_read_from_replica(self):
+        """
+        test para verificar que el formulario, que escribe, no quede marcado como de solo lectura
+        """
+        self.assertFalse(getattr(views.clients_form, "read_only", False))
+        self.assertFalse(getattr(views.clients_delete, "read_only", False))
+
+    @override_settings(REPLICA_PIN_SECONDS=10)
+    def test_post_pins_browser_to_primary(self):
+        """
+        test para verificar que despues de guardar un cliente el redirect lea del primario
+        """
+        response = self.client.post(
+            reverse("clients_form"),
+            data={
+                "name": "Juan Sebastian Veron",
+                "phone": "54221555232",
+                "city": "La Plata",
+                "email": "brujita75@vetsoft.com",
+            },
+        )
+        self.assertRedirects(response, reverse("clients_repo"), fetch_redirect_response=False)
+        cookie = response.cookies[routers.PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+        self.assertFalse(self.get_repository())
+
+
+class ReplicaStreamingTest(TransactionTestCase):
+    """
+    testea que las respuestas streaming lean las filas de la replica. La replica es
+    una segunda conexion a la misma base de test; es TransactionTestCase porque
+    dentro de una transaccion el router lee del primario
+    """
+    def setUp(self):
+        """Agrega el alias de la replica apuntando a la base de test"""
+        connections.settings[routers.REPLICA_ALIAS] = {**connections["default"].settings_dict}
+        self.addCleanup(self.remove_replica)
+        Client.objects.create(
+            name="Juan Sebastian Veron", phone="54221555232", city="La Plata",
+            email="brujita75@vetsoft.com",
+        )
+
+    def remove_replica(self):
+        """Cierra y quita la conexion de la replica"""
+        connections[routers.REPLICA_ALIAS].close()
+        del connections[routers.REPLICA_ALIAS]
+        del connections.settings[routers.REPLICA_ALIAS]
+
+    def streamed_rows_alias(self, url):
+        """Consume una respuesta streaming y retorna las bases donde se leyeron los clientes"""
+        with ExitStack() as stack:
+            captured = {
+                alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in ("default", routers.REPLICA_ALIAS)
+            }
+            response = self.client.get(url)
+            content = b"".join(response.streaming_content)
+        self.assertIn(b"Juan Sebastian Veron", content)
+        return [
+            alias for alias, context in captured.items()
+            if any('FROM "app_client"' in query["sql"] and "COUNT" not in query["sql"]
+                   for query in context.captured_queries)
+        ]
+
+    def test_streamed_export_reads_from_replica(self):
+        """
+        test para verificar que las filas de una exportacion, que se leen despues de la vista, salgan de la replica
+        """
+        aliases = self.streamed_rows_alias(reverse("clients_export", args=["csv"]))
+        self.assertEqual(aliases, [routers.REPLICA_ALIAS])
+
+    def test_streamed_repository_reads_from_replica(self):
+        """
+        test para verificar que el repositorio con ?stream=1 lea las filas de la replica
+        """
+        aliases = self.streamed_rows_alias(reverse("clients_repo") + "?stream=1")
+        self.assertEqual(aliases, [routers.REPLICA_ALIAS])
+
+
+class AsyncViewsTest(TransactionTestCase):
+    """
+    testea las vistas asincronicas que usa vetsoft/asgi.py. El repositorio corre en
+    otro thread con su propia conexion, por eso los datos tienen que estar confirmados.
+    """
+    def setUp(self):
+        """Crea las peticiones con la fabrica asincronica"""
+        self.factory = AsyncRequestFactory()
+        cache.clear()
+        caches["fragments"].clear()
+
+    def test_wsgi_urls_use_sync_views(self):
+        """
+        test para verificar que sin ASYNC_VIEWS las urls usen las vistas sincronicas
+        """
+        self.assertIs(resolve(reverse("clients_repo")).func, views.clients_repository)
+        self.assertIs(resolve(reverse("clients_form")).func, views.clients_form)
+
+    async def test_form_creates_client(self):
+        """
+        test para verificar que el formulario asincronico cree el cliente y redirija
+        """
+        request = self.factory.post(reverse("clients_form"), data={
+            "name": "Juan Sebastian Veron",
+            "phone": "54221555232",
+            "city": "La Plata",
+            "email": "brujita75@vetsoft.com",
+        })
+        response = await async_views.clients_form(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse("clients_repo"))
+        self.assertTrue(await Client.objects.filter(name="Juan Sebastian Veron").aexists())
+
+    async def test_form_shows_errors(self):
+        """
+        test para verificar que el formulario asincronico muestre los errores de validacion
+        """
+        request = self.factory.post(reverse("vets_form"), data={})
+        response = await async_views.vets_form(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Por favor ingrese un nombre")
+
+    async def test_edit_and_delete(self):
+        """
+        test para verificar que se pueda editar y eliminar con las vistas asincronicas
+        """
+        medicine = await Medicine.objects.acreate(name="Amoxicilina", description="Antibiotico", dose=5)
+        response = await async_views.medicines_form(
+            self.factory.get(reverse("medicines_edit", args=[medicine.id])), id=medicine.id,
+        )
+        self.assertContains(response, "Amoxicilina")
+
+        response = await async_views.medicines_delete(
+            self.factory.post(reverse("medicines_delete"), data={"medicine_id": medicine.id}),
+        )
+        self.assertEqual(response.url, reverse("medicines_repo"))
+        self.assertFalse(await Medicine.objects.filter(pk=medicine.id).aexists())
+
+    async def test_edit_shows_update_errors(self):
+        """
+        test para verificar que el formulario asincronico muestre los errores al editar
+        """
+        product = await Product.objects.acreate(name="DogChow", type="Perro adulto", price=10400.5)
+        response = await async_views.products_form(self.factory.post(
+            reverse("products_form"),
+            data={"id": product.id, "name": "DogChow", "type": "Perro adulto", "price": "-5"},
+        ))
+        self.assertContains(response, "Por favor ingrese un precio válido")
+        self.assertEqual((await Product.objects.aget(pk=product.id)).price, 10400.5)
+
+    async def test_repository_runs_in_thread_pool(self):
+        """
+        test para verificar que el repositorio asincronico liste los clientes confirmados
+        """
+        await Client.objects.acreate(
+            name="Juan Sebastian Veron", phone=54221555232,
+            email="brujita75@vetsoft.com", city="La Plata",
+        )
+        response = await async_views.clients_repository(self.factory.get(reverse("clients_repo")))
+        self.assertContains(response, "Juan Sebastian Veron")
+        self.assertTrue(async_views.clients_repository.read_only)
+
+
+class WorkerStatusTest(TestCase):
+    """testea el endpoint con el estado del worker que atiende la peticion"""
+    def setUp(self):
+        """Simula un worker de gunicorn recien iniciado"""
+        workers.stats.started("gthread", 4, 2100)
+        self.addCleanup(workers.stats.reset)
+
+    def test_counts_requests(self):
+        """
+        test para verificar que el worker informe su configuracion y las peticiones atendidas
+        """
+        self.client.get(reverse("home"))
+        self.client.get(reverse("home"))
+        worker = self.client.get(reverse("worker_status")).json()["worker"]
+        self.assertEqual(worker["worker_class"], "gthread")
+        self.assertEqual(worker["threads"], 4)
+        self.assertEqual(worker["max_requests"], 2100)
+        self.assertEqual(worker["requests"], 2)
+        self.assertIsNotNone(worker["uptime_s"])
+
+
+class RequestMetricsTest(TestCase):
+    """testea el middleware que mide las consultas y los tiempos de cada peticion"""
+    def test_server_timing_header(self):
+        """
+        test para verificar que la respuesta informe consultas y tiempos en Server-Timing
+        """
+        response = self.client.get(reverse("clients_repo"))
+        timing = response["Server-Timing"]
+        metrics = response.request_metrics
+        self.assertIn("sql;dur=", timing)
+        self.assertIn(f'desc="{metrics.queries} queries"', timing)
+        for name in ("template;dur=", "python;dur=", "total;dur="):
+            self.assertIn(name, timing)
+        self.assertGreater(metrics.template_s, 0)
+        self.assertGreaterEqual(metrics.total_s, metrics.sql_s + metrics.own_template_s)
+
+    def test_structured_log_line(self):
+        """
+        test para verificar que cada peticion escriba una linea JSON con la vista y sus metricas
+        """
+        with self.assertLogs("app.requests", "INFO") as logs:
+            self.client.get(reverse("clients_repo"))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "clients_repo")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(
+            set(line), {
+                "method", "path", "view", "status", "queries", "sql_ms", "template_ms",
+                "python_ms", "total_ms",
+            },
+        )
+
+    def test_queries_outside_requests_are_not_counted(self):
+        """
+        test para verificar que las consultas fuera de una peticion no sumen metricas
+        """
+        Client.objects.count()
+        self.assertIsNone(instrumentation.current_metrics())
+
+
+class QueryBudgetTest(TestCase):
+    """
+    testea la cantidad maxima de consultas SQL de cada vista. Si un cambio agrega
+    consultas (un N+1, un get_object_or_404 de mas) el test falla; si las baja,
+    conviene bajar el presupuesto.
+    """
+    # nombre de la url -> consultas con los caches vacios; el repositorio lee la
+    # version, hace COUNT(*), guarda el total en ModelVersion y trae la pagina
+    GET_BUDGETS = {
+        "home": 0,
+        "clients_repo": 4,
+        "vets_repo": 4,
+        "providers_repo": 4,
+        "products_repo": 4,
+        "pets_repo": 4,
+        "medicines_repo": 4,
+        "clients_form": 0,
+        "vets_form": 0,
+        "providers_form": 0,
+        "products_form": 0,
+        "pets_form": 0,
+        "medicines_form": 0,
+        "worker_status": 0,
+        "cache_stats": 0,
+    }
+    # con los fragmentos en cache el repositorio solo pide la version
+    CACHED_REPOSITORY_BUDGET = 1
+    # el formulario de edicion carga el objeto; el alta, la edicion y la baja incluyen
+    # el savepoint y su liberacion. Con FTS5 (SQLite) se suman las escrituras de la
+    # tabla del buscador y la de titulos; el indice en memoria no consulta la base
+    EDIT_BUDGET = 1
+    WRITE_BUDGET = 2
+    DELETE_BUDGET = 3
+    FTS5_WRITES = 2
+
+    def setUp(self):
+        """Vacia los caches para medir las consultas en frio"""
+        cache.clear()
+        caches["fragments"].clear()
+        self.search_writes = self.FTS5_WRITES if search.get_backend().name == "fts5" else 0
+        self.client_model = Client.objects.create(
+            name="Juan Sebastian Veron", phone=54221555232,
+            email="brujita75@vetsoft.com", city="La Plata",
+        )
+
+    def assertQueryBudget(self, response, budget):
+        """Falla si la peticion hizo mas consultas que el presupuesto"""
+        queries = response.request_metrics.queries
+        self.assertLessEqual(
+            queries, budget,
+            f"{response.wsgi_request.path} hizo {queries} consultas (presupuesto {budget})",
+        )
+
+    def test_get_budgets(self):
+        """
+        test para verificar que ninguna pagina supere su presupuesto de consultas
+        """
+        for name, budget in self.GET_BUDGETS.items():
+            with self.subTest(name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertQueryBudget(response, budget)
+
+    def test_cached_repository_budget(self):
+        """
+        test para verificar que el repositorio servido desde el cache haga una sola consulta
+        """
+        self.client.get(reverse("clients_repo"))
+        response = self.client.get(reverse("clients_repo"))
+        self.assertQueryBudget(response, self.CACHED_REPOSITORY_BUDGET)
+
+    def test_write_budgets(self):
+        """
+        test para verificar que editar, guardar y eliminar no superen su presupuesto de consultas
+        """
+        edit_url = reverse("clients_edit", args=[self.client_model.id])
+        self.assertQueryBudget(self.client.get(edit_url), self.EDIT_BUDGET)
+        response = self.client.post(reverse("clients_form"), data={
+            "name": "Juan Roman Riquelme", "phone": "54221555233",
+            "city": "La Plata", "email": "jr10@vetsoft.com",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertQueryBudget(response, self.WRITE_BUDGET + self.search_writes)
+        response = self.client.post(edit_url, data={
+            "name": "Juan Sebastian Veron", "phone": "54221555232",
+            "city": "Berisso", "email": "brujita75@vetsoft.com",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertQueryBudget(response, self.WRITE_BUDGET + self.search_writes)
+        response = self.client.post(
+            reverse("clients_delete"), data={"client_id": self.client_model.id},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertQueryBudget(response, self.DELETE_BUDGET + self.search_writes)
+
+
+class MetricsEndpointTest(TestCase):
+    """testea el endpoint /metrics en formato Prometheus"""
+    def setUp(self):
+        """Empieza con el registro de metricas vacio"""
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+        cache.clear()
+        caches["fragments"].clear()
+
+    def test_counts_requests_by_view(self):
+        """
+        test para verificar que /metrics cuente las peticiones, consultas y errores por vista
+        """
+        self.client.get(reverse("clients_repo"))
+        self.client.get(reverse("clients_repo"))
+        self.client.get("/no-existe/")
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+        self.assertIn(
+            'vetsoft_http_requests_total{view="clients_repo",method="GET",status="200"} 2', text,
+        )
+        self.assertIn(
+            'vetsoft_http_requests_total{view="unmatched",method="GET",status="404"} 1', text,
+        )
+        self.assertIn('vetsoft_http_request_duration_seconds_count{view="clients_repo"} 2', text)
+        self.assertIn('vetsoft_db_queries_total{view="clients_repo"}', text)
+        self.assertIn("vetsoft_fragment_cache_hits_total", text)
+        self.assertIn("vetsoft_fragment_cache_misses_total", text)
+
+
+class ProfilingTest(TestCase):
+    """testea el perfilado de peticiones a pedido y la pagina que lista los perfiles"""
+    def setUp(self):
+        """Guarda los perfiles en un directorio temporal"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(PROFILING_DIR=directory.name, PROFILING_TOKEN="secreto")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_header_with_token_saves_profile(self):
+        """
+        test para verificar que con el encabezado y el token se guarde el perfil de la peticion
+        """
+        response = self.client.get(reverse("clients_repo"), HTTP_X_VETSOFT_PROFILE="secreto")
+        self.assertEqual(response.status_code, 200)
+        name = response["X-Vetsoft-Profile-Id"]
+        [profile] = profiling.list_profiles()
+        self.assertEqual(profile["name"], name)
+        self.assertEqual(profile["view"], "clients_repo")
+        self.assertEqual(profile["reason"], "requested")
+        self.assertIsNotNone(profiling.profile_path(name))
+
+    async def test_asgi_request_is_profiled(self):
+        """
+        test para verificar que bajo ASGI tambien se guarde el perfil de la peticion pedida
+        """
+        response = await self.async_client.get(
+            reverse("home"), headers={"X-Vetsoft-Profile": "secreto"},
+        )
+        self.assertEqual(response.status_code, 200)
+        [profile] = profiling.list_profiles()
+        self.assertEqual(profile["name"], response["X-Vetsoft-Profile-Id"])
+        self.assertEqual(profile["view"], "home")
+
+    def test_saved_path_has_no_token(self):
+        """
+        test para verificar que el perfil pedido con ?__profile= no guarde el token en la ruta
+        """
+        self.client.get(reverse("clients_repo"), {"q": "juan", "__profile": "secreto"})
+        [profile] = profiling.list_profiles()
+        self.assertEqual(profile["path"], reverse("clients_repo") + "?q=juan")
+        self.client.get(reverse("home"), {"__profile": "secreto"})
+        self.assertEqual(profiling.list_profiles()[0]["path"], reverse("home"))
+
+    def test_wrong_token_is_not_profiled(self):
+        """
+        test para verificar que sin el token correcto la peticion no se perfile
+        """
+        response = self.client.get(reverse("clients_repo"), HTTP_X_VETSOFT_PROFILE="otro")
+        self.assertNotIn("X-Vetsoft-Profile-Id", response)
+        self.assertEqual(profiling.list_profiles(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sample_rate_profiles_requests(self):
+        """
+        test para verificar que con PROFILING_SAMPLE_RATE se perfilen peticiones sin encabezado
+        """
+        response = self.client.get(reverse("home"))
+        self.assertIn("X-Vetsoft-Profile-Id", response)
+        self.assertEqual(profiling.list_profiles()[0]["reason"], "sampled")
+
+    def test_admin_lists_and_downloads_profiles(self):
+        """
+        test para verificar que el admin liste los perfiles y permita descargarlos
+        """
+        name = self.client.get(
+            reverse("clients_repo"), HTTP_X_VETSOFT_PROFILE="secreto",
+        )["X-Vetsoft-Profile-Id"]
+        self.client.force_login(User.objects.create_superuser("admin", "admin@vetsoft.com", "clave"))
+        response = self.client.get(reverse("profiles"))
+        self.assertContains(response, "GET /clientes/")
+        self.assertContains(response, reverse("profile_download", args=[name]))
+        response = self.client.get(reverse("profile_download", args=[name]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+
+    def test_admin_page_requires_staff(self):
+        """
+        test para verificar que la pagina de perfiles pida iniciar sesion en el admin
+        """
+        response = self.client.get(reverse("profiles"))
+        self.assertRedirects(
+            response, f"{reverse('admin:login')}?next={reverse('profiles')}",
+            fetch_redirect_response=False,
+        )
+
+
+class SlowQueryLogTest(TestCase):
+    """testea el log de consultas lentas y el comando que lo resume"""
+    def setUp(self):
+        """Cliente para que el repositorio tenga filas"""
+        Client.objects.create(
+            name="Juan Sebastian Veron", phone="54221555232", city="La Plata",
+            email="brujita75@vetsoft.com",
+        )
+        cache.clear()
+        caches["fragments"].clear()
+
+    @override_settings(SLOW_QUERY_MS=0.0001)
+    def test_slow_query_is_logged_with_view_and_plan(self):
+        """
+        test para verificar que una consulta lenta se registre con la vista, los parametros y el plan
+        """
+        with self.assertLogs("app.slow_queries", "WARNING") as logs:
+            self.client.get(reverse("clients_repo"), {"city": "La Plata"})
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        [entry] = [entry for entry in entries if entry["sql"].startswith('SELECT "app_client"."id"')]
+        self.assertEqual(entry["view"], "clients_repo")
+        self.assertEqual(entry["path"], reverse("clients_repo"))
+        self.assertIn("La Plata", entry["params"])
+        self.assertTrue(entry["plan"])
+        self.assertEqual(entry["fingerprint"], slow_queries.fingerprint(entry["sql"]))
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_zero_threshold_disables_log(self):
+        """
+        test para verificar que SLOW_QUERY_MS=0 desactive el log
+        """
+        with self.assertNoLogs("app.slow_queries"):
+            self.client.get(reverse("clients_repo"))
+
+    @override_settings(SLOW_QUERY_MS=0.0001)
+    def test_explain_is_not_counted_in_request_metrics(self):
+        """
+        test para verificar que el EXPLAIN del log no se cuente en las consultas de la peticion
+        """
+        with self.assertLogs("app.slow_queries", "WARNING"):
+            response = self.client.get(reverse("clients_repo"))
+        self.assertEqual(response.request_metrics.queries, 4)
+
+    def test_command_summarizes_log(self):
+        """
+        test para verificar que el comando slow_queries agrupe el log por consulta
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "slow.log")
+        with open(path, "w") as handle:
+            for city, ms in (("Berisso", 150), ("La Plata", 400)):
+                sql = f"SELECT * FROM \"app_client\" WHERE \"city\" = '{city}'"
+                handle.write(json.dumps({
+                    "duration_ms": ms, "view": "clients_repo", "sql": sql,
+                    "fingerprint": slow_queries.fingerprint(sql), "params": [],
+                    "plan": ["SCAN app_client"],
+                }) + "\n")
+        output = io.StringIO()
+        call_command("slow_queries", log=path, stdout=output)
+        self.assertIn("2x  total 550.0 ms", output.getvalue())
+        self.assertIn("vistas: clients_repo", output.getvalue())
+        self.assertIn("plan: SCAN app_client", output.getvalue())
+        output = io.StringIO()
+        call_command("slow_queries", log=path, json=True, stdout=output)
+        [group] = json.loads(output.getvalue())
+        self.assertEqual(group["max_ms"], 400)
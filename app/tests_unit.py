@@ -1,18 +1,75 @@
+import base64
+import contextvars
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
 from decimal import Decimal
-
-from django.test import TestCase
-
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import QuerySet
+from django.template import engines
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+from django.utils import timezone
+
+from app import (
+    autocomplete,
+    counts,
+    database,
+    metrics,
+    profiling,
+    routers,
+    slow_queries,
+    startup,
+    templates_warmup,
+    versions,
+)
+from app.filters import filter_queryset
+from app.imports import IMPORTERS, ImportLimitError, import_csv
+from app.logs import SharedRotatingFileHandler
 from app.models import (
     Breed,
     CityEnum,
     Client,
     Medicine,
+    ModelVersion,
     Pet,
     Product,
     Provider,
     Speciality,
     Vet,
+    parse_date,
+)
+from app.pagination import KeysetPaginator, decode_cursor, encode_cursor
+from app.search import FTS5Backend, MemoryBackend, fts5_available
+from app.static_assets import (
+    IMMUTABLE,
+    REVALIDATE,
+    ASGIStaticFilesMiddleware,
+    StaticFilesMiddleware,
 )
+from benchmarks import routes as benchmark_routes
+from benchmarks.common import row_data, seed_rows
+from vetsoft import server
+from vetsoft.databases import database_settings, parse_database_url
+from vetsoft.postgresql_pool.base import DatabaseWrapper as PoolDatabaseWrapper
 
 
 class ClientModelTest(TestCase):
@@ -66,7 +123,7 @@ class ClientModelTest(TestCase):
                 "city": CityEnum.LA_PLATA,
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         client.update_client(  {
                 "name": "Juan Sebastian Veron",
@@ -75,7 +132,7 @@ class ClientModelTest(TestCase):
                 "city": CityEnum.ENSENADA,
             },)
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.phone, 54221555233)
         self.assertEqual(client_updated.email, "guido@vetsoft.com")
@@ -93,7 +150,7 @@ class ClientModelTest(TestCase):
                 "city": CityEnum.ENSENADA,
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         client.update_client({
                 "name": "Juan Sebastian Veron",
@@ -102,7 +159,7 @@ class ClientModelTest(TestCase):
                 "city": CityEnum.ENSENADA,
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.phone, 54221555232)
 
@@ -118,7 +175,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         self.assertEqual(client.city, "Ensenada")
 
@@ -129,7 +186,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.city, "Ensenada")
 
@@ -145,7 +202,7 @@ class ClientModelTest(TestCase):
                 "city": CityEnum.ENSENADA,
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         client.update_client({
                 "name": "Juan Sebastian Veron",
@@ -154,7 +211,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.phone, 54221555232)
 
@@ -171,7 +228,7 @@ class ClientModelTest(TestCase):
                 "city": CityEnum.ENSENADA,
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         # Intentamos actualizar el cliente con un teléfono no numérico
         client.update_client({
@@ -182,7 +239,7 @@ class ClientModelTest(TestCase):
             })
 
         # Verificamos que el teléfono del cliente no haya cambiado
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
         self.assertEqual(client_updated.phone, 54221555232)
 
     def test_update_client_with_error_empty_email(self):
@@ -197,7 +254,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         client.update_client({
                 "name": "Juan Sebastian Veron",
@@ -206,7 +263,7 @@ class ClientModelTest(TestCase):
                 "email": "",
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.email, "brujita75@vetsoft.com")
 
@@ -222,7 +279,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         client.update_client({
                 "name": "Juan Sebastian Veron",
@@ -231,7 +288,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@hotmail.com",
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.email, "brujita75@vetsoft.com")
 
@@ -247,7 +304,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         client.update_client({
                 "name": "Juan 123",
@@ -256,7 +313,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.name, "Juan Sebastian Veron")
 
@@ -275,7 +332,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             },
         )
-        client = Client.objects.get(pk=1)
+        client = Client.objects.get()
 
         self.assertEqual(client.city, "Ensenada")
 
@@ -286,7 +343,7 @@ class ClientModelTest(TestCase):
                 "email": "brujita75@vetsoft.com",
             })
 
-        client_updated = Client.objects.get(pk=1)
+        client_updated = Client.objects.get()
 
         self.assertEqual(client_updated.city, "Ensenada")
 
@@ -323,13 +380,13 @@ class ProductModelTest(TestCase):
                 "price": "1454.3",
             },
         )
-        product = Product.objects.get(pk=1)
+        product = Product.objects.get()
 
         self.assertEqual(product.price, 1454.3)
 
         product.update_product({"price": 1454.3})
 
-        product_updated = Product.objects.get(pk=1)
+        product_updated = Product.objects.get()
 
         self.assertEqual(product_updated.price, 1454.3)
 
@@ -344,16 +401,29 @@ class ProductModelTest(TestCase):
                 "price": "1454.3",
             },
         )
-        product = Product.objects.get(pk=1)
+        product = Product.objects.get()
 
         self.assertEqual(product.price, 1454.3)
 
         product.update_product({"name": "Whiskas", "type": "Gato adulto","price": ""})
 
-        product_updated = Product.objects.get(pk=1)
+        product_updated = Product.objects.get()
 
         self.assertEqual(product_updated.price, 1454.3)
 
+    def test_update_product_returns_errors(self):
+        """Un precio invalido no se guarda y se informa como error"""
+        Product.save_product({"name": "Whiskas", "type": "Gato adulto", "price": "1454.3"})
+        product = Product.objects.get()
+
+        saved, errors = product.update_product({"price": "-5"})
+
+        self.assertFalse(saved)
+        self.assertIn("price", errors)
+        self.assertEqual(Product.objects.get().price, 1454.3)
+        self.assertEqual(product.update_product({"price": "99.5"}), (True, None))
+        self.assertEqual(Product.objects.get().price, 99.5)
+
     def test_product_price_no_negative(self):
         """"
         Se crea un producto y se verifica que se haya creado correctamente
@@ -510,14 +580,14 @@ class PetModelTest(TestCase):
             },
         )
 
-        pet = Pet.objects.get(pk=1)
+        pet = Pet.objects.get()
         pet.update_pet({
                 "name": "Fido",
                 "breed": Breed.BOXER,
                 "birthday": "01/01/2015",
                 "weight": "1000",
             })
-        pet_updated = Pet.objects.get(pk=1)
+        pet_updated = Pet.objects.get()
 
 
         self.assertEqual(pet_updated.weight, Decimal("1000"))
@@ -538,14 +608,14 @@ class PetModelTest(TestCase):
                 "weight": "1.50",
             },
         )
-        pet = Pet.objects.get(pk=1)
+        pet = Pet.objects.get()
         pet.update_pet({
                 "name": "cambio",
                 "breed": Breed.GOLDEN_RETRIEVER,
                 "birthday": "01/01/2015",
                 "weight": "3333.33",
             })
-        pet_updated = Pet.objects.get(pk=1)
+        pet_updated = Pet.objects.get()
         self.assertEqual(pet_updated.weight, Decimal("3333.33"))
         self.assertEqual(pet_updated.breed, "Golden Retriever")
 
@@ -562,14 +632,14 @@ class PetModelTest(TestCase):
                 "weight": "10.50",
             },
         )
-        pet = Pet.objects.get(pk=1)
+        pet = Pet.objects.get()
         pet.update_pet({
                 "name": "Fido",
                 "breed": "",
                 "birthday": "01/01/2015",
                 "weight": "10.50",
                 })
-        pet_updated = Pet.objects.get(pk=1)
+        pet_updated = Pet.objects.get()
         self.assertEqual(pet_updated.breed, Breed.GOLDEN_RETRIEVER)
 
     def test_update_pet_with_error_bad_breed(self):
@@ -585,14 +655,14 @@ class PetModelTest(TestCase):
                 "weight": "10.50",
             },
         )
-        pet = Pet.objects.get(pk=1)
+        pet = Pet.objects.get()
         pet.update_pet({
                 "name": "Fido",
                 "breed": "Con esta raza no deberia updatear",
                 "birthday": "01/01/2015",
                 "weight": "10.50",
                 })
-        pet_updated = Pet.objects.get(pk=1)
+        pet_updated = Pet.objects.get()
         self.assertEqual(pet_updated.breed, Breed.GOLDEN_RETRIEVER)
 
     def test_update_pet_with_error_bad_weight(self):
@@ -608,14 +678,14 @@ class PetModelTest(TestCase):
                 "weight": "10.50",
             },
         )
-        pet = Pet.objects.get(pk=1)
+        pet = Pet.objects.get()
         pet.update_pet({
                 "name": "Fido",
                 "breed": Breed.GOLDEN_RETRIEVER,
                 "birthday": "01/01/2015",
                 "weight": "Con este peso no deberia updatear",
                 })
-        pet_updated = Pet.objects.get(pk=1)
+        pet_updated = Pet.objects.get()
         self.assertEqual(pet_updated.weight, Decimal("10.50"))
 
 
@@ -743,7 +813,7 @@ class VetModelTest(TestCase):
                 "speciality": Speciality.CARDIOLOGO,
             },
         )
-        vet = Vet.objects.get(pk=1)
+        vet = Vet.objects.get()
 
         self.assertEqual(vet.speciality, Speciality.CARDIOLOGO)
 
@@ -755,7 +825,7 @@ class VetModelTest(TestCase):
                 "speciality": Speciality.DERMATOLOGO,
             },
         )
-        vet_updated = Vet.objects.get(pk=1)
+        vet_updated = Vet.objects.get()
 
         self.assertEqual(vet_updated.speciality, Speciality.DERMATOLOGO)
 
@@ -771,7 +841,7 @@ class VetModelTest(TestCase):
                 "speciality": Speciality.DERMATOLOGO,
             },
         )
-        vet = Vet.objects.get(pk=1)
+        vet = Vet.objects.get()
 
         self.assertEqual(vet.speciality, Speciality.DERMATOLOGO)
 
@@ -784,7 +854,7 @@ class VetModelTest(TestCase):
             },
         )
 
-        vet_updated = Vet.objects.get(pk=1)
+        vet_updated = Vet.objects.get()
         # como no se actualizo la especialidad deberia ser la misma
         self.assertEqual(vet_updated.speciality, Speciality.DERMATOLOGO)
 
@@ -800,7 +870,7 @@ class VetModelTest(TestCase):
                 "speciality": Speciality.DERMATOLOGO,
             },
         )
-        vet = Vet.objects.get(pk=1)
+        vet = Vet.objects.get()
 
         self.assertEqual(vet.speciality, Speciality.DERMATOLOGO)
 
@@ -813,7 +883,7 @@ class VetModelTest(TestCase):
             },
         )
 
-        vet_updated = Vet.objects.get(pk=1)
+        vet_updated = Vet.objects.get()
         # como no se actualizo la especialidad deberia ser la misma
         self.assertEqual(vet_updated.speciality, Speciality.DERMATOLOGO)
 
@@ -829,7 +899,7 @@ class VetModelTest(TestCase):
                 "speciality": Speciality.DERMATOLOGO,
             },
         )
-        vet = Vet.objects.get(pk=1)
+        vet = Vet.objects.get()
 
         self.assertEqual(vet.speciality, Speciality.DERMATOLOGO)
 
@@ -842,7 +912,7 @@ class VetModelTest(TestCase):
             },
         )
 
-        vet_updated = Vet.objects.get(pk=1)
+        vet_updated = Vet.objects.get()
         # como no se actualizo la especialidad deberia ser la misma
         self.assertEqual(vet_updated.speciality, Speciality.DERMATOLOGO)
 
@@ -877,7 +947,7 @@ class ProviderModelTest(TestCase):
                 "direccion": "casa",
             },
         )
-        provider = Provider.objects.get(pk=1)
+        provider = Provider.objects.get()
 
         self.assertEqual(provider.direccion, "casa")
 
@@ -887,7 +957,7 @@ class ProviderModelTest(TestCase):
                 "direccion": "facultad",
             })
 
-        provider_updated = Provider.objects.get(pk=1)
+        provider_updated = Provider.objects.get()
 
         self.assertEqual(provider_updated.direccion, "facultad")
 
@@ -902,13 +972,13 @@ class ProviderModelTest(TestCase):
                 "direccion": "12 y 47",
             },
         )
-        provider = Provider.objects.get(pk=1)
+        provider = Provider.objects.get()
 
         self.assertEqual(provider.direccion, "12 y 47")
 
         provider.update_provider({"direccion": ""})
 
-        provider_updated = Provider.objects.get(pk=1)
+        provider_updated = Provider.objects.get()
 
         self.assertEqual(provider_updated.direccion, "12 y 47")
 
@@ -924,3 +994,1298 @@ class ProviderModelTest(TestCase):
         self.assertFalse(valid)
         self.assertIn("direccion", errors)
         self.assertEqual(errors["direccion"], "Por favor ingrese una direccion")
+
+
+class KeysetPaginatorTest(TestCase):
+    """Test de la paginacion por cursor en app.pagination"""
+    def setUp(self):
+        """Crea 7 medicinas para paginar de a 3"""
+        for dose in range(1, 8):
+            Medicine.objects.create(name=f"Med {dose}", description="desc", dose=dose)
+
+    def test_cursor_roundtrip(self):
+        """Un cursor codificado se decodifica a los mismos valores"""
+        self.assertEqual(decode_cursor(encode_cursor(["Beagle", 12])), ["Beagle", 12])
+
+    def test_invalid_cursor_is_ignored(self):
+        """Un token invalido se interpreta como la primera pagina"""
+        self.assertIsNone(decode_cursor("no-es-un-cursor"))
+        page = KeysetPaginator(Medicine.objects.all(), per_page=3).page(after="%%%")
+        self.assertEqual([m.dose for m in page], [1, 2, 3])
+
+    def test_malformed_cursor_is_ignored(self):
+        """Un cursor bien codificado pero con tipos adulterados vuelve a la primera pagina"""
+        name = Medicine._meta.get_field("name")
+        tampered = [
+            {"name": "Med 1", "id": 1},
+            ["Med 1", "1"],
+            ["Med 1", True],
+            [{"a": 1}, 1],
+            [["Med 1"], 1],
+            [3, 1],
+            None,
+        ]
+        for values in tampered:
+            token = encode_cursor(values) if isinstance(values, list) else (
+                base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            )
+            with self.subTest(values=values):
+                self.assertIsNone(decode_cursor(token, name))
+                paginator = KeysetPaginator(Medicine.objects.all(), per_page=3, ordering="name")
+                self.assertEqual(len(paginator.page(after=token)), 3)
+                self.assertEqual(len(paginator.page(before=token)), 3)
+        self.assertEqual(decode_cursor(encode_cursor(["Med 1", 1]), name), ["Med 1", 1])
+        by_id = KeysetPaginator(Medicine.objects.all(), per_page=3, ordering="id")
+        self.assertEqual(len(by_id.page(after=encode_cursor(["Med 1", 1]))), 3)
+
+    def test_walk_forward_and_backward(self):
+        """Se recorren las paginas hacia adelante y hacia atras"""
+        paginator = KeysetPaginator(Medicine.objects.all(), per_page=3)
+
+        first = paginator.page()
+        self.assertEqual([m.dose for m in first], [1, 2, 3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.page(after=first.next_cursor)
+        self.assertEqual([m.dose for m in second], [4, 5, 6])
+
+        last = paginator.page(after=second.next_cursor)
+        self.assertEqual([m.dose for m in last], [7])
+        self.assertFalse(last.has_next())
+
+        back = paginator.page(before=last.previous_cursor)
+        self.assertEqual([m.dose for m in back], [4, 5, 6])
+        self.assertTrue(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_ordering_by_column_with_ties(self):
+        """Ordenando por una columna con repetidos no se pierden ni repiten filas"""
+        Medicine.objects.update(name="Igual")
+        paginator = KeysetPaginator(Medicine.objects.all(), per_page=2, ordering="-name")
+
+        seen = []
+        page = paginator.page()
+        while True:
+            seen.extend(m.dose for m in page)
+            if not page.has_next():
+                break
+            page = paginator.page(after=page.next_cursor)
+
+        self.assertEqual(sorted(seen), list(range(1, 8)))
+        self.assertEqual(len(seen), 7)
+
+
+class CsvImportTest(TestCase):
+    """Test de la importacion masiva de CSV en app.imports"""
+    def test_imports_valid_rows_and_reports_invalid_ones(self):
+        """Las filas validas se insertan y las invalidas se informan con su linea"""
+        stream = io.StringIO(
+            "name,phone,email,city\n"
+            "Juan Perez,54221555232,juan@vetsoft.com,La Plata\n"
+            "Ana 2,54221555233,ana@vetsoft.com,La Plata\n"
+            "Luis Diaz,54221555234,luis@vetsoft.com,Berisso\n",
+        )
+        result = import_csv("clients", stream, batch_size=1)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.rows, 3)
+        self.assertEqual(result.errors[0]["line"], 3)
+        self.assertIn("name", result.errors[0]["errors"])
+        self.assertEqual(
+            list(Client.objects.order_by("id").values_list("name", flat=True)),
+            ["Juan Perez", "Luis Diaz"],
+        )
+
+    def test_pet_rows_use_form_date_format(self):
+        """Las mascotas se importan con la fecha en formato DD/MM/YYYY"""
+        stream = io.StringIO(
+            "name,breed,birthday,weight\nFirulais,Beagle,01/02/2020,5.5\n",
+        )
+        result = import_csv("pets", stream)
+
+        self.assertEqual(result.created, 1)
+        pet = Pet.objects.get()
+        self.assertEqual(str(pet.birthday), "2020-02-01")
+        self.assertEqual(pet.weight, Decimal("5.5"))
+
+    def test_rows_are_parsed_once(self):
+        """El validador retorna los valores convertidos y la fecha no se vuelve a parsear"""
+        _, clean = IMPORTERS["pets"]
+        cleaned, errors = clean(
+            {"name": "Firulais", "breed": "Beagle", "birthday": "01/02/2020", "weight": "5.5"},
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual(cleaned["birthday"], date(2020, 2, 1))
+        self.assertEqual(cleaned["weight"], Decimal("5.5"))
+        self.assertEqual(clean({"name": "Firulais"})[0], None)
+
+        stream = io.StringIO("name,breed,birthday,weight\nFirulais,Beagle,01/02/2020,5.5\n")
+        with mock.patch("app.models.parse_date", wraps=parse_date) as parse:
+            import_csv("pets", stream)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_short_rows_are_reported_not_raised(self):
+        """Una fila con columnas faltantes se informa como error de validacion"""
+        result = import_csv("products", io.StringIO("name,type,price\nCollar\n"))
+        self.assertEqual(result.created, 0)
+        self.assertIn("price", result.errors[0]["errors"])
+
+    def test_dry_run_does_not_insert(self):
+        """Con dry_run solo se valida"""
+        stream = io.StringIO("name,description,dose\nIbuprofeno,Dolor,2\n")
+        result = import_csv("medicines", stream, dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(Medicine.objects.count(), 0)
+
+    def test_max_rows_rejects_the_whole_file(self):
+        """Si el archivo supera max_rows no se inserta ninguna fila"""
+        stream = io.StringIO("name,description,dose\nIbuprofeno,Dolor,2\nAspirina,Dolor,1\n")
+        with self.assertRaises(ImportLimitError):
+            import_csv("medicines", stream, batch_size=1, max_rows=1)
+        self.assertEqual(Medicine.objects.count(), 0)
+
+        stream = io.StringIO("name,description,dose\nIbuprofeno,Dolor,2\n")
+        self.assertEqual(import_csv("medicines", stream, max_rows=1).created, 1)
+
+    def test_created_instances_are_indexed(self):
+        """Las filas insertadas como tuplas llegan a bulk_created con su id y sus valores"""
+        stream = io.StringIO("name,phone,email,city\nÁlvaro Núñez,54221555232,a@vetsoft.com,La Plata\n")
+        with mock.patch("app.imports.bulk_created.send") as send:
+            import_csv("clients", stream)
+        client = Client.objects.get()
+        created = send.call_args.kwargs["objs"]
+        self.assertEqual([obj.pk for obj in created], [client.pk])
+        self.assertEqual(created[0].name, "Álvaro Núñez")
+        self.assertFalse(created[0]._state.adding)
+        self.assertEqual(client.name_search, "alvaro nunez")
+
+
+@skipUnlessDBFeature("supports_expression_indexes")
+class LookupIndexQueryPlanTest(TestCase):
+    """Verifica con EXPLAIN que los filtros de los repositorios usen los indices"""
+    def assertUsesIndex(self, queryset, index_name):
+        """Falla si el plan de la consulta no menciona el indice"""
+        if connection.vendor != "sqlite":
+            self.skipTest("El plan se verifica con EXPLAIN QUERY PLAN de SQLite")
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=plan)
+
+    def test_client_filters(self):
+        """Email, ciudad y nombre normalizado usan sus indices"""
+        self.assertUsesIndex(Client.objects.filter(email="a@vetsoft.com"), "client_email_idx")
+        self.assertUsesIndex(
+            Client.objects.filter(city=CityEnum.BERISSO).order_by("name"),
+            "client_city_name_idx",
+        )
+        self.assertUsesIndex(
+            Client.objects.filter(name_search__gte="ju", name_search__lt="jv"),
+            "client_name_search_idx",
+        )
+
+    def test_pet_filters(self):
+        """Raza y rango de fechas de nacimiento usan el indice compuesto"""
+        self.assertUsesIndex(
+            Pet.objects.filter(breed=Breed.BEAGLE, birthday__gte="2020-01-01"),
+            "pet_breed_birthday_idx",
+        )
+        self.assertUsesIndex(
+            Pet.objects.filter(birthday__range=("2020-01-01", "2020-12-31")),
+            "pet_birthday_idx",
+        )
+
+    def test_vet_product_and_medicine_filters(self):
+        """Especialidad, tipo de producto y nombre de medicina usan sus indices"""
+        self.assertUsesIndex(
+            Vet.objects.filter(speciality=Speciality.DENTISTA), "vet_speciality_name_idx",
+        )
+        self.assertUsesIndex(
+            Product.objects.filter(type="Alimento", price__lte=100), "product_type_price_idx",
+        )
+        self.assertUsesIndex(Medicine.objects.filter(name="Ibuprofeno"), "medicine_name_idx")
+
+    def test_keyset_ordering_by_name(self):
+        """La paginacion ordenada por nombre recorre el indice sin ordenar la tabla"""
+        queryset = Provider.objects.filter(name__gt="M").order_by("name", "id")[:50]
+        self.assertUsesIndex(queryset, "provider_name_idx")
+        self.assertNotIn("TEMP B-TREE", queryset.explain())
+
+    def test_repository_filters_use_indexes(self):
+        """Los filtros de los repositorios (app.filters) se traducen a consultas indexadas"""
+        queryset, _ = filter_queryset("pets", Pet.objects.all(), {"q": "fir"})
+        self.assertUsesIndex(queryset, "pet_name_search_idx")
+
+        queryset, _ = filter_queryset(
+            "pets", Pet.objects.all(), {"breed": "Beagle", "birthday_from": "01/01/2020"},
+        )
+        self.assertUsesIndex(queryset, "pet_breed_birthday_idx")
+
+    def test_name_prefix_uses_pattern_index_on_postgresql(self):
+        """En PostgreSQL el prefijo se busca con LIKE sobre el indice varchar_pattern_ops"""
+        if connection.vendor != "postgresql":
+            self.skipTest("El indice varchar_pattern_ops es de PostgreSQL")
+        queryset, _ = filter_queryset("clients", Client.objects.all(), {"q": "juan p"})
+        with connection.cursor() as cursor:
+            # con la tabla vacia el planificador prefiere recorrerla entera
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn("client_name_search_like", plan, msg=plan)
+
+
+class SearchBackendTestMixin:
+    """Casos comunes a los dos backends del buscador global"""
+    def make_backend(self):
+        """Retorna el backend a probar"""
+        raise NotImplementedError
+
+    def setUp(self):
+        """Crea una entidad de cada tipo"""
+        self.client_obj = Client.objects.create(
+            name="Juan Sebastián Veron", phone="54221555232",
+            email="brujita75@vetsoft.com", city=CityEnum.LA_PLATA,
+        )
+        Provider.objects.create(name="Distribuidora Sur", email="sur@gmail.com", direccion="12 y 47")
+        Medicine.objects.create(name="Ibuprofeno", description="Calma el dolor de Juan", dose=2)
+        self.backend = self.make_backend()
+
+    def test_finds_by_name_prefix_without_accents(self):
+        """Encuentra por prefijo del nombre ignorando mayusculas y acentos"""
+        results = self.backend.search("sebas")
+        self.assertEqual([(r.kind, r.object_id) for r in results], [("client", self.client_obj.id)])
+        self.assertEqual(results[0].label, "Cliente")
+        self.assertEqual(results[0].url, f"/clientes/editar/{self.client_obj.id}/")
+
+    def test_finds_by_address_and_description(self):
+        """Encuentra proveedores por direccion y medicinas por descripcion"""
+        self.assertEqual([r.title for r in self.backend.search("12 47")], ["Distribuidora Sur"])
+        self.assertEqual([r.title for r in self.backend.search("dolor")], ["Ibuprofeno"])
+
+    def test_title_matches_rank_first(self):
+        """Una coincidencia en el nombre pesa mas que una en la descripcion"""
+        results = self.backend.search("juan")
+        self.assertEqual([r.kind for r in results], ["client", "medicine"])
+
+    def test_kind_filter(self):
+        """Se puede restringir la busqueda a un tipo"""
+        results = self.backend.search("juan", kind="medicine")
+        self.assertEqual([r.title for r in results], ["Ibuprofeno"])
+
+    def test_index_follows_saves_and_deletes(self):
+        """El indice se actualiza al editar y al eliminar"""
+        self.client_obj.update_client({
+            "name": "Pedro Gomez", "phone": "54221555232",
+            "email": "pedro@vetsoft.com", "city": CityEnum.BERISSO,
+        })
+        self.assertEqual(self.backend.search("sebastian"), [])
+        self.assertEqual([r.title for r in self.backend.search("pedro")], ["Pedro Gomez"])
+
+        self.client_obj.delete()
+        self.assertEqual(self.backend.search("pedro"), [])
+
+    def test_bulk_import_is_indexed(self):
+        """Las filas importadas en lote tambien quedan en el indice"""
+        import_csv("pets", io.StringIO("name,breed,birthday,weight\nRocco,Boxer,01/02/2020,5\n"))
+        self.assertEqual([r.title for r in self.backend.search("rocco")], ["Rocco"])
+
+    def test_title_match_is_not_dropped_by_newer_matches(self):
+        """Una coincidencia vieja en el titulo va primero aunque haya mas de SEARCH_MAX_RANKED nuevas en el cuerpo"""
+        for dose in range(1, 6):
+            Medicine.objects.create(name=f"Aspirina {dose}", description="Para Juan", dose=dose)
+        # con 3 candidatos por nivel el cliente puede ocupar uno: su rowid depende del
+        # id, que en PostgreSQL no se reinicia entre tests
+        with self.settings(SEARCH_MAX_RANKED=3):
+            results = self.backend.search("juan", limit=3)
+        self.assertEqual([r.kind for r in results], ["client", "medicine", "medicine"])
+        self.assertTrue(results.truncated)
+        self.assertFalse(self.backend.search("juan").truncated)
+
+    def test_levels_rank_exact_title_words_first(self):
+        """Las palabras completas en el titulo van antes que los prefijos y que el cuerpo"""
+        Client.objects.create(
+            name="Juana Molina", phone="54221555233",
+            email="juana@vetsoft.com", city=CityEnum.LA_PLATA,
+        )
+        results = self.backend.search("juan")
+        self.assertEqual(
+            [r.title for r in results], ["Juan Sebastián Veron", "Juana Molina", "Ibuprofeno"],
+        )
+        medicines = self.backend.search("juan", kind="medicine")
+        self.assertEqual([r.title for r in medicines], ["Ibuprofeno"])
+
+
+class FTS5SearchTest(SearchBackendTestMixin, TestCase):
+    """Test del buscador global sobre la tabla virtual FTS5"""
+    def make_backend(self):
+        """Usa la tabla FTS5 creada por la migracion"""
+        if not fts5_available():
+            self.skipTest("SQLite sin FTS5")
+        return FTS5Backend()
+
+
+class MemorySearchTest(SearchBackendTestMixin, TestCase):
+    """Test del indice invertido en memoria"""
+    def make_backend(self):
+        """Crea un indice nuevo, cargado desde la base y conectado a las senales"""
+        backend = MemoryBackend()
+        backend.ensure_loaded()
+        patcher = mock.patch("app.search._backend", backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return backend
+
+    def test_reloads_changes_from_other_workers(self):
+        """Si otro worker cambia un modelo la version difiere y el indice se recarga"""
+        # bulk_create directo no envia senales: es como una fila creada por otro proceso
+        Medicine.objects.bulk_create([Medicine(name="Paracetamol", description="desc", dose=1)])
+        self.assertEqual(self.backend.search("paracetamol"), [])
+        versions.bump(Medicine)
+        self.assertEqual([r.title for r in self.backend.search("paracetamol")], ["Paracetamol"])
+
+    def test_own_changes_do_not_reload(self):
+        """Los cambios de este worker se aplican al indice sin volver a cargarlo"""
+        Medicine.objects.create(name="Paracetamol", description="desc", dose=1)
+        with mock.patch.object(MemoryBackend, "build") as build, self.assertNumQueries(1):
+            self.assertEqual([r.title for r in self.backend.search("paracetamol")], ["Paracetamol"])
+        build.assert_not_called()
+
+    def test_rolled_back_changes_are_reloaded(self):
+        """Un cambio deshecho por un rollback deja de aparecer en la proxima busqueda"""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Medicine.objects.create(name="Paracetamol", description="desc", dose=1)
+            raise RuntimeError
+        self.assertEqual(self.backend.search("paracetamol"), [])
+
+    def test_stale_index_is_served_while_reloading(self):
+        """Mientras otro thread recarga el indice se busca en el anterior sin volver a cargarlo"""
+        versions.bump(Medicine)
+        self.backend.refreshing = True
+        self.addCleanup(setattr, self.backend, "refreshing", False)
+        with mock.patch.object(MemoryBackend, "build") as build:
+            self.assertEqual([r.title for r in self.backend.search("ibupro")], ["Ibuprofeno"])
+        build.assert_not_called()
+
+    def test_changes_during_reload_reach_the_new_index(self):
+        """Un cambio que llega mientras se arma el indice nuevo tambien se aplica sobre el"""
+        fresh = MemoryBackend.build()
+        self.backend.refreshing = True
+        Medicine.objects.create(name="Paracetamol", description="desc", dose=1)
+        self.backend._swap(fresh)
+        self.backend.refreshing = False
+        self.assertEqual([r.title for r in self.backend.search("paracetamol")], ["Paracetamol"])
+
+
+class AutocompleteIndexTest(TestCase):
+    """Test del indice de prefijos del autocompletado"""
+    def setUp(self):
+        """Crea clientes y vacia los indices para que se carguen desde la base"""
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+        self.martin = Client.objects.create(
+            name="Martín Palermo", phone="54221555232",
+            email="martin@vetsoft.com", city=CityEnum.LA_PLATA,
+        )
+        Client.objects.create(
+            name="Marta Gomez", phone="54221555233",
+            email="marta@vetsoft.com", city=CityEnum.BERISSO,
+        )
+        Client.objects.create(
+            name="Pedro Perez", phone="54221555234",
+            email="pedro@vetsoft.com", city=CityEnum.ENSENADA,
+        )
+
+    def names(self, prefix, limit=autocomplete.DEFAULT_LIMIT):
+        """Nombres sugeridos para un prefijo de cliente"""
+        return [name for _, name in autocomplete.suggest("clients", prefix, limit)]
+
+    def test_suggests_by_prefix_in_order(self):
+        """Sugiere en orden alfabetico sin distinguir mayusculas ni acentos"""
+        self.assertEqual(self.names("MAR"), ["Marta Gomez", "Martín Palermo"])
+        self.assertEqual(self.names("martin"), ["Martín Palermo"])
+        self.assertEqual(self.names("mar", limit=1), ["Marta Gomez"])
+        self.assertEqual(self.names("z"), [])
+        self.assertEqual(self.names("  "), [])
+
+    def test_does_not_query_once_loaded(self):
+        """Una vez cargado el indice las sugerencias no consultan la base"""
+        self.names("m")
+        with self.assertNumQueries(0):
+            self.names("ma")
+
+    def test_follows_saves_deletes_and_imports(self):
+        """El indice se actualiza al editar, eliminar e importar en lote"""
+        self.names("m")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.martin.update_client({
+                "name": "Mariano Andujar", "phone": "54221555232",
+                "email": "martin@vetsoft.com", "city": CityEnum.LA_PLATA,
+            })
+        self.assertEqual(self.names("mar"), ["Mariano Andujar", "Marta Gomez"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.martin.delete()
+        self.assertEqual(self.names("mar"), ["Marta Gomez"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_csv(
+                "clients",
+                io.StringIO(
+                    "name,phone,email,city\n"
+                    "Marcos Rojo,54221555235,marcos@vetsoft.com,La Plata\n",
+                ),
+            )
+        self.assertEqual(self.names("mar"), ["Marcos Rojo", "Marta Gomez"])
+
+    def test_changes_apply_on_commit(self):
+        """Un alta deshecha por un rollback no queda en el indice"""
+        self.names("m")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Client.objects.create(
+                    name="Mariana Lopez", phone="54221555239",
+                    email="mariana@vetsoft.com", city=CityEnum.LA_PLATA,
+                )
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.names("mariana"), [])
+
+    def test_large_import_reloads_after_commit(self):
+        """Un lote grande recarga el indice al confirmarse, sin vaciarlo"""
+        self.names("m")
+        rows = "".join(
+            f"Mario Bros,5422155{number:04d},mario{number}@vetsoft.com,La Plata\n"
+            for number in range(autocomplete.BULK_RELOAD_THRESHOLD + 1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            import_csv("clients", io.StringIO("name,phone,email,city\n" + rows))
+        self.assertTrue(autocomplete.INDEXES["clients"].loaded)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.names("mario", limit=autocomplete.MAX_LIMIT)), 50)
+
+    def test_large_import_during_reload_asks_for_another(self):
+        """Un lote grande que llega durante una recarga hace que se vuelva a cargar"""
+        self.names("m")
+        index = autocomplete.INDEXES["clients"]
+        values_list = Client.objects.values_list
+        existing = [client.pk for client in Client.objects.all()]
+        reads = []
+
+        def read_names(*args, **kwargs):
+            reads.append(args)
+            if len(reads) > 1:
+                return values_list(*args, **kwargs)
+            # la importacion se confirma despues de que la carga leyo la base
+            Client.objects.create(
+                name="Mario Bros", phone="54221555299",
+                email="mario@vetsoft.com", city=CityEnum.LA_PLATA,
+            )
+            index.refresh()
+            return values_list(*args, **kwargs).filter(pk__in=existing)
+
+        with mock.patch.object(Client.objects, "values_list", read_names):
+            index.refresh()
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(self.names("mario"), ["Mario Bros"])
+        self.assertFalse(index.refreshing)
+
+    def test_reloads_after_max_age(self):
+        """Con AUTOCOMPLETE_MAX_AGE vencido se vuelve a leer la base"""
+        self.names("p")
+        Client.objects.filter(name="Pedro Perez").update(name="Pablo Perez")
+        self.assertEqual(self.names("p"), ["Pedro Perez"])
+        index = autocomplete.INDEXES["clients"]
+        index.loaded_at -= 10
+        with self.settings(AUTOCOMPLETE_MAX_AGE=5):
+            self.assertEqual(self.names("p"), ["Pablo Perez"])
+
+    def test_stale_index_is_served_while_reloading(self):
+        """Mientras otro thread recarga el indice se sigue sugiriendo con el anterior"""
+        self.names("p")
+        index = autocomplete.INDEXES["clients"]
+        index.loaded_at -= 10
+        index.refreshing = True
+        self.addCleanup(setattr, index, "refreshing", False)
+        with self.settings(AUTOCOMPLETE_MAX_AGE=5), self.assertNumQueries(0):
+            self.assertEqual(self.names("p"), ["Pedro Perez"])
+
+    def test_changes_during_reload_are_kept(self):
+        """Un cambio que llega mientras se arma el indice nuevo se aplica tambien sobre el"""
+        self.names("p")
+        index = autocomplete.INDEXES["clients"]
+        index.loaded_at -= 10
+        values_list = Client.objects.values_list
+
+        def read_names(*args, **kwargs):
+            # el cambio se confirma antes de que la carga lea la base
+            index.add(self.martin.pk, "Zulma Lagos")
+            return values_list(*args, **kwargs)
+
+        with self.settings(AUTOCOMPLETE_MAX_AGE=5), mock.patch.object(
+            Client.objects, "values_list", read_names,
+        ):
+            self.names("p")
+        self.assertEqual(self.names("zul"), ["Zulma Lagos"])
+        self.assertEqual(self.names("martin"), [])
+        self.assertEqual(index.pending, [])
+
+
+class CountCacheTest(TestCase):
+    """Test de las cantidades guardadas en ModelVersion por app.counts"""
+    def setUp(self):
+        """Vacia el cache y crea dos medicinas"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for dose in (1, 2):
+            Medicine.objects.create(name=f"Med {dose}", description="desc", dose=dose)
+
+    def test_count_is_stored(self):
+        """Solo la primera lectura hace COUNT(*), las siguientes leen ModelVersion"""
+        with self.assertNumQueries(3):
+            self.assertEqual(counts.get_count(Medicine), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(counts.get_count(Medicine), 2)
+
+    def test_count_is_shared_between_workers(self):
+        """La cantidad esta en la base, no en el cache local de cada proceso"""
+        counts.get_count(Medicine)
+        cache.clear()
+        Medicine.objects.create(name="Nueva", description="desc", dose=3)
+        with self.assertNumQueries(1):
+            self.assertEqual(counts.get_count(Medicine), 3)
+
+    def test_count_follows_creates_deletes_and_imports(self):
+        """Altas, bajas e importaciones ajustan la cantidad en la misma transaccion"""
+        counts.get_count(Medicine)
+        medicine = Medicine.objects.create(name="Nueva", description="desc", dose=3)
+        import_csv("medicines", io.StringIO("name,description,dose\nOtra,desc,4\n"))
+        Medicine.objects.filter(name="Med 1").delete()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(counts.get_count(Medicine), 3)
+        medicine.save()
+        self.assertEqual(counts.get_count(Medicine), 3)
+
+    def test_count_is_rolled_back(self):
+        """Si la transaccion se deshace la cantidad vuelve a la anterior"""
+        counts.get_count(Medicine)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Medicine.objects.create(name="Nueva", description="desc", dose=3)
+            raise RuntimeError
+        self.assertEqual(counts.get_count(Medicine), 2)
+
+    def test_count_does_not_change_last_modified(self):
+        """Contar no cambia la version ni la fecha del ultimo cambio del modelo"""
+        before = versions.get_version(Medicine)
+        counts.get_count(Medicine)
+        self.assertEqual(versions.get_version(Medicine), before)
+
+    def test_count_is_reconciled_after_timeout(self):
+        """Si paso el intervalo se vuelve a contar en la base"""
+        counts.get_count(Medicine)
+        ModelVersion.objects.filter(label="app.medicine").update(rows=10)
+        with self.settings(COUNT_CACHE_TIMEOUT=0):
+            self.assertEqual(counts.get_count(Medicine), 2)
+
+    def test_reconcile_does_not_lose_concurrent_changes(self):
+        """Un alta entre el COUNT(*) y la escritura del total no se pierde"""
+        counts.get_count(Medicine)
+        count = QuerySet.count
+
+        def count_and_create(queryset):
+            total = count(queryset)
+            Medicine.objects.create(name="Nueva", description="desc", dose=3)
+            return total
+
+        with self.settings(COUNT_CACHE_TIMEOUT=0), mock.patch.object(
+            QuerySet, "count", count_and_create,
+        ):
+            self.assertEqual(counts.get_count(Medicine), 2)
+        self.assertEqual(counts.get_count(Medicine), 3)
+
+    def test_bump_adds_to_row_created_by_a_count(self):
+        """Si un conteo crea la fila mientras se da un alta, el alta igual suma"""
+        ModelVersion.objects.all().delete()
+        get_or_create = ModelVersion.objects.get_or_create
+
+        def count_first(**kwargs):
+            # la fila que escribe un conteo de otra conexion, sin el alta sin confirmar
+            ModelVersion.objects.create(label="app.medicine", rows=2, counted_at=timezone.now())
+            return get_or_create(**kwargs)
+
+        with mock.patch.object(ModelVersion.objects, "get_or_create", count_first):
+            Medicine.objects.create(name="Nueva", description="desc", dose=3)
+        self.assertEqual(counts.get_count(Medicine), 3)
+
+    def test_reconcile_counts_on_primary(self):
+        """El conteo y la escritura van al primario aunque la vista lea de la replica"""
+        version, _ = versions.get_version(Medicine)
+        token = routers._use_replica.set(True)
+        self.addCleanup(routers._use_replica.reset, token)
+        with mock.patch("app.routers.replica_configured", return_value=True):
+            self.assertEqual(counts.reconcile(Medicine, version, timezone.now()), 2)
+        self.assertEqual(ModelVersion.objects.get(label="app.medicine").rows, 2)
+
+    def test_filtered_count_is_bounded(self):
+        """Con filtros se cuenta hasta COUNT_APPROXIMATE_LIMIT"""
+        queryset = Medicine.objects.filter(dose__gte=1)
+        self.assertEqual(counts.count_rows(Medicine, queryset, filtered=True), (2, True))
+        with self.settings(COUNT_APPROXIMATE_LIMIT=1):
+            self.assertEqual(counts.count_rows(Medicine, queryset, filtered=True), (1, False))
+
+
+class TemplateWarmupTest(TestCase):
+    """Test de la precompilacion de templates"""
+    def test_every_app_template_is_cached(self):
+        """warm compila todos los templates de la app y quedan en el loader cacheado"""
+        loader = engines["django"].engine.template_loaders[0]
+        loader.reset()
+        with self.assertLogs("app.templates_warmup", "INFO") as logs:
+            timings = templates_warmup.warm()
+        self.assertIn(f"{len(timings)} templates compilados", logs.output[0])
+
+        names = [name for name, _ in timings]
+        self.assertIn("base.html", names)
+        self.assertIn("partials/navbar.html", names)
+        self.assertEqual(names, templates_warmup.template_names())
+        for name in names:
+            self.assertIn(name, loader.get_template_cache)
+
+
+class StaticAssetsTest(SimpleTestCase):
+    """Test de collectstatic con hash y compresion y del servidor de estaticos"""
+    @classmethod
+    def setUpClass(cls):
+        """Corre collectstatic en una carpeta temporal"""
+        super().setUpClass()
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        cls.root = directory.name
+        with override_settings(STATIC_ROOT=cls.root):
+            call_command("collectstatic", "--noinput", verbosity=0)
+            from django.contrib.staticfiles.storage import staticfiles_storage
+
+            cls.css = staticfiles_storage.stored_name("vendor/bootstrap/bootstrap.min.css")
+
+    def get(self, path, accept_encoding=""):
+        """Pide una ruta al middleware y retorna (status, encabezados, cuerpo)"""
+        calls = {}
+
+        def start_response(status, headers):
+            calls["status"], calls["headers"] = status, dict(headers)
+
+        def fallback(environ, start_response):
+            start_response("404 Not Found", [])
+            return [b"django"]
+
+        middleware = StaticFilesMiddleware(fallback, root=self.root, prefix="/static/")
+        body = b"".join(middleware({
+            "PATH_INFO": path, "REQUEST_METHOD": "GET",
+            "HTTP_ACCEPT_ENCODING": accept_encoding,
+        }, start_response))
+        return calls["status"], calls["headers"], body
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """Los archivos quedan con hash en el nombre y con su variante .gz"""
+        self.assertRegex(self.css, r"^vendor/bootstrap/bootstrap\.min\.[0-9a-f]{12}\.css$")
+        self.assertTrue(os.path.exists(os.path.join(self.root, self.css + ".gz")))
+
+    def test_hashed_file_is_immutable_and_gzipped(self):
+        """Un archivo con hash se sirve comprimido y con cache de un año"""
+        status, headers, body = self.get("/static/" + self.css, "gzip, deflate")
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["Cache-Control"], IMMUTABLE)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertEqual(headers["Content-Length"], str(len(body)))
+        self.assertTrue(headers["Content-Type"].startswith("text/css"))
+
+    def test_plain_file_without_compression(self):
+        """Sin Accept-Encoding se envia el original; sin hash se revalida"""
+        status, headers, body = self.get("/static/vendor/bootstrap/bootstrap.min.css")
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["Cache-Control"], REVALIDATE)
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertIn(b"Bootstrap", body[:200])
+
+    async def test_asgi_serves_the_same_files(self):
+        """La version ASGI envia la variante comprimida con los mismos encabezados"""
+        messages = []
+
+        async def fallback(scope, receive, send):
+            messages.append("django")
+
+        async def send(message):
+            messages.append(message)
+
+        middleware = ASGIStaticFilesMiddleware(fallback, root=self.root, prefix="/static/")
+        scope = {
+            "type": "http", "method": "GET", "path": "/static/" + self.css,
+            "headers": [(b"accept-encoding", b"gzip")],
+        }
+        await middleware(scope, None, send)
+        start, body = messages
+        headers = dict(start["headers"])
+        self.assertEqual(start["status"], 200)
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(headers[b"content-length"], str(len(body["body"])).encode())
+
+        messages.clear()
+        await middleware({**scope, "path": "/clientes/"}, None, send)
+        self.assertEqual(messages, ["django"])
+
+    def test_unknown_paths_go_to_django(self):
+        """Las rutas que no son estaticos conocidos siguen a la aplicacion"""
+        self.assertEqual(self.get("/static/no-existe.css")[2], b"django")
+        self.assertEqual(self.get("/clientes/")[2], b"django")
+
+
+class SQLiteProfileTest(SimpleTestCase):
+    """Test del perfil de PRAGMAs que se aplica a cada conexion SQLite"""
+    def open_file_database(self, directory):
+        """Abre una conexion nueva a un archivo SQLite con la configuracion del proyecto"""
+        if connection.vendor != "sqlite":
+            self.skipTest("El perfil de PRAGMAs es de SQLite")
+        settings_dict = {**connection.settings_dict, "NAME": os.path.join(directory, "t.sqlite3")}
+        wrapper = connections["default"].__class__(settings_dict, alias="profile-test")
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_production_profile_on_new_connections(self):
+        """Una conexion nueva queda en WAL, synchronous=NORMAL y temporales en memoria"""
+        with tempfile.TemporaryDirectory() as directory:
+            values = database.pragma_values(self.open_file_database(directory))
+        self.assertEqual(values["journal_mode"], "wal")
+        self.assertEqual(values["synchronous"], 1)
+        self.assertEqual(values["temp_store"], 2)
+        self.assertEqual(values["cache_size"], settings.SQLITE_PRAGMAS["cache_size"])
+        self.assertEqual(values["mmap_size"], settings.SQLITE_PRAGMAS["mmap_size"])
+
+    def test_default_profile_leaves_sqlite_untouched(self):
+        """Con el perfil "default" no se ejecuta ningun PRAGMA"""
+        with override_settings(SQLITE_PRAGMAS={}), tempfile.TemporaryDirectory() as directory:
+            values = database.pragma_values(
+                self.open_file_database(directory), ["journal_mode", "synchronous"],
+            )
+        self.assertEqual(values, {"journal_mode": "delete", "synchronous": 2})
+
+    def test_rejects_unsafe_pragmas(self):
+        """Los nombres y valores se interpolan en el SQL, asi que se validan"""
+        with override_settings(SQLITE_PRAGMAS={"journal_mode": "wal; DROP TABLE app_client"}):
+            with self.assertRaises(ValueError):
+                database.sqlite_pragmas()
+
+    def test_persistent_connections(self):
+        """Las conexiones se reutilizan entre peticiones, o vuelven al pool, y se verifican antes de usarlas"""
+        if connection.settings_dict["OPTIONS"].get("pool"):
+            self.assertEqual(connection.settings_dict["CONN_MAX_AGE"], 0)
+        else:
+            self.assertGreater(connection.settings_dict["CONN_MAX_AGE"], 0)
+        self.assertTrue(connection.settings_dict["CONN_HEALTH_CHECKS"])
+
+
+class DatabaseUrlTest(SimpleTestCase):
+    """Test de la configuracion de la base a partir de DATABASE_URL"""
+    def test_sqlite_paths(self):
+        """Las urls sqlite admiten rutas relativas, absolutas y memoria"""
+        self.assertEqual(parse_database_url("sqlite:///db.sqlite3")["NAME"], "db.sqlite3")
+        self.assertEqual(parse_database_url("sqlite:////var/db.sqlite3")["NAME"], "/var/db.sqlite3")
+        self.assertEqual(parse_database_url("sqlite://:memory:")["NAME"], ":memory:")
+
+    def test_postgres_url(self):
+        """Credenciales, host, puerto y parametros de una url de PostgreSQL"""
+        config = parse_database_url("postgres://vet%40soft:cl%2Fave@db:5433/vetsoft?sslmode=require")
+        self.assertEqual(config["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(config["NAME"], "vetsoft")
+        self.assertEqual(config["USER"], "vet@soft")
+        self.assertEqual(config["PASSWORD"], "cl/ave")
+        self.assertEqual((config["HOST"], config["PORT"]), ("db", "5433"))
+        self.assertEqual(config["OPTIONS"], {"sslmode": "require"})
+
+    def test_unknown_engine(self):
+        """Un motor no soportado falla al cargar la configuracion"""
+        with self.assertRaises(ValueError):
+            parse_database_url("mysql://localhost/vetsoft")
+
+    def test_engine_specific_options(self):
+        """SQLite recibe el timeout del lock y PostgreSQL el statement_timeout"""
+        options = {"conn_max_age": 60, "sqlite_timeout": 5, "statement_timeout": 2000}
+        sqlite = database_settings("sqlite:///db.sqlite3", **options)
+        postgres = database_settings("postgres://localhost/vetsoft", pooler=True, **options)
+        self.assertEqual(sqlite["OPTIONS"], {"timeout": 5})
+        self.assertEqual(postgres["OPTIONS"]["options"], "-c statement_timeout=2000")
+        self.assertTrue(postgres["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual((postgres["CONN_MAX_AGE"], postgres["CONN_HEALTH_CHECKS"]), (60, True))
+
+    def test_pool_size_uses_pool_engine(self):
+        """Con pool_size PostgreSQL usa el backend con pool y no deja conexiones persistentes"""
+        postgres = database_settings("postgres://localhost/vetsoft", conn_max_age=60, pool_size=4)
+        self.assertEqual(postgres["ENGINE"], "vetsoft.postgresql_pool")
+        self.assertEqual(postgres["OPTIONS"]["pool"], {"min_size": 4, "max_size": 4})
+        self.assertEqual(postgres["CONN_MAX_AGE"], 0)
+        sqlite = database_settings("sqlite:///db.sqlite3", pool_size=4)
+        self.assertEqual(sqlite["ENGINE"], "django.db.backends.sqlite3")
+        self.assertNotIn("pool", sqlite["OPTIONS"])
+
+
+class PostgreSQLPoolTest(SimpleTestCase):
+    """Test del backend de PostgreSQL con pool de conexiones"""
+    databases = {"default"}
+
+    def setUp(self):
+        """El pool solo existe en PostgreSQL"""
+        if connection.vendor != "postgresql":
+            self.skipTest("El pool de conexiones es de PostgreSQL")
+
+    def open_pooled(self):
+        """Abre una conexion nueva a la base de test con un pool de una conexion"""
+        settings_dict = {
+            **connection.settings_dict, "CONN_MAX_AGE": 0,
+            "OPTIONS": {**connection.settings_dict["OPTIONS"], "pool": {"min_size": 1, "max_size": 1}},
+        }
+        wrapper = PoolDatabaseWrapper(settings_dict, alias="pool-test")
+        self.addCleanup(wrapper.close_pool)
+        return wrapper
+
+    def test_close_returns_the_connection_to_the_pool(self):
+        """Cerrar la conexion la devuelve al pool y la proxima reutiliza la misma"""
+        wrapper = self.open_pooled()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            pid = cursor.fetchone()[0]
+        wrapper.close()
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(wrapper.pool.get_stats()["pool_available"], 1)
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            self.assertEqual(cursor.fetchone()[0], pid)
+        wrapper.close()
+
+    def test_open_transaction_is_rolled_back(self):
+        """Una transaccion que quedo abierta no pasa a la siguiente peticion"""
+        wrapper = self.open_pooled()
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.assertTrue(wrapper.connection.autocommit)
+        wrapper.close()
+
+    def test_persistent_connections_are_rejected(self):
+        """Con pool CONN_MAX_AGE tiene que ser 0"""
+        wrapper = self.open_pooled()
+        wrapper.settings_dict["CONN_MAX_AGE"] = 60
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.ensure_connection()
+
+
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    """Test del router que manda las lecturas de las vistas de solo lectura a la replica"""
+    def setUp(self):
+        """Simula que DATABASES tiene el alias de la replica"""
+        patcher = mock.patch("app.routers.replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = routers.PrimaryReplicaRouter()
+
+    def reading_replica(self):
+        """Marca la peticion actual como de solo lectura hasta el final del test"""
+        token = routers._use_replica.set(True)
+        self.addCleanup(routers._use_replica.reset, token)
+
+    def test_reads_outside_read_only_views_use_primary(self):
+        """Sin una vista de solo lectura se lee del primario"""
+        self.assertEqual(self.router.db_for_read(Client), "default")
+
+    def test_read_only_views_use_replica(self):
+        """Dentro de una vista de solo lectura se lee de la replica"""
+        self.reading_replica()
+        self.assertEqual(self.router.db_for_read(Client), "replica")
+        self.assertEqual(self.router.db_for_write(Client), "default")
+
+    def test_transactions_read_from_primary(self):
+        """Dentro de una transaccion del primario se lee del primario"""
+        self.reading_replica()
+        with mock.patch.object(connections["default"], "in_atomic_block", True):
+            self.assertEqual(self.router.db_for_read(Client), "default")
+
+    def test_replica_is_not_migrated(self):
+        """Las migraciones solo se aplican al primario"""
+        self.assertTrue(self.router.allow_migrate("default", "app"))
+        self.assertFalse(self.router.allow_migrate("replica", "app"))
+
+    def test_pin_cookie(self):
+        """La cookie fija al primario hasta la fecha que guarda"""
+        request = mock.Mock(COOKIES={routers.PIN_COOKIE: str(time.time() + 5)})
+        self.assertTrue(routers.is_pinned(request))
+        request.COOKIES[routers.PIN_COOKIE] = str(time.time() - 1)
+        self.assertFalse(routers.is_pinned(request))
+        request.COOKIES[routers.PIN_COOKIE] = "basura"
+        self.assertFalse(routers.is_pinned(request))
+
+
+class ServerSizingTest(SimpleTestCase):
+    """Test del dimensionamiento de gunicorn segun CPUs y memoria"""
+    def write(self, directory, name, content):
+        """Escribe un archivo de prueba y retorna su ruta"""
+        path = os.path.join(directory, name)
+        with open(path, "w") as handle:
+            handle.write(content)
+        return path
+
+    def test_cpu_quota_limits_cpus(self):
+        """La cuota del cgroup acota los CPUs, redondeando hacia arriba"""
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch("os.sched_getaffinity", return_value=set(range(8))):
+            self.assertEqual(server.cpu_count(self.write(directory, "cpu", "150000 100000")), 2)
+            self.assertEqual(server.cpu_count(self.write(directory, "cpu", "max 100000")), 8)
+            self.assertEqual(server.cpu_count(os.path.join(directory, "no-existe")), 8)
+
+    def test_memory_limit(self):
+        """El limite de memoria del cgroup gana si es menor que la del equipo"""
+        with tempfile.TemporaryDirectory() as directory:
+            meminfo = self.write(directory, "meminfo", "MemTotal:       4194304 kB\n")
+            limit = self.write(directory, "limit", str(512 * 1024 * 1024))
+            unlimited = self.write(directory, "unlimited", "max")
+            self.assertEqual(server.memory_mb((limit,), meminfo), 512)
+            self.assertEqual(server.memory_mb((unlimited,), meminfo), 4096)
+
+    def test_worker_count(self):
+        """2 x CPUs + 1 workers, sin pasarse de los que entran en memoria"""
+        self.assertEqual(server.worker_count(2, None, 128), 5)
+        self.assertEqual(server.worker_count(2, 4096, 128, 128), 5)
+        self.assertEqual(server.worker_count(4, 512, 128, 128), 3)
+        self.assertEqual(server.worker_count(4, 100, 128), 1)
+
+
+class StartupMigrationsTest(TestCase):
+    """Test del chequeo de migraciones al arrancar el contenedor"""
+    def test_up_to_date_database_skips_migrate(self):
+        """Con la base al dia no corre migrate y solo consulta django_migrations"""
+        with mock.patch("app.startup.call_command") as migrate, \
+                self.assertLogs("app.startup") as logs, self.assertNumQueries(2):
+            self.assertEqual(startup.migrate_if_needed(), [])
+        migrate.assert_not_called()
+        self.assertIn("al dia", logs.output[0])
+
+    def test_pending_migrations_run_migrate(self):
+        """Si hay migraciones pendientes corre migrate y retorna cuales aplico"""
+        pending = [("app", "0020_nueva")]
+        with mock.patch("app.startup.pending_migrations", return_value=pending), \
+                mock.patch("app.startup.call_command") as migrate, \
+                self.assertLogs("app.startup"):
+            self.assertEqual(startup.migrate_if_needed(), pending)
+        migrate.assert_called_once_with(
+            "migrate", database="default", interactive=False, verbosity=0,
+        )
+
+    def test_migrate_on_start_holds_lock(self):
+        """Al arrancar migra con el lock tomado, para que los workers no migren a la vez"""
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch("app.startup.LOCK_PATH", os.path.join(directory, "migrate.lock")), \
+                mock.patch("app.startup.migrate_if_needed", return_value=[]) as migrate:
+            self.assertEqual(startup.migrate_on_start(), [])
+            migrate.assert_called_once_with("default")
+
+    def test_squashed_migration_replaces_history(self):
+        """La migracion inicial reemplaza todas las migraciones de la app hasta la 0019"""
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        names = {name for app_label, name in loader.disk_migrations if app_label == "app"}
+        squashed = loader.disk_migrations[("app", "0001_squashed_0019_model_version")]
+        replaced = {name for _, name in squashed.replaces}
+        history = {name for name in names if name[:4] <= "0019"}
+        self.assertEqual(replaced, history - {"0001_squashed_0019_model_version"})
+        [leaf] = loader.graph.leaf_nodes("app")
+        self.assertIn(("app", "0001_squashed_0019_model_version"), loader.graph.forwards_plan(leaf))
+
+
+class MetricsRegistryTest(SimpleTestCase):
+    """Test del registro de metricas y su formato Prometheus"""
+    def setUp(self):
+        """Cada test empieza con el registro vacio"""
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Los buckets del histograma acumulan las peticiones mas rapidas"""
+        metrics.registry.record_request("clients_repo", "GET", 200, 0.003, 2, 0.001)
+        metrics.registry.record_request("clients_repo", "GET", 200, 0.2, 3, 0.05)
+        metrics.registry.record_request("clients_repo", "GET", 500, 20, 0, 0)
+        text = metrics.render(metrics.collect())
+        self.assertIn('vetsoft_http_request_duration_seconds_bucket{view="clients_repo",le="0.005"} 1', text)
+        self.assertIn('vetsoft_http_request_duration_seconds_bucket{view="clients_repo",le="0.25"} 2', text)
+        self.assertIn('vetsoft_http_request_duration_seconds_bucket{view="clients_repo",le="10.0"} 2', text)
+        self.assertIn('vetsoft_http_request_duration_seconds_bucket{view="clients_repo",le="+Inf"} 3', text)
+        self.assertIn('vetsoft_http_request_duration_seconds_count{view="clients_repo"} 3', text)
+        self.assertIn('vetsoft_http_errors_total{view="clients_repo"} 1', text)
+        self.assertIn('vetsoft_db_queries_total{view="clients_repo"} 5', text)
+        self.assertIn(
+            'vetsoft_http_requests_total{view="clients_repo",method="GET",status="500"} 1', text,
+        )
+        self.assertIn("# TYPE vetsoft_http_request_duration_seconds histogram", text)
+
+    def test_label_values_are_escaped(self):
+        """Las comillas y barras de las etiquetas se escapan"""
+        self.assertEqual(metrics.format_labels((("view", 'a"b\\c'),)), '{view="a\\"b\\\\c"}')
+
+    def test_collect_sums_worker_files(self):
+        """collect suma los archivos de los demas workers y el archivo acumulado"""
+        with tempfile.TemporaryDirectory() as directory:
+            metrics.registry.record_request("pets_form", "POST", 302, 0.01, 3, 0.002)
+            with override_settings(METRICS_DIR=directory):
+                metrics.registry.flush()
+            own = os.path.join(directory, f"{os.getpid()}.json")
+            # el archivo pasa a ser de un worker que ya termino
+            other = os.path.join(directory, "999999999.json")
+            os.rename(own, other)
+            metrics.mark_process_dead(directory, 999999999)
+            self.assertFalse(os.path.exists(other))
+            metrics.registry.record_request("pets_form", "POST", 302, 0.01, 3, 0.002)
+            with override_settings(METRICS_DIR=directory):
+                metrics.registry.flush()
+            totals = metrics.collect(directory)
+        key = ("counters", "vetsoft_http_requests_total", (
+            ("view", "pets_form"), ("method", "POST"), ("status", "302"),
+        ))
+        # el archivo propio no se lee: el proceso usa su registro en memoria
+        self.assertEqual(totals[key], 3)
+
+    def test_forked_worker_starts_empty(self):
+        """Un worker recien forkeado no hereda las metricas del master"""
+        metrics.registry.record_request("home", "GET", 200, 0.01, 0, 0)
+        with mock.patch("os.getpid", return_value=metrics.registry.pid + 1):
+            snapshot = metrics.registry.snapshot()
+        self.assertFalse(snapshot["histograms"])
+
+
+def busy_loop(seconds):
+    """Funcion que ocupa la CPU, para que el profiler la encuentre en la pila"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+class ProfilingTest(SimpleTestCase):
+    """Test del profiler por muestreo"""
+    def test_sampler_collapses_thread_stack(self):
+        """Las pilas muestreadas empiezan en el frame raiz y terminan en la funcion ocupada"""
+        sampler = profiling.StackSampler({threading.get_ident()}, sys._getframe(), interval=0.001)
+        sampler.start()
+        try:
+            busy_loop(0.05)
+        finally:
+            sampler.stop()
+        self.assertGreater(sampler.samples, 5)
+        stack, count = sampler.stacks.most_common(1)[0]
+        self.assertEqual(stack, "busy_loop (app/tests_unit.py)")
+        line = sampler.collapsed().splitlines()[0]
+        self.assertEqual(line, f"busy_loop (app/tests_unit.py) {count}")
+
+    def test_only_request_threads_are_sampled(self):
+        """Los threads de otras peticiones no aparecen; los sumados con bind_thread si"""
+        def other_request():
+            busy_loop(0.05)
+
+        def bound_thread():
+            profiling.bind_thread()
+            busy_loop(0.05)
+
+        sampler = profiling.StackSampler({threading.get_ident()}, sys._getframe(), interval=0.001)
+        token = profiling._sampler.set(sampler)
+        self.addCleanup(profiling._sampler.reset, token)
+        sampler.start()
+        try:
+            other = threading.Thread(target=other_request)
+            other.start()
+            other.join()
+            # el thread copia el contexto de la peticion, como sync_to_async
+            bound = threading.Thread(target=contextvars.copy_context().run, args=(bound_thread,))
+            bound.start()
+            bound.join()
+        finally:
+            sampler.stop()
+        stacks = sampler.collapsed()
+        self.assertNotIn("other_request", stacks)
+        self.assertIn("bound_thread (app/tests_unit.py);busy_loop", stacks)
+
+    def test_switch_interval_has_a_floor(self):
+        """Un intervalo de muestreo muy chico no baja el de cambio de thread de 1 ms"""
+        original = sys.getswitchinterval()
+        sampler = profiling.StackSampler({threading.get_ident()}, interval=0.0001)
+        sampler.start()
+        self.assertEqual(sys.getswitchinterval(), min(original, profiling.MIN_SWITCH_INTERVAL))
+        sampler.stop()
+        self.assertEqual(sys.getswitchinterval(), original)
+
+    async def test_asgi_samples_the_view_thread(self):
+        """Bajo ASGI se muestrea el thread sincronico de la peticion o el del event loop"""
+        request = RequestFactory().get("/")
+        loop_thread = threading.get_ident()
+        self.assertNotEqual(await profiling.view_thread(request), loop_thread)
+
+        async def async_view(request):
+            pass
+
+        with mock.patch("app.profiling.resolve", return_value=mock.Mock(func=async_view)):
+            self.assertEqual(await profiling.view_thread(request), loop_thread)
+
+    def test_switch_interval_is_restored(self):
+        """El intervalo de cambio de thread vuelve a su valor al terminar el ultimo perfil"""
+        original = sys.getswitchinterval()
+        first = profiling.StackSampler({threading.get_ident()}, interval=0.001)
+        second = profiling.StackSampler({threading.get_ident()}, interval=0.001)
+        first.start()
+        second.start()
+        self.assertLessEqual(sys.getswitchinterval(), 0.001)
+        first.stop()
+        self.assertLessEqual(sys.getswitchinterval(), 0.001)
+        second.stop()
+        self.assertEqual(sys.getswitchinterval(), original)
+
+    @override_settings(PROFILING_TOKEN="secreto")
+    def test_requested_needs_token(self):
+        """Solo se perfila a pedido con el token configurado"""
+        factory = RequestFactory()
+        self.assertTrue(profiling.requested(factory.get("/", HTTP_X_VETSOFT_PROFILE="secreto")))
+        self.assertTrue(profiling.requested(factory.get("/?__profile=secreto")))
+        self.assertFalse(profiling.requested(factory.get("/", HTTP_X_VETSOFT_PROFILE="otro")))
+        self.assertFalse(profiling.requested(factory.get("/")))
+        with override_settings(PROFILING_TOKEN=None):
+            self.assertFalse(profiling.requested(factory.get("/?__profile=")))
+
+    def test_prune_keeps_newest(self):
+        """Se conservan los ultimos PROFILING_KEEP perfiles"""
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILING_KEEP=2):
+            for name in ("1", "2", "3"):
+                for extension in (".json", ".collapsed"):
+                    open(os.path.join(directory, name + extension), "w").close()
+            profiling.prune(directory)
+            self.assertEqual(
+                sorted(os.listdir(directory)), ["2.collapsed", "2.json", "3.collapsed", "3.json"],
+            )
+
+    def test_profile_path_rejects_traversal(self):
+        """No se puede descargar un archivo fuera del directorio de perfiles"""
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(PROFILING_DIR=directory):
+            open(os.path.join(directory, "perfil.collapsed"), "w").close()
+            self.assertIsNotNone(profiling.profile_path("perfil"))
+            self.assertIsNone(profiling.profile_path("../perfil"))
+            self.assertIsNone(profiling.profile_path("otro"))
+
+
+class SlowQueryLogTest(TestCase):
+    """Test del log de consultas lentas y de su resumen"""
+    def test_normalize_groups_same_query(self):
+        """Los literales, LIMIT y el largo de los IN no cambian el fingerprint"""
+        first = 'SELECT * FROM "app_client" WHERE "id" IN (%s, %s, %s) AND "city" = \'Berisso\' LIMIT 20'
+        second = 'SELECT * FROM "app_client" WHERE "id" IN (%s)  AND "city" = \'La Plata\' LIMIT 50'
+        self.assertEqual(
+            slow_queries.normalize(first),
+            'SELECT * FROM "app_client" WHERE "id" IN (...) AND "city" = ? LIMIT ?',
+        )
+        self.assertEqual(slow_queries.fingerprint(first), slow_queries.fingerprint(second))
+        self.assertNotEqual(
+            slow_queries.fingerprint(first),
+            slow_queries.fingerprint('SELECT * FROM "app_pet" WHERE "id" IN (%s)'),
+        )
+
+    def test_normalize_bulk_insert(self):
+        """Un INSERT de varias filas se agrupa sin importar la cantidad de filas"""
+        sql = 'INSERT INTO "app_client" ("name", "city") VALUES (%s, %s), (%s, %s), (%s, %s)'
+        self.assertEqual(
+            slow_queries.normalize(sql), 'INSERT INTO "app_client" ("name", "city") VALUES (...)',
+        )
+
+    def test_printable_truncates_params(self):
+        """Los parametros largos y las listas largas se recortan"""
+        params = slow_queries.printable(["x" * 300, 5, *range(30)])
+        self.assertEqual(params[0], "x" * slow_queries.MAX_PARAM_LENGTH + "...")
+        self.assertEqual(params[1], "5")
+        self.assertEqual(len(params), slow_queries.MAX_PARAMS + 1)
+        self.assertEqual(params[-1], "... (12 mas)")
+
+    def test_explain_returns_plan(self):
+        """El plan menciona el indice en SQLite y la tabla en PostgreSQL, que con la tabla vacia puede no usarlo"""
+        plan = slow_queries.explain(
+            connection, 'SELECT "id" FROM "app_client" WHERE "city" = %s ORDER BY "name"', ["Berisso"],
+        )
+        expected = "client_city_name_idx" if connection.vendor == "sqlite" else "app_client"
+        self.assertTrue(any(expected in step for step in plan), plan)
+        self.assertIsNone(slow_queries.explain(connection, 'DROP TABLE "app_client"', None))
+
+    def test_summarize_orders_by_fingerprint(self):
+        """El resumen agrupa por fingerprint y guarda la ejecucion mas lenta"""
+        entries = [
+            {"fingerprint": "a", "duration_ms": ms, "view": "clients_repo", "sql": "SELECT 1"}
+            for ms in (120, 300, 150)
+        ] + [{"fingerprint": "b", "duration_ms": 500, "view": None, "sql": "SELECT 2"}]
+        summary = {group["fingerprint"]: group for group in slow_queries.summarize(entries)}
+        self.assertEqual(summary["a"]["count"], 3)
+        self.assertEqual(summary["a"]["total_ms"], 570)
+        self.assertEqual(summary["a"]["max_ms"], 300)
+        self.assertEqual(summary["a"]["p95_ms"], 300)
+        self.assertEqual(summary["a"]["slowest"]["duration_ms"], 300)
+        self.assertEqual(summary["b"]["views"], ["-"])
+
+    def test_shared_handler_follows_rotation(self):
+        """Un handler que no roto sigue escribiendo en el archivo nuevo, no en el rotado"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "logs", "slow.log")
+        first = SharedRotatingFileHandler(path, maxBytes=100, backupCount=2)
+        second = SharedRotatingFileHandler(path, maxBytes=100, backupCount=2)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        record = logging.makeLogRecord({"msg": "x" * 80})
+        first.emit(record)
+        second.emit(record)
+        first.emit(record)
+        self.assertTrue(os.path.exists(f"{path}.1"))
+        self.assertTrue(os.path.exists(f"{path}.2"))
+        second.emit(logging.makeLogRecord({"msg": "ultima"}))
+        with open(path) as handle:
+            self.assertIn("ultima", handle.read())
+        self.assertFalse(os.path.exists(f"{path}.3"))
+
+
+class RouteBenchmarkTest(TestCase):
+    """Test del benchmark de carga de las rutas (benchmarks/routes.py)"""
+    def test_every_route_has_a_scenario(self):
+        """Cada ruta con nombre de app/urls.py se carga en el benchmark"""
+        self.assertEqual(benchmark_routes.uncovered(benchmark_routes.scenarios(1000)), [])
+
+    def test_rows_pass_validation(self):
+        """Las filas sembradas y las que se dan de alta pasan el validador de su entidad"""
+        for entity, (_, clean) in IMPORTERS.items():
+            for number in (0, 1, 999, 123456, 999999):
+                with self.subTest(entity=entity, number=number):
+                    self.assertEqual(clean(row_data(entity, number))[1], {})
+
+    def test_seed_rows(self):
+        """seed_rows completa la tabla hasta el total pedido"""
+        seed_rows("pets", 30, batch_size=7)
+        seed_rows("pets", 45)
+        self.assertEqual(Pet.objects.count(), 45)
+        self.assertEqual(Pet.objects.order_by("id").first().name, row_data("pets", 0)["name"])
+
+    def test_parse_size(self):
+        """Los tamanos aceptan sufijos k y m"""
+        self.assertEqual(benchmark_routes.parse_size("1k"), 1000)
+        self.assertEqual(benchmark_routes.parse_size("100K"), 100000)
+        self.assertEqual(benchmark_routes.parse_size("1m"), 1000000)
+        self.assertEqual(benchmark_routes.parse_size("2500"), 2500)
+
+    def test_deletes_stop_at_edited_rows(self):
+        """Las bajas borran la mitad de arriba de los ids y no tocan las que se editan"""
+        [delete] = [
+            scenario for scenario in benchmark_routes.scenarios(10)
+            if scenario.name == "clients_delete POST"
+        ]
+        bodies = []
+        while (built := delete.build(None)) is not None:
+            bodies.append(built[1])
+        self.assertEqual(bodies, [f"client_id={pk}" for pk in range(10, 5, -1)])
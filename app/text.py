@@ -0,0 +1,14 @@
+import unicodedata
+
+
+def normalize(text):
+    """
+    Pasa a minusculas y quita los acentos, igual que el tokenizer unicode61 de FTS5.
+    La usan el buscador y la columna name_search de los modelos.
+    """
+    text = str(text).lower()
+    if text.isascii():
+        # sin acentos que quitar, el caso de casi todos los nombres
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in text if not unicodedata.combining(char))
@@ -1,38 +1,96 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+# con ASYNC_VIEWS (vetsoft/asgi.py) los repositorios, formularios y bajas usan las
+# versiones asincronicas de app/async_views.py
+entity_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path("", view=views.home, name="home"),
+    path("buscar/", view=views.search_view, name="search"),
+    path("autocompletar/<str:entity>/", view=views.autocomplete_view, name="autocomplete"),
+    path("estado/cache/", view=views.cache_stats, name="cache_stats"),
+    path("estado/worker/", view=views.worker_status, name="worker_status"),
+    path("metrics", view=views.metrics_view, name="metrics"),
     # Clientes
-    path("clientes/", view=views.clients_repository, name="clients_repo"),
-    path("clientes/nuevo/", view=views.clients_form, name="clients_form"),
-    path("clientes/editar/<int:id>/", view=views.clients_form, name="clients_edit"),
-    path("clientes/eliminar/", view=views.clients_delete, name="clients_delete"),
+    path("clientes/", view=entity_views.clients_repository, name="clients_repo"),
+    path(
+        "clientes/export.<str:fmt>", view=views.export, kwargs={"entity": "clients"},
+        name="clients_export",
+    ),
+    path(
+        "clientes/importar/", view=views.import_view, kwargs={"entity": "clients"},
+        name="clients_import",
+    ),
+    path("clientes/nuevo/", view=entity_views.clients_form, name="clients_form"),
+    path("clientes/editar/<int:id>/", view=entity_views.clients_form, name="clients_edit"),
+    path("clientes/eliminar/", view=entity_views.clients_delete, name="clients_delete"),
     # Veterinario
-    path("vets/", view=views.vets_repository, name="vets_repo"),
-    path("vets/nuevo/", view=views.vets_form, name="vets_form"),
-    path("vets/eliminar/", view=views.vets_delete, name="vets_delete"),
-    path("vets/editar/<int:id>/", view=views.vets_form, name="vets_edit"),
-    path("providers/", view=views.providers_repository, name="providers_repo"),
-    path("providers/nuevo/", view=views.providers_form, name="providers_form"),
-    path("providers/eliminar/", view=views.providers_delete, name="providers_delete"),
+    path("vets/", view=entity_views.vets_repository, name="vets_repo"),
+    path(
+        "vets/export.<str:fmt>", view=views.export, kwargs={"entity": "vets"},
+        name="vets_export",
+    ),
+    path(
+        "vets/importar/", view=views.import_view, kwargs={"entity": "vets"},
+        name="vets_import",
+    ),
+    path("vets/nuevo/", view=entity_views.vets_form, name="vets_form"),
+    path("vets/eliminar/", view=entity_views.vets_delete, name="vets_delete"),
+    path("vets/editar/<int:id>/", view=entity_views.vets_form, name="vets_edit"),
+    path("providers/", view=entity_views.providers_repository, name="providers_repo"),
+    path(
+        "providers/export.<str:fmt>", view=views.export, kwargs={"entity": "providers"},
+        name="providers_export",
+    ),
+    path(
+        "providers/importar/", view=views.import_view, kwargs={"entity": "providers"},
+        name="providers_import",
+    ),
+    path("providers/nuevo/", view=entity_views.providers_form, name="providers_form"),
+    path("providers/eliminar/", view=entity_views.providers_delete, name="providers_delete"),
     path(
-        "providers/editar/<int:id>/", view=views.providers_form, name="providers_edit",
+        "providers/editar/<int:id>/", view=entity_views.providers_form, name="providers_edit",
     ),
     # Productos
-    path("products/", view=views.products_repository, name="products_repo"),
-    path("products/nuevo", view=views.products_form, name="products_form"),
-    path("products/editar/<int:id>/", view=views.products_form, name="products_edit"),
-    path("products/eliminar/", view=views.products_delete, name="products_delete"),
-    path("pets/", view=views.pets_repository, name="pets_repo"),
-    path("pets/nuevo/", view=views.pets_form, name="pets_form"),
-    path("pets/eliminar/", view=views.pets_delete, name="pets_delete"),
-    path("pets/editar/<int:id>/", view=views.pets_form, name="pets_edit"),
-    path("medicines/", view=views.medicines_repository, name="medicines_repo"),
-    path("medicines/nuevo/", view=views.medicines_form, name="medicines_form"),
-    path("medicines/eliminar/", view=views.medicines_delete, name="medicines_delete"),
-    path(
-        "medicines/editar/<int:id>/", view=views.medicines_form, name="medicines_edit",
+    path("products/", view=entity_views.products_repository, name="products_repo"),
+    path(
+        "products/export.<str:fmt>", view=views.export, kwargs={"entity": "products"},
+        name="products_export",
+    ),
+    path(
+        "products/importar/", view=views.import_view, kwargs={"entity": "products"},
+        name="products_import",
+    ),
+    path("products/nuevo", view=entity_views.products_form, name="products_form"),
+    path("products/editar/<int:id>/", view=entity_views.products_form, name="products_edit"),
+    path("products/eliminar/", view=entity_views.products_delete, name="products_delete"),
+    path("pets/", view=entity_views.pets_repository, name="pets_repo"),
+    path(
+        "pets/export.<str:fmt>", view=views.export, kwargs={"entity": "pets"},
+        name="pets_export",
+    ),
+    path(
+        "pets/importar/", view=views.import_view, kwargs={"entity": "pets"},
+        name="pets_import",
+    ),
+    path("pets/nuevo/", view=entity_views.pets_form, name="pets_form"),
+    path("pets/eliminar/", view=entity_views.pets_delete, name="pets_delete"),
+    path("pets/editar/<int:id>/", view=entity_views.pets_form, name="pets_edit"),
+    path("medicines/", view=entity_views.medicines_repository, name="medicines_repo"),
+    path(
+        "medicines/export.<str:fmt>", view=views.export, kwargs={"entity": "medicines"},
+        name="medicines_export",
+    ),
+    path(
+        "medicines/importar/", view=views.import_view, kwargs={"entity": "medicines"},
+        name="medicines_import",
+    ),
+    path("medicines/nuevo/", view=entity_views.medicines_form, name="medicines_form"),
+    path("medicines/eliminar/", view=entity_views.medicines_delete, name="medicines_delete"),
+    path(
+        "medicines/editar/<int:id>/", view=entity_views.medicines_form, name="medicines_edit",
     ),
 ]
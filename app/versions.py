@@ -0,0 +1,124 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import Client, Medicine, ModelVersion, Pet, Product, Provider, Vet
+from .signals import bulk_created
+
+VERSIONED = (Client, Vet, Provider, Pet, Medicine, Product)
+
+
+def bump(model, delta=0):
+    """
+    Incrementa la version de un modelo y suma `delta` a su cantidad de filas
+    dentro de la transaccion actual, asi un rollback tambien deshace ambos
+    cambios. Si la cantidad todavia no se conto (NULL) sigue en NULL.
+    """
+    label = model._meta.label_lower
+    states = ModelVersion.objects.filter(label=label)
+    changes = {"version": F("version") + 1, "rows": F("rows") + delta, "updated_at": timezone.now()}
+    if not states.update(**changes):
+        _, created = ModelVersion.objects.get_or_create(label=label, defaults={"version": 1})
+        if not created:
+            # la creo un conteo de app.counts mientras tanto, sin este cambio
+            states.update(**changes)
+
+
+def get_state(model):
+    """
+    Retorna (version, fecha del ultimo cambio, filas, fecha del conteo) de un
+    modelo; (0, None, None, None) si nunca cambio ni se conto.
+    """
+    row = (
+        ModelVersion.objects.filter(label=model._meta.label_lower)
+        .values_list("version", "updated_at", "rows", "counted_at")
+        .first()
+    )
+    return row or (0, None, None, None)
+
+
+def get_versions(models, using=None):
+    """Retorna {modelo: version} de varios modelos en una sola consulta"""
+    labels = {model._meta.label_lower: model for model in models}
+    queryset = ModelVersion.objects.using(using) if using else ModelVersion.objects
+    found = dict(queryset.filter(label__in=labels).values_list("label", "version"))
+    return {model: found.get(label, 0) for label, model in labels.items()}
+
+
+def get_version(model):
+    """Retorna (version, fecha del ultimo cambio) de un modelo; (0, None) si nunca cambio"""
+    return get_state(model)[:2]
+
+
+def request_state(model, request):
+    """Fila de ModelVersion leida una sola vez por peticion, para el ETag y la cantidad"""
+    cached = getattr(request, "_model_versions", None)
+    if cached is None:
+        cached = request._model_versions = {}
+    if model not in cached:
+        cached[model] = get_state(model)
+    return cached[model]
+
+
+def request_version(model, request):
+    """Version del modelo leida una sola vez por peticion, para el ETag y Last-Modified"""
+    return request_state(model, request)[:2]
+
+
+def repository_etag(model, request):
+    """
+    ETag de un repositorio: la version del modelo, la url y el token CSRF que
+    queda dentro de los formularios de la pagina.
+    """
+    version, _ = request_version(model, request)
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+    digest = hashlib.sha1(
+        f"{request.get_full_path()}|{csrf_cookie}".encode(), usedforsecurity=False,
+    ).hexdigest()[:16]
+    return f"{model._meta.model_name}-{version}-{digest}"
+
+
+def conditional_repository(model):
+    """
+    Decorador para las vistas de repositorio: si el navegador ya tiene la version
+    actual responde 304 sin consultar el listado ni renderizar la plantilla.
+    Cache-Control: no-cache obliga al navegador a revalidar en cada visita.
+    """
+    conditional = condition(
+        etag_func=lambda request, *args, **kwargs: repository_etag(model, request),
+        last_modified_func=lambda request, *args, **kwargs: request_version(model, request)[1],
+    )
+    revalidate = cache_control(private=True, no_cache=True)
+
+    def decorator(view):
+        return revalidate(conditional(view))
+    return decorator
+
+
+def bump_saved(sender, created, **kwargs):
+    """Receptor de post_save: cambia la version y suma uno por cada fila nueva"""
+    bump(sender, 1 if created else 0)
+
+
+def bump_deleted(sender, **kwargs):
+    """Receptor de post_delete: cambia la version y resta la fila eliminada"""
+    bump(sender, -1)
+
+
+def bump_bulk(sender, objs, **kwargs):
+    """Receptor de bulk_created: cambia la version y suma las filas creadas en lote"""
+    bump(sender, len(objs))
+
+
+def connect_signals():
+    """Conecta los receptores que mantienen la version y la cantidad de cada modelo"""
+    for model in VERSIONED:
+        uid = f"versions-{model._meta.model_name}"
+        post_save.connect(bump_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(bump_deleted, sender=model, dispatch_uid=uid)
+        bulk_created.connect(bump_bulk, sender=model, dispatch_uid=uid)
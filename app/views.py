@@ -1,5 +1,17 @@
+import io
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render, reverse
 
+from . import metrics
+from .autocomplete import AUTOCOMPLETE, DEFAULT_LIMIT, suggest
+from .counts import count_rows
+from .exports import ExportError, export_response
+from .filters import filter_queryset
+from .fragments import repository_table
+from .fragments import stats as fragment_stats
+from .imports import ImportLimitError, get_max_rows, get_max_upload_size, import_csv
 from .models import (
     Breed,
     CityEnum,
@@ -11,6 +23,12 @@ from .models import (
     Speciality,
     Vet,
 )
+from .pagination import paginate
+from .routers import read_only
+from .search import DEFAULT_MAX_RANKED, KIND_CHOICES, search
+from .streaming import stream_repository, wants_stream
+from .versions import conditional_repository
+from .workers import stats as worker_stats
 
 
 def home(request):
@@ -18,10 +36,138 @@ def home(request):
     return render(request, "home.html")
 
 
+@read_only
+def search_view(request):
+    """"
+    Esta funcion busca en todas las entidades por nombre, email, direccion o descripcion.
+    Los resultados van por niveles: primero las coincidencias en el nombre y despues
+    en los demas campos. Dentro de un nivel solo se ordenan las SEARCH_MAX_RANKED
+    coincidencias mas recientes, para no recorrer todo el indice en busquedas muy
+    generales; si hubo mas, la pagina lo avisa y sugiere agregar palabras.
+    """
+    query = request.GET.get("q", "").strip()
+    kind = request.GET.get("tipo", "")
+    results = search(query, kind=kind) if query else []
+    return render(
+        request, "search/results.html",
+        {
+            "query": query, "kind": kind, "results": results, "kinds": KIND_CHOICES,
+            "max_ranked": getattr(settings, "SEARCH_MAX_RANKED", DEFAULT_MAX_RANKED),
+        },
+    )
+
+
+@read_only
+def autocomplete_view(request, entity):
+    """"Esta funcion sugiere nombres de una entidad que empiezan con ?q= en formato JSON"""
+    if entity not in AUTOCOMPLETE:
+        raise Http404("Entidad inexistente")
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    results = suggest(entity, request.GET.get("q", ""), limit)
+    return JsonResponse({"results": [{"id": pk, "name": name} for pk, name in results]})
+
+
+def cache_stats(request):
+    """"Esta funcion muestra los aciertos y fallos del cache de fragmentos en JSON"""
+    return JsonResponse({"fragments": fragment_stats.as_dict()})
+
+
+def metrics_view(request):
+    """"Esta funcion muestra las metricas de todos los workers en formato Prometheus"""
+    return HttpResponse(metrics.render(metrics.collect()), content_type=metrics.CONTENT_TYPE)
+
+
+def worker_status(request):
+    """"Esta funcion muestra el estado del worker de gunicorn que atiende la peticion"""
+    return JsonResponse({"worker": worker_stats.as_dict()})
+
+
+@read_only
+def export(request, entity, fmt):
+    """"Esta funcion exporta una entidad completa en CSV o NDJSON por streaming"""
+    try:
+        return export_response(entity, fmt, request.GET)
+    except ExportError as error:
+        return HttpResponseBadRequest(str(error))
+
+
+IMPORT_PAGES = {
+    "clients": ("Clientes", "clients_repo"),
+    "vets": ("Veterinarios", "vets_repo"),
+    "providers": ("Proveedores", "providers_repo"),
+    "pets": ("Mascotas", "pets_repo"),
+    "medicines": ("Medicinas", "medicines_repo"),
+    "products": ("Productos", "products_repo"),
+}
+
+
+def import_view(request, entity):
+    """"Esta funcion importa un archivo CSV de una entidad y muestra los errores por fila"""
+    title, repo = IMPORT_PAGES[entity]
+    context = {"title": title, "back_url": reverse(repo)}
+    status = 200
+
+    if request.method == "POST":
+        upload = request.FILES.get("file")
+        max_size = get_max_upload_size()
+        if upload is None:
+            context["file_error"] = "Por favor seleccione un archivo"
+        elif upload.size > max_size:
+            context["file_error"] = f"El archivo no puede superar los {max_size // (1024 * 1024)} MB"
+            status = 413
+        else:
+            stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            try:
+                context["result"] = import_csv(
+                    entity, stream, dry_run=bool(request.POST.get("dry_run")),
+                    max_rows=get_max_rows(),
+                )
+            except UnicodeDecodeError:
+                context["file_error"] = "El archivo debe estar codificado en UTF-8"
+            except ImportLimitError as error:
+                context["file_error"] = str(error)
+                status = 413
+
+    return render(request, "imports/form.html", context, status=status)
+
+
+def render_repository(request, model, entity, extra=None):
+    """
+    Listado de un repositorio: filtra con los parametros de la url y responde en
+    streaming (?stream=1) o con una pagina de la tabla, que sale del cache de
+    fragmentos si la version del modelo no cambio. Las plantillas son
+    <entidad>/repository.html y <entidad>/rows.html; `extra` suma al contexto las
+    opciones de los filtros.
+    """
+    queryset, filters = filter_queryset(entity, model.objects.all(), request.GET)
+    context = {"filters": filters, **(extra or {})}
+    template, rows_template = f"{entity}/repository.html", f"{entity}/rows.html"
+    if wants_stream(request):
+        return stream_repository(
+            request, template, rows_template, queryset.order_by("id"), context,
+        )
+
+    table, page = repository_table(
+        request, model, rows_template,
+        lambda: paginate(
+            request, queryset, orderings=("id", "name"),
+            count=count_rows(model, queryset, filters, request),
+        ),
+    )
+    return render(
+        request, template,
+        {**context, entity: page, "table": table, "page": page},
+    )
+
+
+@read_only
+@conditional_repository(Client)
 def clients_repository(request):
     """"Esta funcion mostrará los clientes cargados"""
-    clients = Client.objects.all()
-    return render(request, "clients/repository.html", {"clients": clients})
+    return render_repository(request, Client, "clients", {"ciudades": CityEnum.choices})
 
 
 def clients_form(request, id=None):
@@ -61,10 +207,11 @@ def clients_delete(request):
     return redirect(reverse("clients_repo"))
 
 
+@read_only
+@conditional_repository(Vet)
 def vets_repository(request):
     """"Esta funcion mostrará los veterinarios cargados"""
-    vets = Vet.objects.all()
-    return render(request, "vets/repository.html", {"vets": vets})
+    return render_repository(request, Vet, "vets", {"specialities": Speciality.choices})
 
 
 
@@ -105,10 +252,11 @@ def vets_delete(request):
 
     return redirect(reverse("vets_repo"))
 
+@read_only
+@conditional_repository(Provider)
 def providers_repository(request):
     """"Esta funcion mostrará los proveedores cargados"""
-    providers = Provider.objects.all()
-    return render(request, "providers/repository.html", {"providers": providers})
+    return render_repository(request, Provider, "providers")
 
 def providers_form(request, id=None):
     """"Esta funcion guarda un proveedor nuevo"""
@@ -121,7 +269,7 @@ def providers_form(request, id=None):
             saved, errors = Provider.save_provider(request.POST)
         else:
             provider = get_object_or_404(Provider, pk=provider_id)
-            provider.update_provider(request.POST)
+            saved, errors = provider.update_provider(request.POST)
 
         if saved:
             return redirect(reverse("providers_repo"))
@@ -148,10 +296,11 @@ def providers_delete(request):
 
 #Views Pets
 
+@read_only
+@conditional_repository(Pet)
 def pets_repository(request):
     """"Esta funcion mostrará las mascotas cargadas"""
-    pets = Pet.objects.all()
-    return render(request, "pets/repository.html", {"pets": pets})
+    return render_repository(request, Pet, "pets", {"breeds": Breed.choices})
 
 
 
@@ -193,10 +342,11 @@ def pets_delete(request):
     return redirect(reverse("pets_repo"))
 
 
+@read_only
+@conditional_repository(Medicine)
 def medicines_repository(request):
     """"Esta funcion mostrará las medicinas cargadas"""
-    medicines = Medicine.objects.all()
-    return render(request, "medicines/repository.html", {"medicines": medicines})
+    return render_repository(request, Medicine, "medicines")
 
 
 def medicines_form(request, id=None):
@@ -237,10 +387,11 @@ def medicines_delete(request):
 
 
 
+@read_only
+@conditional_repository(Product)
 def products_repository(request):
     """"Esta funcion mostrará los productos cargados"""
-    products = Product.objects.all()
-    return render(request, "products/repository.html", {"products": products})
+    return render_repository(request, Product, "products")
 
 def products_form(request, id=None):
     """"Esta funcion guarda un producto nuevo"""
@@ -253,7 +404,7 @@ def products_form(request, id=None):
             saved, errors = Product.save_product(request.POST)
         else:
             product = get_object_or_404(Product, pk=product_id)
-            product.update_product(request.POST)
+            saved, errors = product.update_product(request.POST)
 
         if saved:
             return redirect(reverse("products_repo"))
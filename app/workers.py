@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+
+from django.core.signals import request_finished
+
+# Estado del worker de gunicorn que atiende la peticion: gunicorn.conf.py lo registra
+# en post_worker_init. Las peticiones se cuentan con request_finished, asi funciona
+# igual con workers gthread y de uvicorn.
+
+
+class WorkerStats:
+    """Datos del proceso worker: pid, configuracion, antiguedad y peticiones atendidas."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Vuelve al estado inicial, sin worker de gunicorn"""
+        with self.lock:
+            self.pid = os.getpid()
+            self.started_at = None
+            self.requests = 0
+            self.worker_class = None
+            self.threads = None
+            self.max_requests = None
+
+    def started(self, worker_class, threads, max_requests):
+        """Registra el arranque de un worker recien forkeado"""
+        with self.lock:
+            self.pid = os.getpid()
+            self.started_at = time.time()
+            self.requests = 0
+            self.worker_class = worker_class
+            self.threads = threads
+            self.max_requests = max_requests
+
+    def request_finished(self):
+        """Suma una peticion atendida"""
+        with self.lock:
+            self.requests += 1
+
+    def as_dict(self):
+        """Retorna el estado del worker para mostrarlo en JSON"""
+        with self.lock:
+            return {
+                "pid": self.pid,
+                "worker_class": self.worker_class,
+                "threads": self.threads,
+                "requests": self.requests,
+                "max_requests": self.max_requests,
+                "uptime_s": round(time.time() - self.started_at, 1) if self.started_at else None,
+            }
+
+
+stats = WorkerStats()
+
+
+def count_request(sender, **kwargs):
+    """Receptor de request_finished"""
+    stats.request_finished()
+
+
+def connect_signals():
+    """Conecta el receptor que cuenta las peticiones del worker"""
+    request_finished.connect(count_request, dispatch_uid="workers-requests")
@@ -0,0 +1,61 @@
+"""
+Benchmark de throughput con peticiones concurrentes: WSGI sincronico vs ASGI.
+
+Levanta gunicorn con cada perfil sobre una copia temporal de la base con N
+clientes y lo carga con C clientes HTTP concurrentes durante S segundos
+(benchmarks/http_load.py).
+
+    python -m benchmarks.asgi_throughput --rows 20000 --concurrency 32 --seconds 15
+"""
+import argparse
+import json
+
+from benchmarks.common import seed_clients, setup_django, temporary_database
+from benchmarks.http_load import NO_CONFIG, run_load, start_server, stop_server
+
+PROFILES = {
+    "wsgi-sync": ([*NO_CONFIG, "--workers", "2", "vetsoft.wsgi"], {"ASYNC_VIEWS": "0"}),
+    "asgi-uvicorn": (
+        [
+            *NO_CONFIG, "--workers", "2", "--worker-class", "uvicorn.workers.UvicornWorker",
+            "vetsoft.asgi:application",
+        ],
+        {"ASYNC_VIEWS": "1"},
+    ),
+}
+
+
+def main():
+    """Prepara la base y mide cada perfil"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connections
+
+    results = {}
+    with temporary_database() as connection:
+        seed_clients(args.rows)
+        database_path = connection.settings_dict["NAME"]
+        connections.close_all()
+        for offset, (profile, (arguments, env)) in enumerate(PROFILES.items()):
+            server, _ = start_server(arguments, args.port + offset, database_path, env)
+            try:
+                results[profile] = run_load(
+                    args.port + offset, args.concurrency, args.seconds, args.write_ratio,
+                )
+            finally:
+                stop_server(server)
+    print(json.dumps({
+        "rows": args.rows, "concurrency": args.concurrency, "seconds": args.seconds,
+        "write_ratio": args.write_ratio, "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Cada benchmark se ejecuta desde la raiz del repo con `python -m benchmarks.<nombre>`
+y trabaja sobre una base SQLite temporal, sin tocar db.sqlite3.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Inicializa Django con la configuracion del proyecto"""
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def temporary_database():
+    """Crea y migra una base SQLite temporal que se borra al terminar"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+@contextmanager
+def timer(results, key):
+    """Guarda en results[key] los segundos que tarda el bloque"""
+    start = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - start
+
+
+FIRST_NAMES = [
+    "Juan", "Maria", "Pedro", "Ana", "Luis", "Carla", "Jorge", "Lucia", "Diego",
+    "Sofia", "Martin", "Valentina", "Pablo", "Camila", "Federico", "Julieta",
+    "Bruno", "Florencia", "German", "Paula", "Nicolas", "Agustina", "Tomas",
+    "Micaela", "Santiago", "Rocio", "Facundo", "Milagros", "Ezequiel", "Belen",
+]
+LAST_NAMES = [
+    "Gomez", "Perez", "Rodriguez", "Fernandez", "Lopez", "Diaz", "Martinez",
+    "Gonzalez", "Sanchez", "Romero", "Sosa", "Alvarez", "Torres", "Ruiz",
+    "Ramirez", "Flores", "Acosta", "Benitez", "Medina", "Herrera", "Suarez",
+    "Aguirre", "Gimenez", "Gutierrez", "Pereyra", "Rojas", "Molina", "Castro",
+    "Ortiz", "Silva",
+]
+PET_NAMES = [
+    "Firulais", "Luna", "Toby", "Mora", "Rocky", "Nina", "Simon", "Lola", "Bobby",
+    "Kira", "Max", "Olivia", "Tango", "Chispa", "Manchita", "Pancho",
+]
+MEDICINES = [
+    "Amoxicilina", "Meloxicam", "Ivermectina", "Prednisolona", "Metronidazol",
+    "Enrofloxacina", "Tramadol", "Omeprazol", "Cefalexina", "Ketoconazol",
+]
+PRODUCTS = [
+    ("Alimento", "Alimento balanceado"), ("Alimento", "Snack dental"),
+    ("Accesorio", "Collar"), ("Accesorio", "Correa"), ("Higiene", "Shampoo"),
+    ("Higiene", "Pipeta"), ("Juguete", "Pelota"), ("Juguete", "Hueso de goma"),
+]
+
+
+def person_name(number):
+    """Nombre y apellidos deterministas, validos para validate_client"""
+    first = FIRST_NAMES[number % len(FIRST_NAMES)]
+    last = LAST_NAMES[(number // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    second = LAST_NAMES[(number // (len(FIRST_NAMES) * len(LAST_NAMES))) % len(LAST_NAMES)]
+    return f"{first} {last} {second}"
+
+
+def row_data(entity, number):
+    """
+    Fila numero `number` de una entidad, con los campos y el formato de su
+    formulario (y de su CSV de importacion). Es determinista y pasa el validador
+    de la entidad, asi sirve para sembrar la base y para las altas de la carga.
+    """
+    from app.models import Breed, CityEnum, Speciality
+
+    if entity == "clients":
+        cities = CityEnum.values
+        return {
+            "name": person_name(number),
+            "phone": str(5422100000 + number),
+            "email": f"{person_name(number).lower().replace(' ', '.')}.{number}@vetsoft.com",
+            "city": cities[number % len(cities)],
+        }
+    if entity == "vets":
+        return {
+            "name": person_name(number),
+            "phone": str(2210000000 + number % 10**9),
+            "email": f"vet.{number}@vetsoft.com",
+            "speciality": Speciality.values[number % len(Speciality.values)],
+        }
+    if entity == "providers":
+        return {
+            "name": f"Distribuidora {LAST_NAMES[number % len(LAST_NAMES)]} {number}",
+            "email": f"proveedor.{number}@vetsoft.com",
+            "direccion": f"Calle {number % 200 + 1} numero {number % 9000 + 100}",
+        }
+    if entity == "pets":
+        return {
+            "name": PET_NAMES[number % len(PET_NAMES)],
+            "breed": Breed.values[number % len(Breed.values)],
+            "birthday": f"{number % 28 + 1:02d}/{number // 28 % 12 + 1:02d}/{2010 + number % 14}",
+            "weight": f"{1 + number % 6000 / 100:.2f}",
+        }
+    if entity == "medicines":
+        return {
+            "name": f"{MEDICINES[number % len(MEDICINES)]} {number % 50 * 10 + 10} mg",
+            "description": f"Presentacion {number}",
+            "dose": str(number % 10 + 1),
+        }
+    if entity == "products":
+        kind, name = PRODUCTS[number % len(PRODUCTS)]
+        return {
+            "name": f"{name} {number}",
+            "type": kind,
+            "price": f"{100 + number % 90000 / 100:.2f}",
+        }
+    raise KeyError(entity)
+
+
+def seed_rows(entity, total, batch_size=10000):
+    """Inserta `total` filas validas de una entidad con bulk_create"""
+    from django.db import transaction
+
+    from app.imports import IMPORTERS
+
+    model, clean = IMPORTERS[entity]
+    created = model.objects.count()
+    with transaction.atomic():
+        while created < total:
+            size = min(batch_size, total - created)
+            model.objects.bulk_create(
+                model(**clean(row_data(entity, number))[0])
+                for number in range(created, created + size)
+            )
+            created += size
+
+
+def seed_clients(total, batch_size=10000):
+    """Inserta `total` clientes validos con bulk_create"""
+    seed_rows("clients", total, batch_size)
@@ -0,0 +1,59 @@
+"""
+Benchmark de memoria de los endpoints de exportacion.
+
+Mide el pico de memoria de Python (tracemalloc) al consumir completa la
+respuesta de `clientes/export.csv` y `clientes/export.ndjson` con tablas de
+distinto tamaño. Con values_list().iterator() el pico debe mantenerse
+constante aunque crezca la cantidad de filas.
+
+    python -m benchmarks.export_memory --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.common import seed_clients, setup_django, temporary_database
+
+
+def measure(client, url):
+    """Consume la respuesta en streaming y retorna bytes, segundos y pico de memoria"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url)
+    size = 0
+    for chunk in response.streaming_content:
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"bytes": size, "seconds": round(elapsed, 3), "peak_kib": peak // 1024}
+
+
+def main():
+    """Ejecuta el benchmark para cada tamaño pedido e imprime los resultados"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client as HttpClient
+    from django.urls import reverse
+
+    results = []
+    with temporary_database():
+        http = HttpClient()
+        for rows in sorted(args.sizes):
+            seed_clients(rows)
+            for fmt in ("csv", "ndjson"):
+                url = reverse("clients_export", kwargs={"fmt": fmt})
+                result = {"rows": rows, "format": fmt, **measure(http, url)}
+                results.append(result)
+                print(json.dumps(result))
+
+    peaks = [result["peak_kib"] for result in results]
+    print(f"pico minimo {min(peaks)} KiB, pico maximo {max(peaks)} KiB")
+
+
+if __name__ == "__main__":
+    main()
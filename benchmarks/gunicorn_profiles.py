@@ -0,0 +1,64 @@
+"""
+Benchmark del comando de gunicorn anterior contra gunicorn.conf.py.
+
+Mide para cada perfil el tiempo hasta la primera respuesta, el throughput y la
+latencia con C clientes concurrentes (benchmarks/http_load.py) y la memoria del
+master y sus workers al terminar la carga.
+
+    python -m benchmarks.gunicorn_profiles --rows 20000 --concurrency 32 --seconds 15
+"""
+import argparse
+import json
+
+from benchmarks.common import seed_clients, setup_django, temporary_database
+from benchmarks.http_load import (
+    NO_CONFIG,
+    run_load,
+    server_memory,
+    start_server,
+    stop_server,
+)
+
+PROFILES = {
+    # el CMD que usaba el dockerfile
+    "current": [*NO_CONFIG, "--workers", "2", "vetsoft.wsgi"],
+    "tuned": ["--config", "gunicorn.conf.py"],
+}
+
+
+def main():
+    """Prepara la base y mide cada perfil"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8775)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connections
+
+    results = {}
+    with temporary_database() as connection:
+        seed_clients(args.rows)
+        database_path = connection.settings_dict["NAME"]
+        connections.close_all()
+        for offset, (profile, arguments) in enumerate(PROFILES.items()):
+            port = args.port + offset
+            server, boot_seconds = start_server(arguments, port, database_path)
+            try:
+                load = run_load(port, args.concurrency, args.seconds, args.write_ratio)
+                results[profile] = {
+                    "boot_s": round(boot_seconds, 2), **load, "memory": server_memory(server),
+                }
+            finally:
+                stop_server(server)
+    print(json.dumps({
+        "rows": args.rows, "concurrency": args.concurrency, "seconds": args.seconds,
+        "write_ratio": args.write_ratio, "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Carga HTTP compartida por los benchmarks que levantan gunicorn.
+
+Cada cliente concurrente abre una conexion por peticion; la mayoria lista paginas
+del repositorio de clientes (con filtros distintos, para no servir todo desde el
+cache) y el resto da de alta clientes por el formulario.
+"""
+import http.client
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from benchmarks.common import ROOT
+
+CITIES = ["La Plata", "Berisso", "Ensenada"]
+# sin -c gunicorn lee ./gunicorn.conf.py; /dev/null arranca con sus valores por defecto
+NO_CONFIG = ["--config", "/dev/null"]
+
+
+def start_server(arguments, port, database_path, env=None):
+    """Arranca gunicorn y espera la primera respuesta; retorna (proceso, segundos)"""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database_path}", **(env or {})}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", *arguments, "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            request(port, "GET", "/")
+            return process, time.perf_counter() - start
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"gunicorn {' '.join(arguments)} no arranco")
+
+
+def stop_server(process):
+    """Detiene gunicorn y espera a que terminen sus workers"""
+    process.terminate()
+    process.wait()
+
+
+def request(port, method, path, body=None, headers=None):
+    """Hace una peticion en una conexion nueva y retorna (status, encabezados)"""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        response.read()
+        return response.status, response.headers
+    finally:
+        connection.close()
+
+
+def csrf_token(port):
+    """Token CSRF de la cookie que deja el formulario de alta"""
+    _, headers = request(port, "GET", "/clientes/nuevo/")
+    cookie = SimpleCookie()
+    for value in headers.get_all("Set-Cookie") or []:
+        cookie.load(value)
+    return cookie["csrftoken"].value
+
+
+def client_loop(port, deadline, write_ratio, worker_id, results):
+    """Cliente HTTP: repite lecturas y altas hasta el deadline"""
+    token = csrf_token(port)
+    post_headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Cookie": f"csrftoken={token}",
+        "X-CSRFToken": token,
+    }
+    number = worker_id * 1_000_000
+    latencies = {"read": [], "write": []}
+    errors = 0
+    while time.time() < deadline:
+        number += 1
+        start = time.perf_counter()
+        try:
+            if random.random() < write_ratio:
+                kind = "write"
+                status, _ = request(port, "POST", "/clientes/nuevo/", urlencode({
+                    "name": "Cliente De Prueba", "phone": 5422800000 + number,
+                    "email": f"carga.{number}@vetsoft.com", "city": random.choice(CITIES),
+                }), post_headers)
+                ok = status == 302
+            else:
+                kind = "read"
+                query = urlencode({"city": random.choice(CITIES), "page": random.randint(1, 20)})
+                status, _ = request(port, "GET", f"/clientes/?{query}")
+                ok = status == 200
+        except OSError:
+            ok = False
+        if ok:
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+        else:
+            errors += 1
+    results.append((latencies, errors))
+
+
+def summarize(latencies, seconds):
+    """Peticiones por segundo y percentiles en milisegundos"""
+    latencies.sort()
+    if not latencies:
+        return {"requests_per_s": 0}
+    return {
+        "requests_per_s": round(len(latencies) / seconds, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1], 2),
+        "p99_ms": round(latencies[math.ceil(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+def run_load(port, concurrency, seconds, write_ratio):
+    """Carga el servidor con `concurrency` clientes durante `seconds` segundos"""
+    results = []
+    deadline = time.time() + seconds
+    threads = [
+        threading.Thread(target=client_loop, args=(port, deadline, write_ratio, worker_id, results))
+        for worker_id in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    reads = [latency for latencies, _ in results for latency in latencies["read"]]
+    writes = [latency for latencies, _ in results for latency in latencies["write"]]
+    return {
+        "total_requests_per_s": round((len(reads) + len(writes)) / seconds, 1),
+        "read": summarize(reads, seconds),
+        "write": summarize(writes, seconds),
+        "errors": sum(errors for _, errors in results),
+    }
+
+
+def process_tree(pid):
+    """El proceso y sus hijos directos (los workers de gunicorn)"""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as handle:
+            pids += [int(child) for child in handle.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+def memory_kib(pid, field):
+    """Un campo de memoria (Rss o Pss) de /proc/<pid>/smaps_rollup, en KiB"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def server_memory(process):
+    """
+    Memoria del master y sus workers en MiB. RSS cuenta varias veces las paginas
+    compartidas por fork; PSS las reparte entre los procesos que las comparten.
+    """
+    pids = process_tree(process.pid)
+    return {
+        "processes": len(pids),
+        "rss_mib": round(sum(memory_kib(pid, "Rss") for pid in pids) / 1024, 1),
+        "pss_mib": round(sum(memory_kib(pid, "Pss") for pid in pids) / 1024, 1),
+    }
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark del costo por peticion de las metricas.
+
+Mide en microsegundos por llamada:
+- registry.record_request, sin METRICS_DIR y con METRICS_DIR (thread que escribe)
+- RequestMetricsMiddleware completo (Server-Timing, log deshabilitado y registro)
+  alrededor de una vista vacia, contra la vista sola
+- el execute wrapper por consulta, sin contar la consulta
+- el execute wrapper del log de consultas lentas, para consultas bajo el umbral
+- GET /metrics con todas las vistas del proyecto en el registro
+
+    python -m benchmarks.metrics_overhead --repetitions 50000
+"""
+import argparse
+import json
+import logging
+import tempfile
+
+from benchmarks.common import setup_django
+from benchmarks.navbar_overhead import per_call_us
+
+
+def main():
+    """Mide cada parte de la instrumentacion"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=50000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+    from django.urls import get_resolver
+
+    from app import instrumentation, metrics, slow_queries
+
+    # el log por peticion se mide aparte; aca solo el costo de decidir no escribirlo
+    logging.getLogger("app.requests").setLevel(logging.WARNING)
+    registry = metrics.registry
+    results = {}
+
+    def record():
+        registry.record_request("clients_repo", "GET", 200, 0.012, 3, 0.002)
+
+    registry.reset()
+    results["record_request_us"] = per_call_us(record, args.repetitions)
+    with tempfile.TemporaryDirectory() as directory, \
+            override_settings(METRICS_DIR=directory, METRICS_FLUSH_SECONDS=0.1):
+        registry.reset()
+        results["record_request_with_dir_us"] = per_call_us(record, args.repetitions)
+
+    def view(request):
+        return HttpResponse("ok")
+
+    request = RequestFactory().get("/clientes/")
+    request.resolver_match = get_resolver().resolve("/clientes/")
+    middleware = instrumentation.RequestMetricsMiddleware(view)
+    registry.reset()
+    bare = per_call_us(lambda: view(request), args.repetitions)
+    instrumented = per_call_us(lambda: middleware(request), args.repetitions)
+    results["middleware_us"] = round(instrumented - bare, 2)
+
+    def execute(sql, params, many, context):
+        return None
+
+    token = instrumentation._current.set(instrumentation.RequestMetrics())
+    try:
+        timed = per_call_us(
+            lambda: instrumentation.time_query(execute, "SELECT 1", (), False, {}),
+            args.repetitions,
+        )
+    finally:
+        instrumentation._current.reset(token)
+    direct = per_call_us(lambda: execute("SELECT 1", (), False, {}), args.repetitions)
+    results["query_timer_us"] = round(timed - direct, 2)
+    logged = per_call_us(
+        lambda: slow_queries.log_slow_query(execute, "SELECT 1", (), False, {}),
+        args.repetitions,
+    )
+    results["slow_query_log_us"] = round(logged - direct, 2)
+
+    registry.reset()
+    views = [name for name in get_resolver().reverse_dict if isinstance(name, str)]
+    for name in views:
+        for seconds in (0.003, 0.03, 0.3):
+            registry.record_request(name, "GET", 200, seconds, 2, 0.001)
+    results["views"] = len(views)
+    results["render_metrics_ms"] = round(
+        per_call_us(lambda: metrics.render(metrics.collect()), 200) / 1000, 3,
+    )
+    registry.reset()
+    print(json.dumps({"repetitions": args.repetitions, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
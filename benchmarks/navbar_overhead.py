@@ -0,0 +1,78 @@
+"""
+Micro-benchmark del navbar.
+
+Compara el costo por peticion del context processor anterior (copiaba cada
+link, comparaba prefijos y el template renderizaba el partial) con el actual,
+que resuelve la seccion por nombre de url y reutiliza el navbar renderizado.
+
+    python -m benchmarks.navbar_overhead --repetitions 20000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import setup_django
+
+
+def previous_navbar(links, request):
+    """Implementacion anterior de app.context_processors.navbar, para comparar"""
+    def add_active(link):
+        copy = link.copy()
+
+        if copy["href"] == "/":
+            copy["active"] = request.path == "/"
+        else:
+            copy["active"] = request.path.startswith(copy.get("href", ""))
+
+        return copy
+
+    return {"links": map(add_active, links)}
+
+
+def per_call_us(function, repetitions):
+    """Microsegundos promedio por llamada"""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        function()
+    return round((time.perf_counter() - start) / repetitions * 1e6, 2)
+
+
+def main():
+    """Mide ambas implementaciones sobre las rutas de cada seccion"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.template.loader import get_template
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    from app import context_processors
+
+    links = [
+        {"label": label, "href": href, "icon": icon}
+        for label, href, icon in context_processors.link_hrefs()
+    ]
+    partial = get_template("partials/navbar.html")
+    factory = RequestFactory()
+
+    for path in ["/", "/clientes/", "/pets/editar/1/", "/buscar/"]:
+        request = factory.get(path)
+        request.resolver_match = resolve(path)
+
+        def before(request=request):
+            return partial.render(previous_navbar(links, request))
+
+        def after(request=request):
+            return context_processors.navbar(request)["navbar"]
+
+        print(json.dumps({
+            "path": path,
+            "before_us": per_call_us(before, args.repetitions),
+            "after_us": per_call_us(after, args.repetitions),
+        }))
+
+
+if __name__ == "__main__":
+    main()
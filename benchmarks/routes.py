@@ -0,0 +1,451 @@
+"""
+Benchmark de carga HTTP de todas las rutas de app/urls.py.
+
+Para cada tamano (filas por modelo: 1k, 100k, 1m o un numero) crea una base
+temporal, la llena con benchmarks.common.seed_rows, reconstruye el indice de
+busqueda y levanta gunicorn con gunicorn.conf.py. Despues carga cada ruta por
+separado con C clientes concurrentes hasta N peticiones o S segundos: primero las
+lecturas, despues las altas, ediciones e importaciones y al final las bajas, que
+borran filas de la mitad de arriba de los ids (las ediciones usan la de abajo).
+
+Escribe en --output un JSON con claves ordenadas, para compararlo con diff entre
+commits: por ruta y metodo p50/p95/p99 en milisegundos, peticiones por segundo y
+errores, y por tamano el pico de RSS del servidor. --baseline imprime la diferencia
+contra un resultado anterior.
+
+    python -m benchmarks.routes --sizes 1k,100k,1m --concurrency 8 --requests 200
+    python manage.py benchmark_routes --sizes 1k --routes "clients_*" --baseline viejo.json
+"""
+import argparse
+import csv
+import fnmatch
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from benchmarks.common import (
+    FIRST_NAMES,
+    LAST_NAMES,
+    ROOT,
+    row_data,
+    seed_rows,
+    setup_django,
+    temporary_database,
+    timer,
+)
+from benchmarks.http_load import (
+    csrf_token,
+    memory_kib,
+    process_tree,
+    request,
+    server_memory,
+    start_server,
+    stop_server,
+    summarize,
+)
+
+ENTITIES = ["clients", "vets", "providers", "pets", "medicines", "products"]
+# filtros de los repositorios ademas del listado sin filtrar (app/filters.py)
+REPOSITORY_FILTERS = {
+    "clients": [{"city": "Berisso"}],
+    "vets": [{"speciality": "Dentista"}],
+    "providers": [{"q": "distribuidora g"}],
+    "pets": [{"birthday_from": "01/01/2018"}],
+    "medicines": [{"dose_min": "3", "dose_max": "5"}],
+    "products": [{"type": "Higiene"}],
+}
+EXPORT_FORMATS = ["csv", "ndjson"]
+IMPORT_ROWS = 10
+SERVER = ["--config", "gunicorn.conf.py"]
+MULTIPART_BOUNDARY = "vetsoft-benchmark"
+
+
+def parse_size(value):
+    """Filas por modelo: '1k', '100k', '1m' o un numero"""
+    value = value.strip().lower()
+    multipliers = {"k": 1000, "m": 1000000}
+    if value[-1:] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
+def name_prefix(rng):
+    """Comienzo de un nombre o apellido de los datos sembrados, como lo tipea alguien"""
+    word = rng.choice(FIRST_NAMES + LAST_NAMES).lower()
+    return word[: rng.randint(2, len(word))]
+
+
+def multipart(rows):
+    """Cuerpo multipart/form-data con un CSV en el campo file, como lo sube el formulario"""
+    content = io.StringIO()
+    writer = csv.DictWriter(content, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    body = (
+        f"--{MULTIPART_BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="benchmark.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+        f"{content.getvalue()}\r\n"
+        f"--{MULTIPART_BOUNDARY}--\r\n"
+    )
+    return body.encode(), f"multipart/form-data; boundary={MULTIPART_BOUNDARY}"
+
+
+def form(data):
+    """Cuerpo application/x-www-form-urlencoded"""
+    return urlencode(data), "application/x-www-form-urlencoded"
+
+
+class Scenario:
+    """
+    Carga de una ruta de app/urls.py con un metodo. `build(rng)` retorna
+    (path, cuerpo, content type) de la proxima peticion, o None cuando el
+    escenario se quedo sin datos (las bajas, sin ids para borrar).
+    """
+    def __init__(self, route, method, build, expected=200):
+        self.route = route
+        self.method = method
+        self.build = build
+        self.expected = expected
+
+    @property
+    def name(self):
+        """Clave del escenario en el resultado"""
+        return f"{self.route} {self.method}"
+
+
+def scenarios(rows):
+    """Escenarios de todas las rutas para una base con `rows` filas por modelo"""
+    from django.urls import reverse
+
+    from app.autocomplete import AUTOCOMPLETE
+
+    def get(route, query=None, args=None):
+        """Escenario GET de una ruta; query(rng) arma los parametros"""
+        def build(rng):
+            path = reverse(route, args=args(rng) if args else None)
+            return (f"{path}?{urlencode(query(rng))}" if query else path), None, None
+        return Scenario(route, "GET", build)
+
+    # ediciones sobre la mitad de abajo de los ids, bajas desde el ultimo id hacia abajo
+    editable = max(rows // 2, 1)
+    created = itertools.count(rows)
+
+    def edit_id(rng):
+        return [rng.randint(1, editable)]
+
+    reads = [
+        get("home"),
+        get("search", lambda rng: {"q": name_prefix(rng)}),
+        get(
+            "autocomplete", lambda rng: {"q": name_prefix(rng)},
+            lambda rng: [rng.choice(sorted(AUTOCOMPLETE))],
+        ),
+        get("cache_stats"),
+        get("worker_status"),
+        get("metrics"),
+    ]
+    writes = []
+    deletes = []
+    for entity in ENTITIES:
+        filters = [{}, *REPOSITORY_FILTERS[entity]]
+        reads += [
+            get(f"{entity}_repo", lambda rng, f=filters: {**rng.choice(f), "page": rng.randint(1, 20)}),
+            get(f"{entity}_export", args=lambda rng: [rng.choice(EXPORT_FORMATS)]),
+            get(f"{entity}_import"),
+            get(f"{entity}_form"),
+            get(f"{entity}_edit", args=edit_id),
+        ]
+
+        def create(rng, entity=entity):
+            return reverse(f"{entity}_form"), *form(row_data(entity, next(created)))
+
+        def update(rng, entity=entity):
+            pk = rng.randint(1, editable)
+            return reverse(f"{entity}_edit", args=[pk]), *form(
+                {**row_data(entity, pk - 1), "id": pk},
+            )
+
+        def upload(rng, entity=entity):
+            first = next(created)
+            return reverse(f"{entity}_import"), *multipart(
+                [row_data(entity, number) for number in range(first, first + IMPORT_ROWS)],
+            )
+
+        writes += [
+            Scenario(f"{entity}_form", "POST", create, expected=302),
+            Scenario(f"{entity}_edit", "POST", update, expected=302),
+            Scenario(f"{entity}_import", "POST", upload),
+        ]
+
+        def delete(rng, entity=entity, pks=itertools.count(rows, -1)):
+            pk = next(pks)
+            if pk <= editable:
+                return None
+            field = f"{entity[:-1]}_id"
+            return reverse(f"{entity}_delete"), *form({field: pk})
+
+        deletes.append(Scenario(f"{entity}_delete", "POST", delete, expected=302))
+    return reads + writes + deletes
+
+
+def uncovered(selected):
+    """Rutas con nombre de app/urls.py que no tienen escenario"""
+    from app import urls
+
+    names = {pattern.name for pattern in urls.urlpatterns if pattern.name}
+    return sorted(names - {scenario.route for scenario in selected})
+
+
+def drive(port, scenario, options, headers):
+    """Corre un escenario con `concurrency` clientes; retorna latencias, throughput y errores"""
+    issued = itertools.count()
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def client(index, deadline, limit, record):
+        rng = random.Random(f"{options['seed']}-{scenario.name}-{index}")
+        while time.time() < deadline and next(issued) < limit:
+            built = scenario.build(rng)
+            if built is None:
+                return
+            path, body, content_type = built
+            start = time.perf_counter()
+            try:
+                status, _ = request(port, scenario.method, path, body, {
+                    **headers, **({"Content-Type": content_type} if content_type else {}),
+                })
+            except OSError:
+                status = "connection error"
+            elapsed = (time.perf_counter() - start) * 1000
+            if record:
+                with lock:
+                    statuses[status] += 1
+                    if status == scenario.expected:
+                        latencies.append(elapsed)
+
+    # unas peticiones sin medir: caches, indices en memoria y templates de los workers
+    client(-1, time.time() + options["seconds"], options["warmup"], record=False)
+    issued = itertools.count()
+    deadline = time.time() + options["seconds"]
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=client, args=(index, deadline, options["requests"], True))
+        for index in range(options["concurrency"])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        **summarize(latencies, elapsed),
+        "requests": sum(statuses.values()),
+        "errors": sum(count for status, count in statuses.items() if status != scenario.expected),
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def peak_kib(pid):
+    """Pico de memoria residente (VmHWM) de un proceso, en KiB"""
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class MemorySampler:
+    """
+    Pico de RSS del servidor. Los workers se reciclan (max_requests), asi que se
+    muestrea la suma del master y sus workers cada `interval` segundos y se guarda
+    ademas el mayor VmHWM de un proceso.
+    """
+    def __init__(self, process, interval=0.2):
+        self.process = process
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_process = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        """Muestrea hasta stop()"""
+        while not self.stopped.wait(self.interval):
+            pids = process_tree(self.process.pid)
+            self.peak_total = max(self.peak_total, sum(memory_kib(pid, "Rss") for pid in pids))
+            self.peak_process = max(self.peak_process, *(peak_kib(pid) for pid in pids))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def as_dict(self):
+        """Picos en MiB"""
+        return {
+            "peak_rss_mib": round(self.peak_total / 1024, 1),
+            "peak_process_rss_mib": round(self.peak_process / 1024, 1),
+        }
+
+
+def git_revision():
+    """Commit actual y si hay cambios sin commitear"""
+    def git(*arguments):
+        return subprocess.run(
+            ["git", *arguments], cwd=ROOT, capture_output=True, text=True, check=False,
+        ).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def run_size(rows, selected, options, log):
+    """Siembra una base con `rows` filas por modelo y carga cada escenario"""
+    from django.db import connections
+
+    from app import search
+
+    result = {"rows_per_model": rows, "routes": {}}
+    with temporary_database() as connection, tempfile.TemporaryDirectory() as directory:
+        with timer(result, "seed_s"):
+            for entity in ENTITIES:
+                seed_rows(entity, rows)
+            if isinstance(search.get_backend(), search.FTS5Backend):
+                search.rebuild()
+        result["seed_s"] = round(result["seed_s"], 1)
+        database_path = connection.settings_dict["NAME"]
+        connections.close_all()
+        env = {
+            "SLOW_QUERY_LOG": os.path.join(directory, "slow_queries.log"),
+            "METRICS_DIR": os.path.join(directory, "metrics"),
+            "PROFILING_DIR": os.path.join(directory, "profiles"),
+        }
+        server, boot_seconds = start_server(options["server"], options["port"], database_path, env)
+        result["boot_s"] = round(boot_seconds, 2)
+        try:
+            token = csrf_token(options["port"])
+            headers = {"Cookie": f"csrftoken={token}", "X-CSRFToken": token}
+            with MemorySampler(server) as memory:
+                for scenario in selected:
+                    stats = drive(options["port"], scenario, options, headers)
+                    result["routes"][scenario.name] = stats
+                    log(
+                        f"{rows} filas  {scenario.name:<26} {stats.get('requests_per_s', 0):>8} req/s"
+                        f"  p95 {stats.get('p95_ms', '-')} ms  errores {stats['errors']}",
+                    )
+            result["memory"] = {**memory.as_dict(), "final": server_memory(server)}
+        finally:
+            stop_server(server)
+    return result
+
+
+def run(options, log=print):
+    """Corre el benchmark con las opciones de add_arguments y retorna el resultado"""
+    import django
+
+    selected = scenarios(1)
+    missing = uncovered(selected)
+    if missing:
+        raise RuntimeError(f"rutas sin escenario en benchmarks/routes.py: {', '.join(missing)}")
+    patterns = options["routes"]
+    report = {
+        "meta": {
+            **git_revision(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+            **{key: options[key] for key in (
+                "concurrency", "requests", "seconds", "warmup", "seed", "server", "routes",
+            )},
+        },
+        "sizes": {},
+    }
+    for size in options["sizes"].split(","):
+        rows = parse_size(size)
+        selected = [
+            scenario for scenario in scenarios(rows)
+            if not patterns or any(fnmatch.fnmatch(scenario.route, pattern) for pattern in patterns)
+        ]
+        report["sizes"][size.strip()] = run_size(rows, selected, options, log)
+    return report
+
+
+def compare(baseline, report):
+    """Lineas con el cambio de p95 y de throughput por ruta respecto a un resultado anterior"""
+    lines = []
+    for size, result in report["sizes"].items():
+        before = baseline.get("sizes", {}).get(size, {}).get("routes", {})
+        for name, stats in result["routes"].items():
+            old = before.get(name)
+            if not old or "p95_ms" not in old or "p95_ms" not in stats:
+                continue
+            p95 = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            throughput = (stats["requests_per_s"] - old["requests_per_s"]) / old["requests_per_s"] * 100
+            lines.append((p95, (
+                f"{size:>6} {name:<26} p95 {old['p95_ms']:>8} -> {stats['p95_ms']:>8} ms ({p95:+.0f}%)"
+                f"  req/s {old['requests_per_s']:>8} -> {stats['requests_per_s']:>8} ({throughput:+.0f}%)"
+            )))
+    return [line for _, line in sorted(lines, reverse=True)]
+
+
+def add_arguments(parser):
+    """Opciones compartidas por `python -m benchmarks.routes` y `manage.py benchmark_routes`"""
+    parser.add_argument("--sizes", default="1k", help="filas por modelo, separadas por coma (1k,100k,1m)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="peticiones por ruta")
+    parser.add_argument("--seconds", type=float, default=10, help="tiempo maximo por ruta")
+    parser.add_argument("--warmup", type=int, default=5, help="peticiones sin medir por ruta")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--routes", nargs="*", default=[], help="solo estas rutas (patrones como clients_*)")
+    parser.add_argument("--port", type=int, default=8785)
+    parser.add_argument("--server", nargs="+", default=SERVER, help="argumentos de gunicorn")
+    parser.add_argument("--output", help="JSON de salida (por defecto .cache/benchmarks/routes-<commit>.json)")
+    parser.add_argument("--baseline", help="resultado anterior para comparar")
+
+
+def write_report(report, options, log=print):
+    """Guarda el resultado y, si hay --baseline, imprime la comparacion; retorna la ruta"""
+    output = options["output"] or os.path.join(
+        ROOT, ".cache", "benchmarks", f"routes-{report['meta']['commit'][:10] or 'local'}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    if options["baseline"]:
+        with open(options["baseline"]) as handle:
+            for line in compare(json.load(handle), report):
+                log(line)
+    return output
+
+
+def main():
+    """Corre el benchmark y guarda el resultado"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    options = vars(parser.parse_args())
+    setup_django()
+    print(write_report(run(options), options))
+
+
+if __name__ == "__main__":
+    main()
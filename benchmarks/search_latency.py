@@ -0,0 +1,72 @@
+"""
+Benchmark de latencia del buscador global.
+
+Carga N clientes, reconstruye el indice y mide la latencia de busquedas por
+prefijo con cada backend disponible (FTS5 y el indice en memoria).
+
+    python -m benchmarks.search_latency --rows 1000000
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+
+from benchmarks.common import seed_clients, setup_django, temporary_database
+
+# consultas tipicas del mostrador y un peor caso que coincide con todos los documentos
+QUERIES = ["juan", "gomez", "juan per", "sofia alvarez ruiz", "mart", "xyz"]
+WORST_CASE = "vetsoft"
+
+
+def measure(backend, queries, repetitions):
+    """Ejecuta las consultas y retorna la latencia en milisegundos"""
+    latencies = []
+    for _ in range(repetitions):
+        query = random.choice(queries)
+        start = time.perf_counter()
+        backend.search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def main():
+    """Carga los datos y mide cada backend"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repetitions", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from app import search
+
+    with temporary_database():
+        seed_clients(args.rows)
+        backends = [search.MemoryBackend()]
+        if search.fts5_available():
+            backends.insert(0, search.FTS5Backend())
+        for backend in backends:
+            start = time.perf_counter()
+            if isinstance(backend, search.FTS5Backend):
+                search._backend = backend
+                search.rebuild()
+            else:
+                backend.ensure_loaded()
+            build = time.perf_counter() - start
+            result = {
+                "backend": backend.name, "documents": args.rows,
+                "build_s": round(build, 2), **measure(backend, QUERIES, args.repetitions),
+            }
+            print(json.dumps(result))
+            worst = measure(backend, [WORST_CASE], max(1, args.repetitions // 20))
+            print(json.dumps({"backend": backend.name, "query": WORST_CASE, **worst}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark de lectura y escritura concurrente sobre SQLite.
+
+Simula workers de gunicorn: varios procesos leen paginas del repositorio de
+clientes mientras otros dan de alta clientes, sobre el mismo archivo. Compara
+el perfil "default" (journal DELETE, una conexion nueva por peticion) con el
+perfil "production" de SQLITE_PROFILES (WAL, synchronous=NORMAL, mmap, cache y
+conexiones persistentes).
+
+    python -m benchmarks.sqlite_concurrency --rows 100000 --readers 4 --writers 2
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import sqlite3
+import statistics
+import time
+
+from benchmarks.common import (
+    person_name,
+    seed_clients,
+    setup_django,
+    temporary_database,
+)
+
+
+def read_page(number):
+    """Lo que hace una peticion al repositorio: una pagina ordenada y filtrada"""
+    from app.models import CityEnum, Client
+
+    cities = [city for city, _ in CityEnum.choices]
+    return list(
+        Client.objects.filter(city=cities[number % len(cities)]).order_by("name", "id")[:50],
+    )
+
+
+def write_client(number):
+    """Lo que hace un alta desde el formulario, con sus senales"""
+    from app.models import Client
+
+    return Client.objects.create(
+        name=person_name(number),
+        phone=5422900000 + number,
+        email=f"bench.{number}@vetsoft.com",
+        city="La Plata",
+    )
+
+
+def worker(kind, worker_id, deadline, persistent, results):
+    """Ejecuta operaciones hasta el deadline y envia (tipo, latencias, errores)"""
+    from django.db import OperationalError, connection
+
+    operation = read_page if kind == "read" else write_client
+    latencies = []
+    errors = 0
+    number = worker_id * 10_000_000
+    while time.time() < deadline:
+        number += 1
+        start = time.perf_counter()
+        try:
+            operation(number)
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append((time.perf_counter() - start) * 1000)
+        if not persistent:
+            # CONN_MAX_AGE=0: Django cierra la conexion al terminar cada peticion
+            connection.close()
+    connection.close()
+    results.put((kind, latencies, errors))
+
+
+def summarize(latencies, errors, seconds):
+    """Operaciones por segundo y percentiles de latencia en milisegundos"""
+    latencies.sort()
+    if not latencies:
+        return {"ops_per_s": 0, "errors": errors}
+    return {
+        "ops_per_s": round(len(latencies) / seconds, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1], 3),
+        "errors": errors,
+    }
+
+
+def run_profile(profile, path, args):
+    """Corre lectores y escritores en procesos separados con un perfil de SQLite"""
+    from django.conf import settings
+    from django.db import connections
+
+    pragmas = settings.SQLITE_PROFILES[profile]
+    settings.SQLITE_PRAGMAS = pragmas
+    connections.close_all()
+    # journal_mode queda guardado en el archivo, hay que fijarlo para cada perfil
+    raw = sqlite3.connect(path)
+    raw.execute(f"PRAGMA journal_mode = {pragmas.get('journal_mode', 'delete')}")
+    raw.close()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    deadline = time.time() + args.seconds
+    persistent = profile == "production"
+    processes = [
+        context.Process(target=worker, args=(kind, worker_id, deadline, persistent, results))
+        for worker_id, kind in enumerate(["read"] * args.readers + ["write"] * args.writers)
+    ]
+    for process in processes:
+        process.start()
+    collected = {"read": ([], 0), "write": ([], 0)}
+    for _ in processes:
+        kind, latencies, errors = results.get()
+        previous, previous_errors = collected[kind]
+        collected[kind] = (previous + latencies, previous_errors + errors)
+    for process in processes:
+        process.join()
+    return {
+        kind: summarize(latencies, errors, args.seconds)
+        for kind, (latencies, errors) in collected.items()
+    }
+
+
+def main():
+    """Carga los datos y mide ambos perfiles sobre el mismo archivo"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database() as connection:
+        seed_clients(args.rows)
+        path = connection.settings_dict["NAME"]
+        results = {
+            profile: run_profile(profile, path, args) for profile in ("default", "production")
+        }
+    print(json.dumps({"rows": args.rows, "readers": args.readers, "writers": args.writers,
+                      "seconds": args.seconds, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark del arranque del contenedor: migrar en el build vs migrar al arrancar.
+
+Mide sobre bases SQLite nuevas en un directorio temporal:
+- `manage.py migrate` y `manage.py migrate_if_needed` con la base vacia y al dia
+- gunicorn.conf.py con MIGRATE_ON_START=1 hasta la primera respuesta, con la base
+  vacia (primer arranque del contenedor) y al dia (reinicio), contra gunicorn sin
+  migrar sobre una base ya migrada
+
+    python -m benchmarks.startup_time --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import ROOT
+from benchmarks.http_load import start_server, stop_server
+
+SERVER = ["--config", "gunicorn.conf.py"]
+
+
+def manage(command, database_path):
+    """Corre un comando de manage.py sobre la base y retorna los segundos"""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database_path}"}
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "manage.py", command, "--noinput"] if command == "migrate"
+        else [sys.executable, "manage.py", command],
+        cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def boot(database_path, port, migrate_on_start):
+    """Arranca gunicorn, espera la primera respuesta y lo detiene; retorna los segundos"""
+    env = {"MIGRATE_ON_START": "1" if migrate_on_start else "0"}
+    server, seconds = start_server(SERVER, port, database_path, env)
+    stop_server(server)
+    return seconds
+
+
+def measure(repeat, port):
+    """Repite cada escenario `repeat` veces, cada vez con una base nueva"""
+    samples = {}
+
+    def add(key, seconds):
+        samples.setdefault(key, []).append(seconds)
+
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            fresh = os.path.join(directory, "fresh.sqlite3")
+            add("migrate_fresh_s", manage("migrate", fresh))
+            add("migrate_up_to_date_s", manage("migrate", fresh))
+            add("migrate_if_needed_up_to_date_s", manage("migrate_if_needed", fresh))
+            add("server_without_migrate_s", boot(fresh, port, migrate_on_start=False))
+            add("server_restart_s", boot(fresh, port, migrate_on_start=True))
+            add("server_cold_start_s", boot(
+                os.path.join(directory, "cold.sqlite3"), port, migrate_on_start=True,
+            ))
+    return {key: round(statistics.median(values), 3) for key, values in samples.items()}
+
+
+def main():
+    """Mide los escenarios de arranque e imprime las medianas"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8785)
+    args = parser.parse_args()
+    print(json.dumps({"repeat": args.repeat, "median": measure(args.repeat, args.port)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
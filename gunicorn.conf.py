@@ -0,0 +1,124 @@
+"""
+Configuracion de gunicorn para produccion.
+
+    gunicorn -c gunicorn.conf.py
+
+SERVER_PROFILE=wsgi (por defecto) usa workers gthread con app/views.py y
+SERVER_PROFILE=asgi workers de uvicorn con app/async_views.py. La cantidad de
+workers sale de los CPUs y la memoria del contenedor; todo se puede fijar con
+variables de entorno GUNICORN_*.
+"""
+import os
+import shutil
+
+from vetsoft.server import cpu_count, memory_mb, worker_count
+
+PROFILES = {
+    "wsgi": ("vetsoft.wsgi:application", "gthread"),
+    "asgi": ("vetsoft.asgi:application", "uvicorn.workers.UvicornWorker"),
+}
+
+profile = os.getenv("SERVER_PROFILE", "wsgi")
+if profile not in PROFILES:
+    raise RuntimeError(f"SERVER_PROFILE desconocido: {profile} (usar wsgi o asgi)")
+wsgi_app, worker_class = PROFILES[profile]
+
+bind = os.getenv("GUNICORN_BIND", ":8000")
+
+# un worker ocupa ~100 MiB con los indices de autocompletado y los templates cargados
+WORKER_MEMORY_MB = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", "128"))
+RESERVED_MEMORY_MB = int(os.getenv("GUNICORN_RESERVED_MEMORY_MB", "128"))
+
+workers = int(os.getenv("GUNICORN_WORKERS", "0")) or worker_count(
+    cpu_count(), memory_mb(), WORKER_MEMORY_MB, RESERVED_MEMORY_MB,
+)
+# con gthread una escritura lenta en SQLite bloquea un thread y no el worker entero
+threads = int(os.getenv("GUNICORN_THREADS", "4")) if worker_class == "gthread" else 1
+
+# la app se carga una vez en el master (templates compilados, indices en memoria) y
+# los workers la heredan por fork compartiendo esa memoria copy-on-write
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# cada worker se recicla despues de max_requests (+ jitter, para que no se reinicien
+# todos juntos) y tiene graceful_timeout segundos para terminar lo que esta atendiendo
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# en contenedores /tmp puede estar en disco; el heartbeat de los workers va a memoria
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# metricas de gunicorn (peticiones, latencia, workers) por statsd si hay un colector
+statsd_host = os.getenv("GUNICORN_STATSD_HOST") or None
+statsd_prefix = "vetsoft"
+
+# GET /metrics (app/metrics.py) suma las metricas que cada worker escribe en este
+# directorio; se define antes de cargar la app para que la configuracion lo lea
+metrics_dir = os.environ.setdefault(
+    "METRICS_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else "/tmp", "vetsoft-metrics"),
+)
+
+def on_starting(server):
+    """Descarta las metricas de una ejecucion anterior"""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    """Informa el dimensionamiento elegido al arrancar"""
+    server.log.info(
+        "perfil %s: %d workers %s x %d threads, preload=%s, max_requests=%d+%d",
+        profile, workers, worker_class, threads, preload_app, max_requests, max_requests_jitter,
+    )
+
+
+def post_fork(server, worker):
+    """
+    Con preload el worker hereda el estado del master: se descartan las conexiones
+    a la base que hubiera abiertas, cuyo socket o archivo pertenece al master.
+    """
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+
+
+def post_worker_init(worker):
+    """
+    Prepara el worker antes de que reciba peticiones (los templates ya se compilaron
+    al importar vetsoft.wsgi): abre una conexion a cada base, que aplica los PRAGMAs,
+    trae el archivo al cache del sistema y verifica que la base responda. La cierra
+    porque cada thread abre la suya. Despues registra el worker en app.workers.
+    """
+    from django.db import connections
+
+    from app.workers import stats
+
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.close()
+    stats.started(worker_class, threads, worker.max_requests)
+
+
+def worker_exit(server, worker):
+    """Guarda las ultimas metricas del worker antes de que termine"""
+    from app.metrics import registry
+
+    registry.flush()
+
+
+def child_exit(server, worker):
+    """Suma las metricas del worker que termino al archivo acumulado"""
+    from app.metrics import mark_process_dead
+
+    mark_process_dead(metrics_dir, worker.pid)
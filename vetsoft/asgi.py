@@ -8,9 +8,33 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
 
 import os
+import threading
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+os.environ.setdefault("ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
+
+# igual que vetsoft/wsgi.py: migra si hace falta, compila los templates, carga los
+# indices de autocompletado y sirve los archivos estaticos desde el mismo proceso
+from app import autocomplete, startup, templates_warmup  # noqa: E402
+from app.static_assets import ASGIStaticFilesMiddleware  # noqa: E402
+
+
+def warm():
+    """Migra si MIGRATE_ON_START=1, precompila los templates y carga los indices"""
+    if os.getenv("MIGRATE_ON_START") == "1":
+        startup.migrate_on_start()
+    templates_warmup.warm()
+    autocomplete.warm()
+
+
+# uvicorn puede importar este modulo dentro del event loop, donde Django no permite
+# usar el ORM: la carga se hace en un thread aparte
+warmup = threading.Thread(target=warm, name="vetsoft-warmup")
+warmup.start()
+warmup.join()
+
+application = ASGIStaticFilesMiddleware(application)
@@ -0,0 +1,106 @@
+"""
+Backend de PostgreSQL con un pool de conexiones de psycopg_pool. Django 5.0 no
+trae uno propio (5.1 lo agrega con OPTIONS["pool"]); este toma las mismas
+opciones, asi que al actualizar Django alcanza con volver al ENGINE original:
+
+    "ENGINE": "vetsoft.postgresql_pool",
+    "OPTIONS": {"pool": {"min_size": 4, "max_size": 4}},
+
+Cada thread toma una conexion del pool la primera vez que usa la base y la
+devuelve al cerrarla, al terminar la peticion, por eso CONN_MAX_AGE debe ser 0.
+"""
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+# (alias, base) -> pool; la base cambia cuando los tests pasan a la de test
+POOLS = {}
+_lock = threading.Lock()
+
+# un worker de gunicorn con preload hereda los pools del master, con sus threads
+# muertos y sockets compartidos: los olvida sin cerrarlos y arma los suyos
+os.register_at_fork(after_in_child=POOLS.clear)
+
+
+def close_pools(alias=None, name=None):
+    """Cierra los pools de un alias o los conectados a una base, con sus conexiones"""
+    with _lock:
+        keys = [key for key in POOLS if key[0] == alias or key[1] == name]
+        pools = [POOLS.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """
+    Cierra los pools antes de borrar la base de test, que no admite conexiones
+    abiertas; tambien los de otros alias que apuntan a ella, como la replica
+    """
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(name=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """DatabaseWrapper de PostgreSQL que toma y devuelve las conexiones de un pool"""
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        """Pool de este alias, creado sin abrir la primera vez que se pide"""
+        options = self.settings_dict["OPTIONS"].get("pool")
+        if not options or self.alias == NO_DB_ALIAS:
+            # la conexion sin base que se usa para crear y borrar la de test no
+            # se reutiliza
+            return None
+        key = (self.alias, self.settings_dict["NAME"])
+        with _lock:
+            if key not in POOLS:
+                if self.settings_dict["CONN_MAX_AGE"] != 0:
+                    raise ImproperlyConfigured("Con pool de conexiones CONN_MAX_AGE debe ser 0")
+                check = ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None
+                POOLS[key] = ConnectionPool(
+                    # Django pasa la conexion a autocommit al inicializarla
+                    kwargs={**self.get_connection_params(), "autocommit": True},
+                    open=False, check=check, name=self.alias,
+                    **({} if options is True else options),
+                )
+            return POOLS[key]
+
+    def close_pool(self):
+        """Cierra los pools de este alias y sus conexiones"""
+        close_pools(alias=self.alias)
+
+    def get_connection_params(self):
+        """Parametros de conexion, sin la opcion del pool que psycopg no conoce"""
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        """Toma una conexion del pool, abriendolo si todavia no se abrio"""
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        self.isolation_level = IsolationLevel(isolation_level or IsolationLevel.READ_COMMITTED)
+        pool.open()
+        connection = pool.getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # el pool deshace la transaccion que hubiera quedado abierta
+            self.connection._pool.putconn(self.connection)
+        # aunque se cierre dentro de un atomic la conexion ya no es de este thread
+        self.connection = None
+        return None
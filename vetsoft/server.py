@@ -0,0 +1,59 @@
+"""
+Dimensionamiento de gunicorn (gunicorn.conf.py) segun los CPUs y la memoria
+disponibles, respetando los limites del cgroup cuando corre en un contenedor.
+"""
+import math
+import os
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+CGROUP_V1_MEMORY_LIMIT = "/sys/fs/cgroup/memory/memory.limit_in_bytes"
+MEMINFO = "/proc/meminfo"
+
+
+def read_text(path):
+    """Contenido de un archivo, o None si no existe"""
+    try:
+        with open(path) as handle:
+            return handle.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_count(cpu_max_path=CGROUP_CPU_MAX):
+    """CPUs utilizables: la afinidad del proceso acotada por la cuota del cgroup"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    limit = read_text(cpu_max_path)
+    if limit:
+        quota, _, period = limit.partition(" ")
+        if quota != "max" and period:
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    return max(1, cpus or 1)
+
+
+def memory_mb(memory_max_paths=(CGROUP_MEMORY_MAX, CGROUP_V1_MEMORY_LIMIT), meminfo=MEMINFO):
+    """Memoria disponible en MiB: el limite del cgroup o, si no hay, la del equipo"""
+    total = None
+    text = read_text(meminfo)
+    for line in (text or "").splitlines():
+        if line.startswith("MemTotal:"):
+            total = int(line.split()[1]) // 1024
+    for path in memory_max_paths:
+        limit = read_text(path)
+        if limit and limit.isdigit():
+            limit_mb = int(limit) // (1024 * 1024)
+            # cgroup v1 informa un numero enorme cuando no hay limite
+            total = limit_mb if total is None else min(total, limit_mb)
+    return total
+
+
+def worker_count(cpus, available_mb, worker_mb, reserved_mb=0):
+    """
+    Workers: 2 x CPUs + 1, la formula usual para workers que esperan a la base,
+    sin pasarse de los que entran en memoria.
+    """
+    by_cpu = cpus * 2 + 1
+    if available_mb is None:
+        return by_cpu
+    by_memory = (available_mb - reserved_mb) // worker_mb
+    return max(1, min(by_cpu, by_memory))
@@ -18,4 +18,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
-urlpatterns = [path("admin/", admin.site.urls), path("", include("app.urls"))]
+from app.admin import profile_urls
+
+urlpatterns = [
+    path("admin/perfiles/", include(profile_urls)),
+    path("admin/", admin.site.urls),
+    path("", include("app.urls")),
+]
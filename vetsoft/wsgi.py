@@ -14,3 +14,17 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
 
 application = get_wsgi_application()
+
+# con MIGRATE_ON_START=1 (la imagen de Docker) aplica las migraciones pendientes;
+# despues compila los templates y carga los indices de autocompletado antes de
+# atender la primera peticion
+from app import autocomplete, startup, templates_warmup  # noqa: E402
+from app.static_assets import StaticFilesMiddleware  # noqa: E402
+
+if os.getenv("MIGRATE_ON_START") == "1":
+    startup.migrate_on_start()
+templates_warmup.warm()
+autocomplete.warm()
+
+# sirve los archivos estaticos desde el mismo proceso
+application = StaticFilesMiddleware(application)